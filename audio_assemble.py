@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+Master-Track Assembly
+=====================
+
+Fügt alle Abschnitte aus timing.json zu einer durchgehenden Audio-Datei
+zusammen, ohne zu dekodieren oder neu zu encodieren:
+
+- MP3: Frames werden direkt kopiert (Xing/Info-Frames der Abschnitte
+  entfallen, der Master bekommt einen eigenen). Pausen zwischen den
+  Abschnitten bestehen aus stillen Frames (leere Side-Info).
+- Ogg Opus/Vorbis: Die Streams werden verkettet (chained Ogg), doppelte
+  Serial-Nummern werden umgeschrieben und die Page-CRC neu berechnet.
+
+Die Files werden per mmap gelesen, kopiert werden zusammenhängende Bereiche.
+
+Die Abschnittsgrenzen liegen auf Video-Frames (video.fps aus config.json):
+Vor jedem Abschnitt werden so wenige stille MP3-Frames wie möglich
+eingefügt, bis er höchstens ALIGN_TOLERANCE_VIDEO_FRAMES (1/4 Video-Frame)
+neben einem Video-Frame beginnt. Bei 44.1 kHz / 30 fps sind das maximal
+3 Frames (~80 ms) pro Abschnitt. Die tatsächlichen Startzeiten stehen in
+master.json (subtitles.py liest sie von dort). Bei Ogg ist keine Stille
+ohne Encoder möglich, dort werden die Video-Frames nur gerundet.
+
+Kapitel:
+    master.mp3         ID3v2.4 CHAP/CTOC mit den Abschnittstiteln
+    master.ffmetadata  Für ffmpeg (-i master.ffmetadata -map_metadata 1)
+    master.json        Start/Ende je Abschnitt in Sekunden und Video-Frames
+
+Usage:
+    python audio_assemble.py audio/ --narration-file narrations_combined.txt
+    python audio_assemble.py audio/ --gap 0.8 --fps 25
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from audio_duration import (
+    Mp3Frame, find_first_mp3_frame, iter_mp3_frames, xing_offset, ogg_crc, ogg_duration
+)
+from audio_encode import load_config
+
+
+DEFAULT_FPS = 30
+DEFAULT_GAP_SECONDS = 0.0
+
+# Erlaubter Abstand eines Abschnittsbeginns vom nächsten Video-Frame
+ALIGN_TOLERANCE_VIDEO_FRAMES = 0.25
+
+# Obergrenze der Suche (in MP3-Frames, ~1 s); wird die Toleranz nicht
+# erreicht, gewinnt der kleinste Fehler in diesem Fenster
+ALIGN_SEARCH_FRAMES = 38
+
+MASTER_NAME = "master"
+MASTER_TIMELINE_FILENAME = f"{MASTER_NAME}.json"
+
+MP3_SUFFIXES = ('.mp3',)
+OGG_SUFFIXES = ('.opus', '.ogg')
+
+# Zeitbasis der Ogg-Timeline (Opus dekodiert immer mit 48 kHz)
+OGG_SAMPLE_RATE = 48000
+
+
+def _map(path: Path):
+    """Read-only mmap eines Files (leere Files lassen sich nicht mappen)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"{path} ist leer")
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+# --- MP3 ---------------------------------------------------------------------
+
+def scan_mp3(path: Path) -> Dict[str, Any]:
+    """
+    Findet den Bereich mit Audio-Frames in einem MP3-File.
+
+    Returns:
+        {'start', 'end': Byte-Bereich der Audio-Frames (ohne ID3/Xing),
+         'frames', 'samples', 'header': erster Audio-Frame-Header, 'sample_rate',
+         'channels', 'samples_per_frame', 'bitrates'}
+    """
+    data = _map(path)
+    try:
+        pos, first = find_first_mp3_frame(data)
+        if first is None:
+            raise ValueError(f"{path}: kein MP3-Frame gefunden")
+        if first.layer != 3:
+            raise ValueError(f"{path}: nur MPEG Layer III wird unterstützt")
+
+        # Xing/Info-Frame enthält kein Audio (nur Metadaten des Abschnitts)
+        xing_pos = xing_offset(pos, first)
+        if data[xing_pos:xing_pos + 4] in (b'Xing', b'Info'):
+            pos += first.length
+
+        frames = samples = 0
+        end = pos
+        header = None
+        bitrates = set()
+        for frame_pos, frame in iter_mp3_frames(data, pos):
+            if header is None:
+                header = struct.unpack('>I', data[frame_pos:frame_pos + 4])[0]
+            frames += 1
+            samples += frame.samples
+            bitrates.add(frame.bitrate)
+            end = frame_pos + frame.length
+    finally:
+        data.close()
+
+    if not frames:
+        raise ValueError(f"{path}: keine Audio-Frames")
+
+    return {
+        'start': pos,
+        'end': end,
+        'frames': frames,
+        'samples': samples,
+        'header': header,
+        'sample_rate': first.sample_rate,
+        'channels': first.channels,
+        'samples_per_frame': first.samples,
+        'bitrates': bitrates,
+    }
+
+
+def silent_frame(header: int) -> bytes:
+    """
+    Stiller Layer-III-Frame mit den Parametern von header.
+
+    Ohne CRC und Padding-Bit; Side-Info und Main-Data sind Null
+    (main_data_begin = 0, keine Huffman-Daten), d.h. der Frame greift nicht
+    auf das Bit-Reservoir des vorherigen Frames zu.
+    """
+    header = (header | 0x10000) & ~0x200
+    return header.to_bytes(4, 'big') + bytes(Mp3Frame(header).length - 4)
+
+
+def info_frame(header: int, frames: int, size: int, vbr: bool) -> bytes:
+    """Xing- (VBR) bzw. Info-Frame (CBR) mit Frame-Anzahl und Dateigröße"""
+    frame = silent_frame(header)
+    tag_pos = xing_offset(0, Mp3Frame(int.from_bytes(frame[:4], 'big')))
+    tag = (b'Xing' if vbr else b'Info') + struct.pack('>III', 0x3, frames, size + len(frame))
+    return frame[:tag_pos] + tag + frame[tag_pos + len(tag):]
+
+
+def align_padding(position: int, min_frames: int, samples_per_frame: int,
+                  sample_rate: int, fps: float) -> int:
+    """
+    Kleinste Anzahl stiller Frames (>= min_frames), nach der position
+    höchstens ALIGN_TOLERANCE_VIDEO_FRAMES neben einem Video-Frame liegt.
+    """
+    samples_per_video_frame = sample_rate / fps
+    tolerance = ALIGN_TOLERANCE_VIDEO_FRAMES * samples_per_video_frame
+
+    def error(frames: int) -> float:
+        start = position + frames * samples_per_frame
+        return abs(start - round(start / samples_per_video_frame) * samples_per_video_frame)
+
+    candidates = range(min_frames, min_frames + ALIGN_SEARCH_FRAMES)
+    for frames in candidates:
+        if error(frames) <= tolerance:
+            return frames
+    return min(candidates, key=error)
+
+
+def plan_mp3(sections: List[Dict[str, Any]], gap: float, fps: Optional[float]) -> Dict[str, Any]:
+    """
+    Layout des MP3-Masters: stille Frames vor jedem Abschnitt (außer dem
+    ersten) und am Ende, damit Abschnitte und Gesamtlänge auf Video-Frames liegen.
+
+    Args:
+        sections: [{'section_id', 'file'}] in Abspielreihenfolge
+        gap: Mindest-Pause zwischen Abschnitten in Sekunden
+        fps: Video-Framerate für die Ausrichtung (None = keine Ausrichtung)
+
+    Returns:
+        {'sections': [{'section_id', 'file', 'scan', 'padding', 'start_sample', 'end_sample'}],
+         'tail', 'header', 'sample_rate', 'samples_per_frame', 'total_samples'}
+    """
+    scans = [(section, scan_mp3(Path(section['file']))) for section in sections]
+    reference = scans[0][1]
+    for section, scan in scans[1:]:
+        for key in ('sample_rate', 'channels', 'samples_per_frame'):
+            if scan[key] != reference[key]:
+                raise ValueError(
+                    f"[{section['section_id']}] {key}={scan[key]} weicht von {reference[key]} ab - "
+                    f"ohne Re-Encoding müssen alle Abschnitte gleich encodiert sein (siehe audio_encode.py)")
+
+    sample_rate = reference['sample_rate']
+    spf = reference['samples_per_frame']
+    min_frames = int(round(gap * sample_rate / spf))
+
+    layout = []
+    position = 0
+    for index, (section, scan) in enumerate(scans):
+        padding = 0
+        if index > 0:
+            padding = align_padding(position, min_frames, spf, sample_rate, fps) if fps else min_frames
+        position += padding * spf
+        layout.append({'section_id': section['section_id'], 'file': section['file'], 'scan': scan,
+                       'padding': padding, 'start_sample': position, 'end_sample': position + scan['samples']})
+        position += scan['samples']
+    tail = align_padding(position, 0, spf, sample_rate, fps) if fps else 0
+
+    return {
+        'sections': layout,
+        'tail': tail,
+        'header': reference['header'],
+        'sample_rate': sample_rate,
+        'samples_per_frame': spf,
+        'total_samples': position + tail * spf,
+    }
+
+
+def write_mp3(plan: Dict[str, Any], output: Path, tag: bytes = b''):
+    """Schreibt den MP3-Master: ID3-Tag, Xing/Info-Frame, Pausen und Frames der Abschnitte"""
+    layout = plan['sections']
+    silence = silent_frame(plan['header'])
+    silent_frames = sum(item['padding'] for item in layout) + plan['tail']
+    audio_frames = silent_frames + sum(item['scan']['frames'] for item in layout)
+    audio_bytes = silent_frames * len(silence) + sum(item['scan']['end'] - item['scan']['start'] for item in layout)
+    bitrates = set().union(*(item['scan']['bitrates'] for item in layout))
+
+    tmp_file = output.with_name(f".{output.name}.tmp")
+    try:
+        with open(tmp_file, 'wb') as dst:
+            dst.write(tag)
+            dst.write(info_frame(plan['header'], audio_frames, audio_bytes, vbr=len(bitrates) > 1))
+            for item in layout:
+                dst.write(silence * item['padding'])
+                data = _map(Path(item['file']))
+                try:
+                    dst.write(data[item['scan']['start']:item['scan']['end']])
+                finally:
+                    data.close()
+            dst.write(silence * plan['tail'])
+        os.replace(tmp_file, output)
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
+
+
+# --- Ogg ---------------------------------------------------------------------
+
+def ogg_pages(data) -> List[Tuple[int, int]]:
+    """(Offset, Länge) aller Pages"""
+    pages = []
+    pos = 0
+    while data[pos:pos + 4] == b'OggS' and pos + 27 <= len(data):
+        segments = data[pos + 26]
+        length = 27 + segments + sum(data[pos + 27:pos + 27 + segments])
+        if pos + length > len(data):
+            break
+        pages.append((pos, length))
+        pos += length
+    return pages
+
+
+def assemble_ogg(sections: List[Dict[str, Any]], output: Path) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Verkettet Ogg-Streams (chained Ogg) zu einem Master.
+
+    Returns:
+        ([{'section_id', 'start_sample', 'end_sample'}], Gesamtlänge) in Samples bei OGG_SAMPLE_RATE
+    """
+    serials = set()
+    layout = []
+    position = 0
+
+    tmp_file = output.with_name(f".{output.name}.tmp")
+    try:
+        with open(tmp_file, 'wb') as dst:
+            for section in sections:
+                data = _map(Path(section['file']))
+                try:
+                    duration = ogg_duration(data)
+                    pages = ogg_pages(data)
+                    if duration is None or not pages:
+                        raise ValueError(f"{section['file']}: kein gültiger Ogg Opus/Vorbis-Stream")
+
+                    serial = struct.unpack('<I', data[14:18])[0]
+                    new_serial = serial
+                    while new_serial in serials:
+                        new_serial = (new_serial + 1) & 0xFFFFFFFF
+                    serials.add(new_serial)
+
+                    end = pages[-1][0] + pages[-1][1]
+                    if new_serial == serial:
+                        dst.write(data[:end])
+                    else:
+                        for pos, length in pages:
+                            page = bytearray(data[pos:pos + length])
+                            page[14:18] = struct.pack('<I', new_serial)
+                            page[22:26] = bytes(4)
+                            page[22:26] = struct.pack('<I', ogg_crc(page))
+                            dst.write(page)
+                finally:
+                    data.close()
+
+                samples = int(round(duration * OGG_SAMPLE_RATE))
+                layout.append({'section_id': section['section_id'], 'start_sample': position,
+                               'end_sample': position + samples})
+                position += samples
+        os.replace(tmp_file, output)
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
+    return layout, position
+
+
+# --- Kapitel -----------------------------------------------------------------
+
+def _syncsafe(value: int) -> bytes:
+    return bytes([(value >> 21) & 0x7F, (value >> 14) & 0x7F, (value >> 7) & 0x7F, value & 0x7F])
+
+
+def _id3_frame(frame_id: bytes, body: bytes) -> bytes:
+    return frame_id + _syncsafe(len(body)) + b'\x00\x00' + body
+
+
+def _id3_text(frame_id: bytes, text: str) -> bytes:
+    # Encoding 3 = UTF-8
+    return _id3_frame(frame_id, b'\x03' + text.encode('utf-8'))
+
+
+def id3_chapters(chapters: List[Dict[str, Any]], title: Optional[str] = None) -> bytes:
+    """
+    ID3v2.4-Tag mit CHAP-Frame je Abschnitt und einem CTOC-Frame.
+
+    Args:
+        chapters: [{'section_id', 'title', 'start_ms', 'end_ms'}]
+        title: Optionaler Titel des Masters (TIT2)
+    """
+    if len(chapters) > 255:
+        raise ValueError("ID3 CTOC unterstützt maximal 255 Kapitel")
+
+    frames = b''
+    if title:
+        frames += _id3_text(b'TIT2', title)
+    element_ids = [f"chp{index}".encode('latin-1') for index in range(len(chapters))]
+    # CTOC: top-level + geordnet, danach die Kapitel-IDs
+    frames += _id3_frame(b'CTOC', b'toc\x00' + bytes([0x03, len(chapters)]) +
+                         b''.join(element_id + b'\x00' for element_id in element_ids))
+    for element_id, chapter in zip(element_ids, chapters):
+        body = element_id + b'\x00' + struct.pack('>IIII', chapter['start_ms'], chapter['end_ms'],
+                                                   0xFFFFFFFF, 0xFFFFFFFF)
+        frames += _id3_frame(b'CHAP', body + _id3_text(b'TIT2', chapter['title']))
+    return b'ID3\x04\x00\x00' + _syncsafe(len(frames)) + frames
+
+
+def _ffmetadata_escape(value: str) -> str:
+    for char in ('\\', '=', ';', '#', '\n'):
+        value = value.replace(char, '\\' + char)
+    return value
+
+
+def write_ffmetadata(path: Path, chapters: List[Dict[str, Any]], title: Optional[str] = None):
+    """Kapitel im ffmetadata-Format (Zeitbasis 1/1000)"""
+    lines = [';FFMETADATA1']
+    if title:
+        lines.append(f"title={_ffmetadata_escape(title)}")
+    for chapter in chapters:
+        lines += ['', '[CHAPTER]', 'TIMEBASE=1/1000', f"START={chapter['start_ms']}",
+                  f"END={chapter['end_ms']}", f"title={_ffmetadata_escape(chapter['title'])}"]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def load_titles(narration_files: List[Path]) -> Dict[str, str]:
+    """{section_id: Titel} aus Narrations-Files (Markdown)"""
+    from narration_parser import parse_file
+
+    titles = {}
+    for narration_file in narration_files:
+        for section in parse_file(narration_file)['sections']:
+            if section.get('title'):
+                titles[section['id']] = section['title']
+    return titles
+
+
+# --- Pipeline ----------------------------------------------------------------
+
+def build_timeline(layout: List[Dict[str, Any]], titles: Dict[str, str], fps: float,
+                   sample_rate: int, total: int) -> Dict[str, Any]:
+    """Timeline in Sekunden, Millisekunden (Kapitel) und Video-Frames"""
+    sections = []
+    for item in layout:
+        start = item['start_sample'] / sample_rate
+        end = item['end_sample'] / sample_rate
+        sections.append({
+            'section_id': item['section_id'],
+            'title': titles.get(item['section_id'], item['section_id']),
+            'start_seconds': round(start, 6),
+            'end_seconds': round(end, 6),
+            'start_ms': int(round(start * 1000)),
+            'end_ms': int(round(end * 1000)),
+            'start_frame': int(round(start * fps)),
+            'end_frame': int(round(end * fps)),
+        })
+    return {
+        'fps': fps,
+        'sample_rate': sample_rate,
+        'total_seconds': round(total / sample_rate, 6),
+        'total_frames': int(round(total / sample_rate * fps)),
+        'sections': sections,
+    }
+
+
+def assemble(output_dir: Path, output: Optional[Path] = None, titles: Optional[Dict[str, str]] = None,
+             gap: float = DEFAULT_GAP_SECONDS, fps: float = DEFAULT_FPS, align: bool = True,
+             title: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Baut den Master-Track aus timing.json.
+
+    Args:
+        output_dir: Verzeichnis mit timing.json
+        output: Ziel-Datei (default: <output_dir>/master.<Format der Abschnitte>)
+        titles: {section_id: Kapitel-Titel} (default: section_id)
+        gap: Mindest-Pause zwischen Abschnitten in Sekunden (nur MP3)
+        fps: Video-Framerate der Timeline
+        align: Abschnitte auf Video-Frames ausrichten (nur MP3)
+        title: Titel des Masters
+
+    Returns:
+        Timeline (siehe build_timeline) plus 'file', 'ffmetadata', 'timeline_file'
+    """
+    output_dir = Path(output_dir)
+    with open(output_dir / "timing.json", 'r', encoding='utf-8') as f:
+        timing = json.load(f)
+
+    sections = [{'section_id': entry['section_id'], 'file': entry['file']} for entry in timing['sections']]
+    if not sections:
+        raise ValueError("timing.json enthält keine Abschnitte")
+    suffixes = {Path(section['file']).suffix.lower() for section in sections}
+    if len(suffixes) != 1:
+        raise ValueError(f"Gemischte Formate in timing.json: {', '.join(sorted(suffixes))}")
+    suffix = suffixes.pop()
+    if suffix not in MP3_SUFFIXES + OGG_SUFFIXES:
+        raise ValueError(f"Format {suffix} kann nicht ohne Re-Encoding verkettet werden (nur MP3/Ogg)")
+
+    titles = titles or {}
+    output = Path(output) if output else output_dir / f"{MASTER_NAME}{suffix}"
+
+    if suffix in MP3_SUFFIXES:
+        plan = plan_mp3(sections, gap, fps if align else None)
+        layout = [{'section_id': item['section_id'], 'start_sample': item['start_sample'],
+                   'end_sample': item['end_sample']} for item in plan['sections']]
+        timeline = build_timeline(layout, titles, fps, plan['sample_rate'], plan['total_samples'])
+        write_mp3(plan, output, id3_chapters(timeline['sections'], title))
+    else:
+        if gap:
+            print("WARNUNG: Ogg wird ohne Pausen verkettet (stille Pages bräuchten einen Encoder)")
+        layout, total_samples = assemble_ogg(sections, output)
+        timeline = build_timeline(layout, titles, fps, OGG_SAMPLE_RATE, total_samples)
+
+    ffmetadata = output.with_suffix('.ffmetadata')
+    write_ffmetadata(ffmetadata, timeline['sections'], title)
+
+    timeline_file = output.with_suffix('.json')
+    timeline['file'] = str(output)
+    with open(timeline_file, 'w', encoding='utf-8') as f:
+        json.dump(timeline, f, indent=2, ensure_ascii=False)
+
+    timeline['ffmetadata'] = str(ffmetadata)
+    timeline['timeline_file'] = str(timeline_file)
+    return timeline
+
+
+def main():
+    config = load_config()
+    config_fps = config.get('video', {}).get('fps', DEFAULT_FPS)
+
+    parser = argparse.ArgumentParser(description='Abschnitte ohne Re-Encoding zu einem Master-Track mit Kapiteln zusammenfügen')
+    parser.add_argument('output_dir', type=Path, help='Verzeichnis mit timing.json')
+    parser.add_argument('--output', '-o', type=Path, help='Ziel-Datei (default: <output_dir>/master.mp3 bzw. .opus)')
+    parser.add_argument('--narration-file', type=Path, action='append', default=[],
+                        help='Narrations-File für die Kapitel-Titel (mehrfach möglich)')
+    parser.add_argument('--title', help='Titel des Master-Tracks')
+    parser.add_argument('--gap', type=float, default=DEFAULT_GAP_SECONDS,
+                        help=f'Mindest-Pause zwischen Abschnitten in Sekunden (default: {DEFAULT_GAP_SECONDS})')
+    parser.add_argument('--fps', type=float, default=config_fps,
+                        help=f'Video-Framerate (default: video.fps aus config.json = {config_fps})')
+    parser.add_argument('--no-align', action='store_true', help='Abschnitte nicht auf Video-Frames ausrichten')
+    args = parser.parse_args()
+
+    if not (args.output_dir / "timing.json").exists():
+        print(f"ERROR: {args.output_dir / 'timing.json'} nicht gefunden")
+        return 1
+
+    try:
+        titles = load_titles(args.narration_file)
+        timeline = assemble(args.output_dir, args.output, titles, gap=args.gap, fps=args.fps,
+                            align=not args.no_align, title=args.title)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    for section in timeline['sections']:
+        print(f"  {section['start_seconds']:9.3f}s  Frame {section['start_frame']:6d}  "
+              f"[{section['section_id']}] {section['title']}")
+    print(f"✓ {timeline['file']}: {timeline['total_seconds']:.3f}s, {timeline['total_frames']} Frames "
+          f"@ {timeline['fps']:g} fps, {len(timeline['sections'])} Kapitel")
+    print(f"  Kapitel: {timeline['ffmetadata']}")
+    print(f"  Timeline: {timeline['timeline_file']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
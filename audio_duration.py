@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Audio Duration Reader
+=====================
+
+Ermittelt die Dauer von Audio-Files direkt aus den Datei-Headern, ohne für
+jedes File einen ffprobe-Prozess zu starten.
+
+Unterstützt:
+- MP3 (Xing/Info- und VBRI-Header, sonst Frame-Scan; LAME Encoder-Delay wird berücksichtigt)
+- WAV (RIFF/WAVE, inkl. WAVE_FORMAT_EXTENSIBLE)
+- Ogg Opus / Ogg Vorbis (Granule-Position der letzten Page, auch verkettete Streams)
+- Rohes PCM (Fish Audio "pcm": 16 bit, mono, 44.1 kHz)
+
+Ergebnisse werden pro (Pfad, Größe, mtime) gecacht.
+
+Usage:
+    python audio_duration.py audio/*.mp3
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import threading
+import subprocess
+from pathlib import Path
+from typing import Optional, Dict, Tuple, Iterator
+
+
+# Fish Audio liefert "pcm" als 16 bit signed little endian, mono, 44.1 kHz
+PCM_SAMPLE_RATE = 44100
+PCM_CHANNELS = 1
+PCM_SAMPLE_WIDTH = 2
+
+# MP3 Lookup-Tabellen (kbit/s), Index: [MPEG1?][Layer][bitrate_index]
+_MP3_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# Index: version bits (0 = MPEG2.5, 2 = MPEG2, 3 = MPEG1)
+_MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    0: [11025, 12000, 8000],
+}
+
+_cache: Dict[Tuple[str, int, int], float] = {}
+_cache_lock = threading.Lock()
+
+
+class Mp3Frame:
+    """Geparster MP3 Frame-Header"""
+
+    __slots__ = ('version', 'layer', 'bitrate', 'sample_rate', 'padding', 'channels', 'crc', 'length', 'samples')
+
+    def __init__(self, header: int):
+        version_bits = (header >> 19) & 0x3
+        layer_bits = (header >> 17) & 0x3
+        bitrate_index = (header >> 12) & 0xF
+        rate_index = (header >> 10) & 0x3
+
+        if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+            raise ValueError("Ungültiger MP3 Frame-Header")
+
+        mpeg1 = version_bits == 3
+        self.version = version_bits
+        self.layer = 4 - layer_bits
+        self.bitrate = _MP3_BITRATES[(mpeg1, self.layer)][bitrate_index] * 1000
+        self.sample_rate = _MP3_SAMPLE_RATES[version_bits][rate_index]
+        self.padding = (header >> 9) & 0x1
+        self.channels = 1 if ((header >> 6) & 0x3) == 3 else 2
+        self.crc = not ((header >> 16) & 0x1)
+
+        if self.layer == 1:
+            self.samples = 384
+            self.length = (12 * self.bitrate // self.sample_rate + self.padding) * 4
+        elif self.layer == 2 or mpeg1:
+            self.samples = 1152
+            self.length = 144 * self.bitrate // self.sample_rate + self.padding
+        else:
+            self.samples = 576
+            self.length = 72 * self.bitrate // self.sample_rate + self.padding
+
+    @property
+    def side_info_length(self) -> int:
+        """Länge der Layer-III Side-Info (Position des Xing-Headers)"""
+        if self.version == 3:
+            return 17 if self.channels == 1 else 32
+        return 9 if self.channels == 1 else 17
+
+
+def _parse_mp3_header(data: bytes, pos: int) -> Optional[Mp3Frame]:
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    try:
+        return Mp3Frame(struct.unpack('>I', data[pos:pos + 4])[0])
+    except ValueError:
+        return None
+
+
+def _skip_id3v2(data: bytes) -> int:
+    """Liefert den Offset hinter einem ID3v2-Tag (0 falls keiner vorhanden)"""
+    pos = 0
+    # Mehrere aufeinanderfolgende Tags sind erlaubt
+    while data[pos:pos + 3] == b'ID3' and pos + 10 <= len(data):
+        flags = data[pos + 5]
+        size = 0
+        for byte in data[pos + 6:pos + 10]:
+            size = (size << 7) | (byte & 0x7F)
+        pos += 10 + size + (10 if flags & 0x10 else 0)
+    return pos
+
+
+def find_first_mp3_frame(data: bytes) -> Tuple[int, Optional[Mp3Frame]]:
+    """
+    Erster gültiger Frame hinter ID3v2-Tags (zwei aufeinanderfolgende Header
+    als Bestätigung).
+
+    Returns:
+        (Offset, Frame) bzw. (-1, None) wenn keiner gefunden wurde
+    """
+    pos = _skip_id3v2(data)
+    while 0 <= pos < len(data) - 4:
+        frame = _parse_mp3_header(data, pos)
+        if frame and frame.length > 0:
+            following = _parse_mp3_header(data, pos + frame.length)
+            if following or pos + frame.length >= len(data):
+                return pos, frame
+        pos = data.find(b'\xff', pos + 1)
+    return -1, None
+
+
+def xing_offset(pos: int, frame: Mp3Frame) -> int:
+    """Position eines möglichen Xing/Info-Tags im Frame an Offset pos"""
+    return pos + 4 + (2 if frame.crc else 0) + frame.side_info_length
+
+
+def iter_mp3_frames(data: bytes, pos: int) -> Iterator[Tuple[int, Mp3Frame]]:
+    """Aufeinanderfolgende Frames ab pos bis zum ersten ungültigen Header (z.B. ID3v1-Tag)"""
+    while True:
+        frame = _parse_mp3_header(data, pos)
+        if frame is None or frame.length <= 0 or pos + frame.length > len(data):
+            return
+        yield pos, frame
+        pos += frame.length
+
+
+def mp3_duration(data: bytes) -> Optional[float]:
+    """
+    Dauer eines MP3-Files.
+
+    Nutzt den Xing/Info- oder VBRI-Header, falls vorhanden, sonst werden alle
+    Frames gezählt (korrekt auch für VBR ohne Header).
+    """
+    pos, first = find_first_mp3_frame(data)
+    if first is None:
+        return None
+
+    # Xing/Info-Header (VBR oder LAME CBR)
+    xing_pos = xing_offset(pos, first)
+    if data[xing_pos:xing_pos + 4] in (b'Xing', b'Info'):
+        flags = struct.unpack('>I', data[xing_pos + 4:xing_pos + 8])[0]
+        field = xing_pos + 8
+        frames = None
+        if flags & 0x1:
+            frames = struct.unpack('>I', data[field:field + 4])[0]
+            field += 4
+        if flags & 0x2:
+            field += 4
+        if flags & 0x4:
+            field += 100
+        if flags & 0x8:
+            field += 4
+        if frames:
+            samples = frames * first.samples
+            # LAME/Lavc-Tag: Encoder-Delay und Padding (je 12 bit) an Offset 21
+            if data[field:field + 4] in (b'LAME', b'Lavf', b'Lavc') and field + 24 <= len(data):
+                delay_padding = int.from_bytes(data[field + 21:field + 24], 'big')
+                trimmed = samples - (delay_padding >> 12) - (delay_padding & 0xFFF)
+                if trimmed > 0:
+                    samples = trimmed
+            return samples / first.sample_rate
+
+    # VBRI-Header (Fraunhofer), immer 32 Bytes nach dem Frame-Header
+    vbri_pos = pos + 36
+    if data[vbri_pos:vbri_pos + 4] == b'VBRI':
+        frames = struct.unpack('>I', data[vbri_pos + 14:vbri_pos + 18])[0]
+        if frames:
+            return frames * first.samples / first.sample_rate
+
+    # Kein Header: Frames zählen
+    samples = sum(frame.samples for _, frame in iter_mp3_frames(data, pos))
+
+    return samples / first.sample_rate if samples else None
+
+
+def wav_duration(data: bytes) -> Optional[float]:
+    """Dauer eines RIFF/WAVE-Files aus fmt- und data-Chunk"""
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        return None
+
+    pos = 12
+    byte_rate = None
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        chunk_size = struct.unpack('<I', data[pos + 4:pos + 8])[0]
+        body = pos + 8
+
+        if chunk_id == b'fmt ':
+            byte_rate = struct.unpack('<I', data[body + 8:body + 12])[0]
+        elif chunk_id == b'data':
+            if not byte_rate:
+                return None
+            # Gestreamte WAVs haben oft 0 oder 0xFFFFFFFF als Größe
+            available = len(data) - body
+            if chunk_size in (0, 0xFFFFFFFF) or chunk_size > available:
+                chunk_size = available
+            return chunk_size / byte_rate
+
+        pos = body + chunk_size + (chunk_size & 1)
+
+    return None
+
+
+def _ogg_crc_table():
+    table = []
+    for byte in range(256):
+        crc = byte << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else (crc << 1)
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+
+_OGG_CRC_TABLE = _ogg_crc_table()
+
+
+def ogg_crc(page: bytes) -> int:
+    """CRC32 einer Ogg-Page (Polynom 0x04C11DB7, ohne Reflexion; CRC-Feld muss 0 sein)"""
+    crc = 0
+    for byte in page:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _OGG_CRC_TABLE[(crc >> 24) ^ byte]
+    return crc
+
+
+def ogg_page_valid(data: bytes, pos: int, length: int) -> bool:
+    """Prüft die CRC der Page an pos"""
+    page = bytearray(data[pos:pos + length])
+    expected = struct.unpack('<I', page[22:26])[0]
+    page[22:26] = bytes(4)
+    return ogg_crc(page) == expected
+
+
+def ogg_duration(data: bytes) -> Optional[float]:
+    """
+    Dauer eines Ogg Opus/Vorbis-Files.
+
+    Läuft über alle Page-Header (ohne die Bodies zu lesen) und summiert bei
+    verketteten Streams (chained Ogg, z.B. audio_assemble.py) die letzte
+    Granule-Position jedes logischen Streams. Nur Pages mit gültiger CRC
+    zählen; kaputte Bereiche werden bis zum nächsten "OggS" übersprungen.
+    """
+    if data[:4] != b'OggS':
+        return None
+
+    # Ein Eintrag pro logischem Stream: {'sample_rate', 'pre_skip', 'pages': [(pos, length, granule)]}
+    links = []
+    current: Dict[int, Dict] = {}
+    pos = 0
+    while pos + 27 <= len(data):
+        if data[pos:pos + 4] != b'OggS' or data[pos + 4] != 0:
+            pos = data.find(b'OggS', pos + 1)
+            if pos < 0:
+                break
+            continue
+
+        segments = data[pos + 26]
+        header_length = 27 + segments
+        length = header_length + sum(data[pos + 27:pos + header_length])
+        if pos + length > len(data):
+            break
+
+        granule, serial = struct.unpack('<qI', data[pos + 6:pos + 18])
+        if data[pos + 5] & 0x02 and ogg_page_valid(data, pos, length):
+            # Beginning of Stream: erstes Paket identifiziert den Codec
+            packet = data[pos + header_length:pos + header_length + 64]
+            link = None
+            if packet.startswith(b'OpusHead'):
+                link = {'sample_rate': 48000, 'pre_skip': struct.unpack('<H', packet[10:12])[0], 'pages': []}
+            elif packet.startswith(b'\x01vorbis'):
+                link = {'sample_rate': struct.unpack('<I', packet[12:16])[0], 'pre_skip': 0, 'pages': []}
+            if link:
+                links.append(link)
+                current[serial] = link
+        elif serial in current and granule >= 0:
+            current[serial]['pages'].append((pos, length, granule))
+        pos += length
+
+    if not links:
+        return None
+
+    duration = 0.0
+    for link in links:
+        # Letzte Page mit gültiger CRC (die CRC nur dort prüfen, nicht für alle Pages)
+        for page_pos, page_length, granule in reversed(link['pages']):
+            if ogg_page_valid(data, page_pos, page_length):
+                duration += max(granule - link['pre_skip'], 0) / link['sample_rate']
+                break
+    return duration
+
+
+def pcm_duration(size: int, sample_rate: int = PCM_SAMPLE_RATE,
+                 channels: int = PCM_CHANNELS, sample_width: int = PCM_SAMPLE_WIDTH) -> float:
+    """Dauer von rohem PCM aus der Dateigröße"""
+    return size / (sample_rate * channels * sample_width)
+
+
+def _read_duration(path: Path) -> Optional[float]:
+    size = path.stat().st_size
+    if path.suffix.lower() == '.pcm':
+        return pcm_duration(size)
+    if size == 0:
+        return None
+
+    # mmap: gelesen werden nur Header, Page-Header bzw. Frame-Header
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data[:4] == b'RIFF':
+            return wav_duration(data)
+        if data[:4] == b'OggS':
+            return ogg_duration(data)
+        return mp3_duration(data)
+
+
+def probe_duration(audio_path) -> Optional[float]:
+    """
+    Ermittelt die Dauer eines Audio-Files in Sekunden (ohne externe Prozesse).
+
+    Args:
+        audio_path: Pfad zum Audio-File
+
+    Returns:
+        Dauer in Sekunden oder None, falls das Format nicht erkannt wurde
+    """
+    path = Path(audio_path)
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+    with _cache_lock:
+        if key in _cache:
+            return _cache[key]
+
+    try:
+        duration = _read_duration(path)
+    except (struct.error, IndexError):
+        duration = None
+
+    if duration is not None:
+        with _cache_lock:
+            _cache[key] = duration
+    return duration
+
+
+def ffprobe_duration(audio_path) -> Optional[float]:
+    """Fallback: Dauer via ffprobe (falls installiert)"""
+    try:
+        result = subprocess.run(
+            [
+                'ffprobe',
+                '-v', 'quiet',
+                '-print_format', 'json',
+                '-show_format',
+                str(audio_path)
+            ],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        return float(json.loads(result.stdout)['format']['duration'])
+    except (OSError, subprocess.CalledProcessError, ValueError, KeyError):
+        return None
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python audio_duration.py <audio_file> [...]")
+        return 1
+
+    for name in sys.argv[1:]:
+        duration = probe_duration(name) if os.path.exists(name) else None
+        if duration is None:
+            print(f"{name}: unbekannt")
+        else:
+            print(f"{name}: {duration:.3f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
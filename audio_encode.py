@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Lokales Encoding aus PCM
+========================
+
+Statt pro Liefer-Format einen eigenen API-Call zu bezahlen, wird jeder
+Abschnitt einmal als "pcm" (16 bit, mono, 44.1 kHz) geholt und lokal in
+alle konfigurierten Formate encodiert:
+
+    mp3   Produktion (libmp3lame)
+    opus  Web-Preview (libopus in Ogg)
+    wav   Schnitt (direkt in Python, ohne ffmpeg)
+
+Die Encoder laufen parallel in einem Process-Pool. Die Dauer ergibt sich
+exakt aus der Sample-Anzahl des PCM, ein Probe der Ausgabe-Files ist nicht
+nötig.
+
+Liefer-Formate und Bitraten kommen aus config.json:
+    "delivery": {"formats": ["mp3", "opus", "wav"], "mp3_bitrate": "128k", "opus_bitrate": "48k"}
+
+Usage:
+    python audio_encode.py audio/.pcm/block03.pcm --output-dir audio/ --formats mp3,opus,wav
+"""
+
+import os
+import sys
+import json
+import wave
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Executor
+from typing import Dict, Any, List, Optional
+
+from audio_duration import pcm_duration, PCM_SAMPLE_RATE, PCM_CHANNELS, PCM_SAMPLE_WIDTH
+
+
+PCM_DIRNAME = ".pcm"
+DELIVERY_FORMATS = ('mp3', 'opus', 'wav')
+DEFAULT_DELIVERY = {'formats': ['mp3', 'opus', 'wav'], 'mp3_bitrate': '128k', 'opus_bitrate': '48k'}
+
+
+def load_config() -> Dict[str, Any]:
+    """Lädt die Konfiguration aus config.json (ohne das SDK, siehe fish_audio_tts.load_config)"""
+    config_path = Path(__file__).parent / "config.json"
+    if config_path.exists():
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def _ffmpeg_args(fmt: str, settings: Dict[str, Any]) -> List[str]:
+    if fmt == 'mp3':
+        return ['-c:a', 'libmp3lame', '-b:a', settings.get('mp3_bitrate', DEFAULT_DELIVERY['mp3_bitrate']), '-f', 'mp3']
+    if fmt == 'opus':
+        return ['-c:a', 'libopus', '-b:a', settings.get('opus_bitrate', DEFAULT_DELIVERY['opus_bitrate']), '-f', 'ogg']
+    raise ValueError(f"Unbekanntes Liefer-Format: {fmt}")
+
+
+def encode_file(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Worker (läuft im Process-Pool): encodiert ein PCM-File in ein Format.
+
+    Args:
+        job: {'pcm', 'format', 'output', 'settings'}
+
+    Returns:
+        {'format', 'output', 'bytes'}
+    """
+    pcm_file = Path(job['pcm'])
+    output = Path(job['output'])
+    tmp_file = output.with_name(f".{output.name}.tmp")
+
+    try:
+        if job['format'] == 'wav':
+            with open(pcm_file, 'rb') as src, wave.open(str(tmp_file), 'wb') as dst:
+                dst.setnchannels(PCM_CHANNELS)
+                dst.setsampwidth(PCM_SAMPLE_WIDTH)
+                dst.setframerate(PCM_SAMPLE_RATE)
+                for block in iter(lambda: src.read(1024 * 1024), b''):
+                    dst.writeframes(block)
+        else:
+            try:
+                subprocess.run(
+                    ['ffmpeg', '-v', 'error', '-y', '-f', 's16le', '-ar', str(PCM_SAMPLE_RATE),
+                     '-ac', str(PCM_CHANNELS), '-i', str(pcm_file),
+                     *_ffmpeg_args(job['format'], job['settings']), str(tmp_file)],
+                    capture_output=True, check=True
+                )
+            except FileNotFoundError:
+                raise RuntimeError("ffmpeg nicht gefunden! Wird für MP3/Opus-Encoding benötigt")
+            except subprocess.CalledProcessError as e:
+                raise RuntimeError(f"ffmpeg-Encoding nach {job['format']} fehlgeschlagen: "
+                                   f"{e.stderr.decode(errors='replace').strip()}")
+        os.replace(tmp_file, output)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+
+    return {'format': job['format'], 'output': str(output), 'bytes': output.stat().st_size}
+
+
+def delivery_files(output_dir: Path, section_id: str, formats: List[str]) -> Dict[str, Path]:
+    """{format: Ziel-Datei}, erstes Format = primäre Datei für timing.json"""
+    return {fmt: Path(output_dir) / f"{section_id}.{fmt}" for fmt in formats}
+
+
+def encode_section(pcm_file: Path, output_dir: Path, section_id: str, formats: List[str],
+                   settings: Optional[Dict[str, Any]] = None, pool: Optional[Executor] = None,
+                   force: bool = False) -> Dict[str, Any]:
+    """
+    Encodiert einen Abschnitt in alle Formate (nur fehlende oder veraltete Files).
+
+    Args:
+        pcm_file: PCM-Master des Abschnitts
+        output_dir: Ziel-Verzeichnis
+        section_id: Abschnitt (Dateiname ohne Endung)
+        formats: Liste der Liefer-Formate
+        settings: Bitraten (siehe DEFAULT_DELIVERY)
+        pool: Gemeinsamer Process-Pool (default: eigener Pool pro Aufruf)
+        force: Auch aktuelle Files neu encodieren
+
+    Returns:
+        {'file': primäre Datei, 'files': {format: Datei}, 'duration_seconds': exakt aus Sample-Anzahl}
+    """
+    settings = settings or DEFAULT_DELIVERY
+    targets = delivery_files(output_dir, section_id, formats)
+    pcm_mtime = pcm_file.stat().st_mtime_ns
+    jobs = [{'pcm': str(pcm_file), 'format': fmt, 'output': str(path), 'settings': settings}
+            for fmt, path in targets.items()
+            if force or not path.exists() or path.stat().st_mtime_ns < pcm_mtime]
+
+    if jobs:
+        if pool is None:
+            with ProcessPoolExecutor(max_workers=len(jobs)) as own_pool:
+                list(own_pool.map(encode_file, jobs))
+        else:
+            for future in [pool.submit(encode_file, job) for job in jobs]:
+                future.result()
+
+    return {
+        'file': str(targets[formats[0]]),
+        'files': {fmt: str(path) for fmt, path in targets.items()},
+        'duration_seconds': pcm_duration(pcm_file.stat().st_size),
+    }
+
+
+def resolve_formats(value: str, config: Dict[str, Any]) -> List[str]:
+    """'mp3,opus' bzw. 'config' (Formate aus config.json) -> geprüfte Formatliste"""
+    if value == 'config':
+        formats = config.get('delivery', {}).get('formats', DEFAULT_DELIVERY['formats'])
+    else:
+        formats = [fmt.strip() for fmt in value.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in DELIVERY_FORMATS]
+    if unknown or not formats:
+        raise ValueError(f"Unbekannte Liefer-Formate: {', '.join(unknown) or '(leer)'} "
+                         f"(erlaubt: {', '.join(DELIVERY_FORMATS)})")
+    return list(dict.fromkeys(formats))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PCM-Abschnitte lokal in alle Liefer-Formate encodieren')
+    parser.add_argument('pcm_files', nargs='+', type=Path, help='PCM-Files (16 bit, mono, 44.1 kHz)')
+    parser.add_argument('--output-dir', '-d', type=Path, required=True, help='Ziel-Verzeichnis')
+    parser.add_argument('--formats', default=','.join(DEFAULT_DELIVERY['formats']),
+                        help=f"Komma-getrennt aus {', '.join(DELIVERY_FORMATS)} (default: mp3,opus,wav)")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1, help='Worker-Prozesse (default: CPU-Anzahl)')
+    parser.add_argument('--force', action='store_true', help='Auch aktuelle Files neu encodieren')
+    args = parser.parse_args()
+
+    try:
+        formats = resolve_formats(args.formats, {})
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    # Threads verteilen die Abschnitte, die eigentliche Arbeit läuft im gemeinsamen Process-Pool
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool, \
+            ThreadPoolExecutor(max_workers=max(1, args.jobs)) as threads:
+        results = threads.map(lambda pcm_file: encode_section(pcm_file, args.output_dir, pcm_file.stem, formats,
+                                                              pool=pool, force=args.force), args.pcm_files)
+        for pcm_file, result in zip(args.pcm_files, results):
+            print(f"✓ {pcm_file.stem}: {result['duration_seconds']:.3f}s -> {', '.join(result['files'].values())}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Silence Detection
+=================
+
+Dekodiert Audio-Files zu PCM und findet Pausen über die Kurzzeit-Energie.
+Alle Schritte nach dem Dekodieren sind vektorisiert (NumPy), ein Abschnitt
+von mehreren Minuten ist in wenigen Millisekunden analysiert.
+
+- WAV (16 bit) und rohes PCM werden direkt gelesen
+- MP3/Opus werden per ffmpeg zu 16 kHz mono dekodiert
+
+Der Schwellwert ist relativ zum Sprachpegel des Files (95. Perzentil der
+Frame-Energie), damit leise und laute Abschnitte gleich behandelt werden.
+
+Usage:
+    python audio_silence.py audio/block03.mp3
+"""
+
+import sys
+import wave
+import subprocess
+from pathlib import Path
+from typing import List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from audio_duration import PCM_SAMPLE_RATE
+
+
+ANALYSIS_SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.01
+
+# Frames mehr als RELATIVE_DB unter dem Sprachpegel gelten als still
+RELATIVE_DB = 35.0
+MIN_SILENCE_SECONDS = 0.3
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy nicht installiert! Bitte installieren mit: pip install numpy")
+
+
+def decode_pcm(audio_path, sample_rate: int = ANALYSIS_SAMPLE_RATE) -> Tuple["np.ndarray", int]:
+    """
+    Dekodiert ein Audio-File zu mono int16 Samples.
+
+    Returns:
+        (samples, sample_rate) - WAV und rohes PCM behalten ihre Original-Rate
+    """
+    _require_numpy()
+    path = Path(audio_path)
+
+    if path.suffix == '.pcm':
+        return np.fromfile(path, dtype='<i2'), PCM_SAMPLE_RATE
+
+    if path.suffix == '.wav':
+        with wave.open(str(path), 'rb') as wav:
+            if wav.getsampwidth() == 2:
+                channels = wav.getnchannels()
+                samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+                if channels > 1:
+                    samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+                return samples, wav.getframerate()
+
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-v', 'error', '-i', str(path), '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), '-'],
+            capture_output=True, check=True
+        )
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg nicht gefunden! Wird zum Dekodieren von MP3/Opus benötigt")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg konnte {path} nicht dekodieren: {e.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(result.stdout, dtype='<i2'), sample_rate
+
+
+def frame_energy_db(samples: "np.ndarray", sample_rate: int,
+                    frame_seconds: float = FRAME_SECONDS) -> "np.ndarray":
+    """Mittlere Energie pro Frame in dB (relativ zu Full Scale)"""
+    _require_numpy()
+    frame = max(1, int(sample_rate * frame_seconds))
+    count = len(samples) // frame
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:count * frame].astype(np.float32).reshape(count, frame) / 32768.0
+    return 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+
+
+def silence_runs(energy_db: "np.ndarray", frame_seconds: float = FRAME_SECONDS,
+                 relative_db: float = RELATIVE_DB,
+                 min_silence: float = MIN_SILENCE_SECONDS) -> List[Tuple[float, float]]:
+    """
+    Zusammenhängende stille Bereiche.
+
+    Returns:
+        Liste von (start, end) in Sekunden, nur Pausen >= min_silence
+    """
+    _require_numpy()
+    if len(energy_db) == 0:
+        return []
+
+    threshold = np.percentile(energy_db, 95) - relative_db
+    silent = np.concatenate(([0], (energy_db < threshold).astype(np.int8), [0]))
+    edges = np.diff(silent)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    keep = (ends - starts) * frame_seconds >= min_silence
+    return [(float(start * frame_seconds), float(end * frame_seconds))
+            for start, end in zip(starts[keep], ends[keep])]
+
+
+def detect_silences(audio_path, min_silence: float = MIN_SILENCE_SECONDS,
+                    relative_db: float = RELATIVE_DB) -> Tuple[List[Tuple[float, float]], float]:
+    """
+    Returns:
+        (Pausen als (start, end) in Sekunden, Dauer in Sekunden laut Sample-Anzahl)
+    """
+    samples, sample_rate = decode_pcm(audio_path)
+    energy = frame_energy_db(samples, sample_rate)
+    return silence_runs(energy, relative_db=relative_db, min_silence=min_silence), len(samples) / sample_rate
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python audio_silence.py <audio_file>...")
+        return 1
+
+    for arg in sys.argv[1:]:
+        silences, duration = detect_silences(arg)
+        print(f"{arg}: {duration:.2f}s, {len(silences)} Pausen")
+        for start, end in silences:
+            print(f"  {start:8.2f} - {end:8.2f}  ({end - start:.2f}s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Trailing-Hallucination Trimmer
+==============================
+
+Schneidet angehängte Wörter am Ende eines Abschnitts lokal ab, statt den
+Abschnitt kostenpflichtig neu zu generieren (siehe ANTI_HALLUCINATION_FIX.md).
+
+Ablauf pro Abschnitt:
+1. Erwartete Dauer aus dem DurationModel (Text aus journal.jsonl)
+2. Nur Abschnitte, die deutlich länger sind als erwartet, werden analysiert
+3. PCM dekodieren, Pausen per Kurzzeit-Energie finden (audio_silence.py)
+4. Die lange Pause, die am besten zum erwarteten Textende passt und nach
+   der noch Sprache folgt, ist das Schnittende; der Rest wird abgeschnitten
+5. Bei --encode-Runs (Journal zeigt auf .pcm/<id>.pcm) wird der PCM-Master
+   geschnitten und danach in alle Liefer-Formate neu encodiert, sonst das
+   gelieferte File
+6. Geschnitten wird nur, wenn auch die dekodierte Dauer deutlich über der
+   Vorhersage liegt (--force analysiert alle Abschnitte, schneidet aber
+   ebenfalls nur zu lange)
+7. WAV/PCM werden sample-genau gekürzt, MP3/Opus per ffmpeg neu encodiert
+
+Das Original bleibt in <output_dir>/.untrimmed/ zum Vergleich erhalten.
+Alle Files laufen parallel in einem Process-Pool; timing.json und
+journal.jsonl werden danach mit den neuen Dauern aktualisiert, und der
+Audio-Cache bekommt die gekürzte Fassung (sonst holt der nächste Run von
+fish_audio_tts.py per Cache-Hit wieder das Original).
+
+Usage:
+    python audio_trim.py audio/
+    python audio_trim.py audio/ --dry-run
+"""
+
+import os
+import sys
+import json
+import wave
+import shutil
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from audio_duration import probe_duration, PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH
+from audio_silence import detect_silences, MIN_SILENCE_SECONDS
+from audio_encode import load_config, encode_section, resolve_formats, PCM_DIRNAME
+from tts_cache import AudioCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_SIZE_MB
+from tts_journal import CompletionJournal
+from tts_plan import load_models, text_features, DurationModel, DEFAULT_TOLERANCE
+from tts_timing import update_timing_file
+
+
+UNTRIMMED_DIRNAME = ".untrimmed"
+
+# Nach dem Schnitt bleibt ein Teil der Pause stehen (natürliches Ausklingen)
+KEEP_PAUSE_SECONDS = 0.3
+
+# Mindestlänge der Sprache nach der Pause, damit ein Schnitt sinnvoll ist
+MIN_TAIL_SECONDS = 0.5
+
+ENCODERS = {
+    '.mp3': ['-c:a', 'libmp3lame', '-q:a', '2'],
+    '.opus': ['-c:a', 'libopus', '-b:a', '64k'],
+    '.ogg': ['-c:a', 'libopus', '-b:a', '64k'],
+}
+
+
+def find_cut(silences, duration: float, predicted: float, tolerance: float) -> Optional[float]:
+    """
+    Schnittposition in Sekunden oder None.
+
+    Kandidaten sind Pausen, die frühestens bei predicted * (1 - tolerance)
+    beginnen und nach denen noch mindestens MIN_TAIL_SECONDS Audio folgt.
+    Gewählt wird die Pause, deren Beginn am nächsten am erwarteten Ende liegt.
+    """
+    candidates = [(start, end) for start, end in silences
+                  if start >= predicted * (1 - tolerance) and end <= duration - MIN_TAIL_SECONDS]
+    if not candidates:
+        return None
+    start, end = min(candidates, key=lambda silence: abs(silence[0] - predicted))
+    return start + min(KEEP_PAUSE_SECONDS, (end - start) / 2)
+
+
+def write_trimmed(source: Path, destination: Path, cut: float):
+    """Schreibt die ersten cut Sekunden von source nach destination"""
+    if source.suffix == '.pcm':
+        keep = int(cut * PCM_SAMPLE_RATE) * PCM_SAMPLE_WIDTH
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            dst.write(src.read(keep))
+        return
+
+    if source.suffix == '.wav':
+        with wave.open(str(source), 'rb') as src:
+            frames = src.readframes(int(cut * src.getframerate()))
+            with wave.open(str(destination), 'wb') as dst:
+                dst.setparams(src.getparams())
+                dst.writeframes(frames)
+        return
+
+    codec = ENCODERS.get(source.suffix)
+    if codec is None:
+        raise RuntimeError(f"Kein Encoder für {source.suffix}")
+    subprocess.run(['ffmpeg', '-v', 'error', '-y', '-i', str(source), '-t', f"{cut:.3f}", *codec,
+                    '-f', source.suffix.lstrip('.').replace('opus', 'ogg'), str(destination)],
+                   capture_output=True, check=True)
+
+
+def trim_file(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Worker (läuft im Process-Pool): analysiert und kürzt ein File.
+
+    Args:
+        job: {'section_id', 'file', 'predicted', 'tolerance', 'min_silence', 'untrimmed_dir', 'dry_run'}
+
+    Returns:
+        job-Felder plus duration, too_long, cut (None = keine passende Pause),
+        new_duration (nur wenn geschnitten wurde) bzw. error
+    """
+    path = Path(job['file'])
+    result = dict(job, cut=None)
+    try:
+        silences, duration = detect_silences(path, min_silence=job['min_silence'])
+        result['duration'] = duration
+        # Abschnitte in der erwarteten Länge nie kürzen, auch nicht mit --force
+        result['too_long'] = duration > job['predicted'] and \
+            DurationModel.is_outlier(job['predicted'], duration, job['tolerance'])
+        cut = find_cut(silences, duration, job['predicted'], job['tolerance'])
+        if cut is None or job['dry_run'] or not result['too_long']:
+            result['cut'] = cut
+            return result
+
+        # Original nur beim ersten Trimmen sichern, sonst ginge es beim zweiten Lauf verloren
+        untrimmed = Path(job['untrimmed_dir']) / path.name
+        untrimmed.parent.mkdir(parents=True, exist_ok=True)
+        if not untrimmed.exists():
+            shutil.copy2(path, untrimmed)
+
+        # Temp-Datei + rename: bricht auch einen Hardlink in den Audio-Cache auf
+        tmp_file = path.with_name(f".{path.name}.trim{path.suffix}")
+        try:
+            write_trimmed(path, tmp_file, cut)
+            os.replace(tmp_file, path)
+        finally:
+            tmp_file.unlink(missing_ok=True)
+
+        result['cut'] = cut
+        result['new_duration'] = probe_duration(path) or cut
+    except (OSError, RuntimeError, subprocess.CalledProcessError, wave.Error) as e:
+        result['error'] = str(e)
+    return result
+
+
+def trim_output_dir(output_dir: Path, jobs: int = os.cpu_count() or 1, tolerance: float = DEFAULT_TOLERANCE,
+                    min_silence: float = MIN_SILENCE_SECONDS, dry_run: bool = False,
+                    force: bool = False, cache: Optional[AudioCache] = None,
+                    formats: Optional[List[str]] = None,
+                    delivery_settings: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Kürzt alle Abschnitte eines Output-Verzeichnisses, die länger sind als erwartet.
+
+    Args:
+        output_dir: Verzeichnis mit timing.json und journal.jsonl
+        jobs: Anzahl Worker-Prozesse
+        tolerance: Relative Toleranz (wie beim Dauer-Check in fish_audio_tts.py)
+        min_silence: Mindestlänge der Pause vor dem angehängten Teil
+        dry_run: Nur analysieren, nichts schreiben
+        force: Auch Abschnitte analysieren, die laut timing.json nicht zu lang
+               sind (geschnitten wird trotzdem nur, wenn sie zu lang sind)
+        cache: Audio-Cache, dessen Einträge durch die gekürzten Files ersetzt werden
+        formats: Liefer-Formate, die aus einem gekürzten PCM-Master neu encodiert
+                 werden (default: delivery.formats aus config.json)
+        delivery_settings: Bitraten (default: delivery aus config.json)
+
+    Returns:
+        {section_id: Ergebnis von trim_file()}
+    """
+    output_dir = Path(output_dir)
+    with open(output_dir / "timing.json", 'r', encoding='utf-8') as f:
+        timing = json.load(f)
+
+    journal = CompletionJournal(output_dir)
+    duration_model, _ = load_models([output_dir], tolerance=tolerance)
+
+    work = []
+    for entry in timing['sections']:
+        journal_entry = journal.entries.get(entry['section_id'])
+        if not journal_entry or not journal_entry.get('text'):
+            continue
+        speed = journal_entry.get('params', {}).get('speed', 1.0)
+        predicted = duration_model.predict(text_features(journal_entry['text']), speed)
+        measured = entry['duration_seconds']
+        if not force and not (measured > predicted and duration_model.is_outlier(predicted, measured, tolerance)):
+            continue
+        # Bei --encode-Runs ist der PCM-Master die Quelle aller Liefer-Formate. Nur wenn das
+        # Journal auf ihn zeigt: ein späterer Run ohne --encode lässt einen veralteten Master liegen
+        pcm_master = output_dir / PCM_DIRNAME / f"{entry['section_id']}.pcm"
+        use_master = Path(journal_entry['file']).resolve() == pcm_master.resolve()
+        work.append({
+            'section_id': entry['section_id'],
+            'file': str(pcm_master) if use_master else entry['file'],
+            'predicted': predicted,
+            'tolerance': tolerance,
+            'min_silence': min_silence,
+            'untrimmed_dir': str(output_dir / UNTRIMMED_DIRNAME),
+            'dry_run': dry_run,
+        })
+
+    if not work:
+        return {}
+
+    with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(work)))) as pool:
+        results = {result['section_id']: result for result in pool.map(trim_file, work)}
+
+    trimmed = {section_id: result for section_id, result in results.items() if result.get('new_duration')}
+    if not trimmed:
+        return results
+
+    # Gekürzte PCM-Master in alle Liefer-Formate neu encodieren
+    delivered = {section_id: result['file'] for section_id, result in trimmed.items()}
+    masters = [section_id for section_id, result in trimmed.items() if Path(result['file']).suffix == '.pcm']
+    if masters:
+        config = load_config()
+        formats = formats or resolve_formats('config', config)
+        delivery_settings = delivery_settings or config.get('delivery')
+        with ProcessPoolExecutor(max_workers=max(1, jobs)) as pool, \
+                ThreadPoolExecutor(max_workers=max(1, jobs)) as threads:
+            encoded = threads.map(lambda section_id: encode_section(Path(trimmed[section_id]['file']), output_dir,
+                                                                    section_id, formats, delivery_settings,
+                                                                    pool=pool, force=True), masters)
+            for section_id, delivery in zip(masters, encoded):
+                delivered[section_id] = delivery['file']
+
+    updates = {}
+    for section_id, result in trimmed.items():
+        journal_entry = journal.entries[section_id]
+        journal.record(section_id, Path(result['file']), result['new_duration'], journal_entry['input_hash'],
+                       journal_entry['text'], journal_entry.get('params'))
+        if cache:
+            cache.store(journal_entry['input_hash'], Path(result['file']))
+        updates[section_id] = {'file': delivered[section_id], 'duration_seconds': result['new_duration'],
+                               'text': journal_entry['text']}
+    update_timing_file(output_dir, updates)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Angehängte Wörter am Ende von TTS-Abschnitten lokal abschneiden')
+    parser.add_argument('output_dir', type=Path, help='Verzeichnis mit timing.json und journal.jsonl')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1, help='Worker-Prozesse (default: CPU-Anzahl)')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Erlaubte relative Abweichung von der erwarteten Dauer (default: {DEFAULT_TOLERANCE})')
+    parser.add_argument('--min-silence', type=float, default=MIN_SILENCE_SECONDS,
+                        help=f'Mindestlänge der Pause vor dem angehängten Teil in Sekunden (default: {MIN_SILENCE_SECONDS})')
+    parser.add_argument('--force', action='store_true',
+                        help='Alle Abschnitte analysieren, nicht nur zu lange (geschnitten werden nur zu lange)')
+    parser.add_argument('--dry-run', action='store_true', help='Nur anzeigen, wo geschnitten würde')
+    parser.add_argument('--cache-dir', type=Path, help='Audio-Cache (default: cache.dir aus config.json)')
+    parser.add_argument('--no-cache', action='store_true', help='Audio-Cache nicht aktualisieren')
+    args = parser.parse_args()
+
+    if not (args.output_dir / "timing.json").exists():
+        print(f"ERROR: {args.output_dir / 'timing.json'} nicht gefunden")
+        return 1
+
+    cache = None
+    if not args.no_cache:
+        cache_config = load_config().get('cache', {})
+        cache = AudioCache(cache_dir=args.cache_dir or Path(cache_config.get('dir', DEFAULT_CACHE_DIR)),
+                           max_size_mb=cache_config.get('max_size_mb', DEFAULT_MAX_SIZE_MB))
+
+    results = trim_output_dir(args.output_dir, jobs=args.jobs, tolerance=args.tolerance,
+                              min_silence=args.min_silence, dry_run=args.dry_run, force=args.force,
+                              cache=cache)
+    if not results:
+        print("Keine Abschnitte länger als erwartet")
+        return 0
+
+    failed = 0
+    for section_id, result in results.items():
+        if result.get('error'):
+            failed += 1
+            print(f"FEHLER [{section_id}]: {result['error']}")
+        elif not result['too_long']:
+            print(f"[{section_id}] {result['duration']:.1f}s (erwartet ~{result['predicted']:.1f}s): "
+                  f"nicht zu lang, bleibt unverändert")
+        elif result['cut'] is None:
+            print(f"[{section_id}] {result['duration']:.1f}s (erwartet ~{result['predicted']:.1f}s): "
+                  f"keine passende Pause gefunden, bitte neu generieren")
+        elif args.dry_run:
+            print(f"[{section_id}] {result['duration']:.1f}s -> Schnitt bei {result['cut']:.2f}s "
+                  f"(erwartet ~{result['predicted']:.1f}s)")
+        else:
+            print(f"✓ [{section_id}] {result['duration']:.1f}s -> {result['new_duration']:.1f}s "
+                  f"(Original: {Path(args.output_dir) / UNTRIMMED_DIRNAME / Path(result['file']).name})")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
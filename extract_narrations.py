@@ -2,67 +2,100 @@
 """
 Extract narration texts from interlude and code tutorial files.
 Creates separate text files for each narration section for audio generation.
+
+Files are only rewritten when their content changed, and the set of
+added/changed/removed section ids is written to narrations/changes.json
+so synthesis can regenerate exactly those sections:
+
+    python3 regenerate_single.py --changes narrations/changes.json
 """
 
-import re
+import os
+import json
+import hashlib
 from pathlib import Path
 
+from narration_parser import parse_file
+
 
 def extract_interlude_narrations(interlude_file):
     """Extract narrations from interlude_value_proposition.md"""
-    with open(interlude_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Pattern to find narration sections
-    # Looking for: **Narration:**\n\n"text..."
-    pattern = r'### Section \d+: (.+?)\n\n\*\*Narration:\*\*\n\n"(.+?)"'
-    matches = re.findall(pattern, content, re.DOTALL)
-
-    narrations = []
-    for i, (title, text) in enumerate(matches, 1):
-        narrations.append({
-            'id': f'interlude_section{i}',
-            'title': title,
-            'text': text.strip()
-        })
+    sections = parse_file(interlude_file)['sections']
 
-    return narrations
+    return [
+        {'id': section['id'], 'title': section['title'], 'text': section['narration']}
+        for section in sections if section['kind'] == 'interlude'
+    ]
 
 
 def extract_code_narrations(code_file):
     """Extract narrations from codeyoutube.md"""
-    with open(code_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Pattern to find narration sections in code blocks
-    # Looking for: ## Block N: Title\n\n**Narration:**\n\n"text..."
-    pattern = r'## Block (\d+): (.+?)\n\n\*\*Narration:\*\*\n\n"(.+?)"'
-    matches = re.findall(pattern, content, re.DOTALL)
-
-    narrations = []
-    for block_num, title, text in matches:
-        narrations.append({
-            'id': f'block{block_num.zfill(2)}',
-            'title': title,
-            'text': text.strip()
-        })
+    sections = parse_file(code_file)['sections']
+
+    return [
+        {'id': section['id'], 'title': section['title'], 'text': section['narration']}
+        for section in sections if section['kind'] == 'block'
+    ]
+
+
+def write_if_changed(filepath, content):
+    """
+    Atomically write content, but only if it differs from the file on disk.
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    filepath = Path(filepath)
+    data = content.encode('utf-8')
+
+    if filepath.exists():
+        with open(filepath, 'rb') as f:
+            if hashlib.sha256(f.read()).digest() == hashlib.sha256(data).digest():
+                return False
+
+    tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, filepath)
+    return True
 
-    return narrations
 
+def new_change_set():
+    """Empty change set as written to changes.json"""
+    return {'added': [], 'changed': [], 'removed': [], 'unchanged': []}
 
-def save_narrations(narrations, output_dir):
-    """Save narrations to individual text files"""
+
+def save_narrations(narrations, output_dir, changes=None):
+    """
+    Save narrations to individual text files.
+
+    Only files whose text changed are rewritten; .txt files of sections
+    that no longer exist are removed. If a change set dict is given, the
+    section ids are recorded in it.
+    """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
+    if changes is None:
+        changes = new_change_set()
 
     manifest = []
+    written = set()
 
     for narration in narrations:
         filename = f"{narration['id']}.txt"
         filepath = output_dir / filename
-
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(narration['text'])
+        existed = filepath.exists()
+        written.add(filename)
+
+        if not write_if_changed(filepath, narration['text']):
+            changes['unchanged'].append(narration['id'])
+            print(f"= Unchanged: {filename}")
+        elif existed:
+            changes['changed'].append(narration['id'])
+            print(f"✓ Updated: {filename}")
+        else:
+            changes['added'].append(narration['id'])
+            print(f"✓ Created: {filename}")
 
         manifest.append({
             'id': narration['id'],
@@ -70,22 +103,36 @@ def save_narrations(narrations, output_dir):
             'file': filename
         })
 
-        print(f"✓ Created: {filename}")
+    for stale in sorted(output_dir.glob('*.txt')):
+        if stale.name not in written:
+            stale.unlink()
+            changes['removed'].append(stale.stem)
+            print(f"✗ Removed: {stale.name}")
 
     return manifest
 
 
+def write_change_set(changes, output_file):
+    """Write the machine-readable change set (added/changed/removed section ids)"""
+    write_if_changed(output_file, json.dumps(changes, indent=2) + '\n')
+
+    print(f"✓ Change set: {output_file}")
+    print(f"  {len(changes['added'])} added, {len(changes['changed'])} changed, "
+          f"{len(changes['removed'])} removed, {len(changes['unchanged'])} unchanged")
+
+
 def create_manifest(manifest, output_file):
     """Create a manifest file listing all narrations"""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write("# Narration Manifest\n\n")
-        f.write(f"Total sections: {len(manifest)}\n\n")
+    lines = ["# Narration Manifest\n\n", f"Total sections: {len(manifest)}\n\n"]
 
-        for item in manifest:
-            f.write(f"- **{item['id']}**: {item['title']}\n")
-            f.write(f"  File: `{item['file']}`\n\n")
+    for item in manifest:
+        lines.append(f"- **{item['id']}**: {item['title']}\n")
+        lines.append(f"  File: `{item['file']}`\n\n")
 
-    print(f"✓ Created manifest: {output_file}")
+    if write_if_changed(output_file, ''.join(lines)):
+        print(f"✓ Created manifest: {output_file}")
+    else:
+        print(f"= Manifest unchanged: {output_file}")
 
 
 def create_combined_narration(narrations, output_file):
@@ -99,13 +146,16 @@ def create_combined_narration(narrations, output_file):
         [next_section_id]
         Next narration text...
     """
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for narration in narrations:
-            f.write(f"[{narration['id']}]\n")
-            f.write(narration['text'])
-            f.write("\n\n")
-
-    print(f"✓ Created combined file: {output_file}")
+    parts = []
+    for narration in narrations:
+        parts.append(f"[{narration['id']}]\n")
+        parts.append(narration['text'])
+        parts.append("\n\n")
+
+    if write_if_changed(output_file, ''.join(parts)):
+        print(f"✓ Created combined file: {output_file}")
+    else:
+        print(f"= Combined file unchanged: {output_file}")
     print(f"  Format: Fish Audio TTS ready ([section_id] format)")
 
 
@@ -113,13 +163,15 @@ def main():
     print("Extracting narrations...\n")
 
     # Extract interlude narrations
+    changes = new_change_set()
+
     print("=== Interlude Sections ===")
     interlude_narrations = extract_interlude_narrations('interlude_value_proposition.md')
-    interlude_manifest = save_narrations(interlude_narrations, 'narrations/interlude')
+    interlude_manifest = save_narrations(interlude_narrations, 'narrations/interlude', changes)
 
     print(f"\n=== Code Tutorial Blocks ===")
     code_narrations = extract_code_narrations('codeyoutube.md')
-    code_manifest = save_narrations(code_narrations, 'narrations/code')
+    code_manifest = save_narrations(code_narrations, 'narrations/code', changes)
 
     # Create combined manifest
     print(f"\n=== Manifest ===")
@@ -131,6 +183,9 @@ def main():
     all_narrations = interlude_narrations + code_narrations
     create_combined_narration(all_narrations, 'narrations_combined.txt')
 
+    print(f"\n=== Change Set ===")
+    write_change_set(changes, 'narrations/changes.json')
+
     print(f"\n✓ Done! Extracted {len(interlude_narrations)} interlude sections and {len(code_narrations)} code blocks")
     print(f"  Total narrations: {len(all_manifest)}")
     print(f"\n📝 Use 'narrations_combined.txt' directly with fish_audio_tts.py")
@@ -13,10 +13,24 @@ GitHub SDK: https://github.com/fishaudio/fish-audio-python
 import os
 import sys
 import json
+import time
 import argparse
+import cProfile
+import pstats
 from pathlib import Path
-from typing import Optional, Dict, Any
-import subprocess
+from typing import Optional, Dict, Any, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from audio_duration import probe_duration, ffprobe_duration
+from tts_cache import AudioCache, make_cache_key, KEY_PARAMS, DEFAULT_CACHE_DIR, DEFAULT_MAX_SIZE_MB
+from tts_journal import CompletionJournal
+from tts_async import AsyncTTSEngine
+from audio_encode import encode_section, resolve_formats, PCM_DIRNAME
+from tts_trace import RunTracer, print_summary
+from tts_timing import (parse_narration_file, format_timestamp, build_timing_info, write_timing_file,
+                        update_timing_file)
+from tts_plan import (load_models, text_features, lpt_order, plan_sections, print_plan, find_outliers,
+                      MIN_SAMPLES, DEFAULT_TOLERANCE)
 
 # Config laden
 def load_config():
@@ -42,17 +56,18 @@ class FishAudioTTS:
     Wrapper-Klasse für Fish Audio TTS mit erweiterten Funktionen.
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         """
         Initialisiert den Fish Audio Client.
 
         Args:
             api_key: Fish Audio API Key (optional, nutzt FISH_API_KEY env var falls nicht angegeben)
+            base_url: API Basis-URL (optional, z.B. mock_fish_server.py für Tests)
         """
         if api_key:
             os.environ['FISH_API_KEY'] = api_key
 
-        self.client = FishAudio()
+        self.client = FishAudio(base_url=base_url) if base_url else FishAudio()
 
     def generate_audio(
         self,
@@ -66,7 +81,9 @@ class FishAudioTTS:
         temperature: float = 0.7,
         top_p: float = 0.7,
         repetition_penalty: float = 1.2,
-        reference_id: Optional[str] = None
+        reference_id: Optional[str] = None,
+        stream: bool = False,
+        stats: Optional[Dict[str, Any]] = None
     ) -> Path:
         """
         Generiert Audio aus Text.
@@ -83,6 +100,9 @@ class FishAudioTTS:
             top_p: Nucleus Sampling (0.0 - 1.0, default: 0.7, lower = less diverse)
             repetition_penalty: Penalty für Audio-Pattern-Wiederholungen (default: 1.2, higher = less repetition/hallucinations)
             reference_id: Voice Model ID für Custom Voice
+            stream: Audio chunkweise direkt auf Disk schreiben statt komplett im Speicher zu puffern
+            stats: Optionales Dict, wird mit ttfb_seconds, request_seconds, save_seconds
+                   und bytes befüllt (für Tracing)
 
         Returns:
             Path-Objekt zum generierten Audio-File
@@ -98,7 +118,30 @@ class FishAudioTTS:
             repetition_penalty=repetition_penalty
         )
 
+        output_file = Path(output_path)
+
+        if stream:
+            started = time.perf_counter()
+            chunks = self.client.tts.stream(
+                text=text,
+                model=model,
+                speed=speed,
+                config=config,
+                reference_id=reference_id
+            )
+            result = self._stream_to_file(chunks, output_file, started)
+            print(f"Audio gespeichert: {output_file} "
+                  f"(TTFB: {result['ttfb_seconds']:.2f}s, "
+                  f"{result['bytes'] / 1024:.0f} KB in {result['total_seconds']:.2f}s, "
+                  f"{result['throughput_kbps']:.0f} KB/s)")
+            if stats is not None:
+                # Beim Streaming überlappen Request und Schreiben
+                stats.update(ttfb_seconds=result['ttfb_seconds'], request_seconds=result['total_seconds'],
+                             save_seconds=0.0, bytes=result['bytes'])
+            return output_file
+
         # Audio generieren
+        started = time.perf_counter()
         audio = self.client.tts.convert(
             text=text,
             model=model,
@@ -107,13 +150,60 @@ class FishAudioTTS:
             reference_id=reference_id
         )
 
+        requested = time.perf_counter()
+
         # Speichern
-        output_file = Path(output_path)
         save(audio, str(output_file))
 
+        if stats is not None:
+            # Ohne Streaming ist das erste Byte erst mit der kompletten Antwort da
+            stats.update(ttfb_seconds=None, request_seconds=requested - started,
+                         save_seconds=time.perf_counter() - requested, bytes=output_file.stat().st_size)
+
         print(f"Audio gespeichert: {output_file}")
         return output_file
 
+    @staticmethod
+    def _stream_to_file(chunks, output_file: Path, started: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Schreibt Audio-Chunks in eine temporäre Datei und benennt sie am Ende atomar um.
+
+        Args:
+            chunks: Iterator über bytes-Chunks (z.B. von client.tts.stream)
+            output_file: Ziel-Datei
+            started: perf_counter()-Zeitpunkt des Requests (default: jetzt)
+
+        Returns:
+            Dict mit ttfb_seconds, total_seconds, bytes, throughput_kbps
+        """
+        if started is None:
+            started = time.perf_counter()
+        ttfb = None
+        total_bytes = 0
+        tmp_file = output_file.with_name(f".{output_file.name}.part")
+
+        try:
+            with open(tmp_file, 'wb') as f:
+                for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if ttfb is None:
+                        ttfb = time.perf_counter() - started
+                    f.write(chunk)
+                    total_bytes += len(chunk)
+            os.replace(tmp_file, output_file)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+
+        total = time.perf_counter() - started
+        return {
+            'ttfb_seconds': ttfb if ttfb is not None else total,
+            'total_seconds': total,
+            'bytes': total_bytes,
+            'throughput_kbps': total_bytes / 1024 / total if total > 0 else 0.0
+        }
+
     def add_pauses(self, text: str, pause_duration: str = "short") -> str:
         """
         Fügt Pausen zum Text hinzu.
@@ -159,52 +249,56 @@ class FishAudioTTS:
         """
         Ermittelt die Dauer eines Audio-Files.
 
+        Liest die Dauer direkt aus den Datei-Headern (siehe audio_duration.py),
+        ffprobe wird nur als Fallback für unbekannte Formate genutzt.
+
         Args:
             audio_path: Pfad zum Audio-File
 
         Returns:
             Dict mit Dauer-Informationen
+
+        Raises:
+            RuntimeError: Dauer nicht lesbar (eine 0 würde die Timeline verschieben)
         """
-        try:
-            # ffprobe für Dauer-Ermittlung
-            result = subprocess.run(
-                [
-                    'ffprobe',
-                    '-v', 'quiet',
-                    '-print_format', 'json',
-                    '-show_format',
-                    str(audio_path)
-                ],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+        duration = probe_duration(audio_path)
+        source = 'header'
 
-            data = json.loads(result.stdout)
-            duration = float(data['format']['duration'])
+        if duration is None:
+            duration = ffprobe_duration(audio_path)
+            source = 'ffprobe'
 
-            minutes = int(duration // 60)
-            seconds = int(duration % 60)
+        if not duration:
+            raise RuntimeError(f"Konnte Dauer nicht ermitteln: {audio_path} "
+                               f"(Tipp: ffmpeg installieren für Dauer-Analyse unbekannter Formate)")
 
-            return {
-                'duration_seconds': duration,
-                'duration_formatted': f"{minutes}:{seconds:02d}",
-                'file': str(audio_path)
-            }
-        except Exception as e:
-            print(f"WARNUNG: Konnte Dauer nicht ermitteln: {e}")
-            print("Tipp: ffmpeg installieren für Dauer-Analyse")
-            return {
-                'duration_seconds': 0,
-                'duration_formatted': "Unknown",
-                'file': str(audio_path)
-            }
+        minutes = int(duration // 60)
+        seconds = int(duration % 60)
+
+        return {
+            'duration_seconds': duration,
+            'duration_formatted': f"{minutes}:{seconds:02d}",
+            'duration_source': source,
+            'file': str(audio_path)
+        }
 
 
 def generate_from_narration_file(
     narration_file: Path,
     output_dir: Path,
     api_key: Optional[str] = None,
+    workers: int = 1,
+    cache: Optional[AudioCache] = None,
+    refresh: Optional[List[str]] = None,
+    engine: str = "sdk",
+    base_url: Optional[str] = None,
+    max_concurrency: int = 16,
+    max_retries: int = 5,
+    resume: bool = False,
+    duration_tolerance: Optional[float] = DEFAULT_TOLERANCE,
+    max_resynth: int = 2,
+    encode_formats: Optional[List[str]] = None,
+    delivery_settings: Optional[Dict[str, Any]] = None,
     **kwargs
 ):
     """
@@ -221,65 +315,276 @@ def generate_from_narration_file(
         narration_file: Pfad zur Narration-Datei
         output_dir: Output-Verzeichnis für Audio-Files
         api_key: Fish Audio API Key
+        workers: Anzahl paralleler API-Requests (default: 1 = sequentiell)
+        cache: AudioCache für unveränderte Abschnitte (None = kein Cache)
+        refresh: Section-IDs, die trotz Cache-Eintrag neu generiert werden
+        engine: "sdk" (FishAudioTTS, Threads) oder "async" (AsyncTTSEngine mit
+                adaptiver Concurrency und Retries, workers = Start-Concurrency)
+        base_url: API Basis-URL (optional, z.B. Mock-Server)
+        max_concurrency: Obergrenze paralleler Requests (nur engine="async")
+        max_retries: Retries pro Abschnitt bei 429/5xx (nur engine="async")
+        resume: Abschnitte überspringen, die laut Journal mit identischem Input fertig sind
+        duration_tolerance: Erlaubte relative Abweichung der Dauer von der Vorhersage
+                            (None = kein Dauer-Check)
+        max_resynth: Maximale Neu-Generierungen für Dauer-Ausreißer (0 = nur warnen)
+        encode_formats: Einmal "pcm" holen und lokal in diese Formate encodieren
+                        (z.B. ["mp3", "opus", "wav"], das erste landet in timing.json)
+        delivery_settings: Bitraten für das lokale Encoding (siehe audio_encode.py)
         **kwargs: Zusätzliche Parameter für generate_audio()
     """
-    tts = FishAudioTTS(api_key=api_key)
-
-    # Narration-Datei einlesen
-    with open(narration_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+    tts = FishAudioTTS(api_key=api_key, base_url=base_url)
+    tracer = RunTracer()
 
     # Abschnitte parsen
-    sections = {}
-    current_section = None
-
-    for line in content.split('\n'):
-        line = line.strip()
-        if line.startswith('[') and line.endswith(']'):
-            current_section = line[1:-1]
-            sections[current_section] = []
-        elif current_section and line:
-            sections[current_section].append(line)
-
-    # Jeden Abschnitt verarbeiten
+    sections = parse_narration_file(narration_file)
+
     output_dir.mkdir(parents=True, exist_ok=True)
-    timing_info = []
-    cumulative_time = 0
+    workers = max(1, min(workers, len(sections) or 1))
+    refresh = set(refresh or [])
+
+    encode_pool = None
+    if encode_formats:
+        # Ein API-Call pro Abschnitt, alle Liefer-Formate entstehen lokal (siehe audio_encode.py)
+        kwargs = dict(kwargs, format='pcm')
+        (output_dir / PCM_DIRNAME).mkdir(exist_ok=True)
+        encode_pool = ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, len(encode_formats) * workers))
 
     print(f"\n{'='*60}")
-    print(f"Verarbeite {len(sections)} Abschnitte...")
+    print(f"Verarbeite {len(sections)} Abschnitte ({workers} Worker, Engine: {engine})...")
     print(f"{'='*60}\n")
 
-    for section_id, lines in sections.items():
-        text = ' '.join(lines)
-        output_file = output_dir / f"{section_id}.mp3"
+    def section_file(section_id: str) -> Path:
+        if encode_formats:
+            return output_dir / PCM_DIRNAME / f"{section_id}.pcm"
+        return output_dir / f"{section_id}.mp3"
+
+    def input_key(section_id: str, text: str) -> str:
+        with tracer.span(section_id, 'text_prep', chars=len(text)):
+            return make_cache_key(text, kwargs)
+
+    def fetch_cached(section_id: str, text: str, input_hash: str) -> bool:
+        if not cache or section_id in refresh:
+            return False
+        with tracer.span(section_id, 'cache_lookup') as attrs:
+            attrs['hit'] = cache.fetch(input_hash, section_file(section_id))
+        if attrs['hit']:
+            print(f"[{section_id}] Cache-Hit: {section_file(section_id)}")
+        return attrs['hit']
+
+    journal = CompletionJournal(output_dir)
+    journal_params = {name: kwargs[name] for name in KEY_PARAMS if name in kwargs}
+
+    # Bereits fertige Abschnitte aus dem Journal übernehmen
+    resumed = {}
+    if resume:
+        for section_id, text in sections.items():
+            if section_id in refresh:
+                continue
+            entry = journal.completed(section_id, make_cache_key(text, kwargs))
+            if entry and encode_formats and Path(entry['file']).resolve() != section_file(section_id).resolve():
+                # Eintrag eines Runs ohne --encode: kein PCM-Master, aus dem encodiert werden könnte
+                entry = None
+            if entry:
+                delivered_file = entry['file']
+                if encode_formats:
+                    # Fehlende Liefer-Formate aus dem PCM-Master nachholen
+                    delivered_file = encode_section(section_file(section_id), output_dir, section_id, encode_formats,
+                                                    delivery_settings, pool=encode_pool)['file']
+                resumed[section_id] = {
+                    'section_id': section_id,
+                    'file': delivered_file,
+                    'duration_seconds': entry['duration_seconds'],
+                    'text': text
+                }
+        print(f"Resume: {len(resumed)} von {len(sections)} Abschnitten aus {journal.path} übernommen\n")
+
+    pending_sections = {section_id: text for section_id, text in sections.items() if section_id not in resumed}
+
+    if workers > 1 or engine == "async":
+        # Longest-first (LPT): lange Abschnitte zuerst, damit keiner am Ende allein die Laufzeit bestimmt
+        duration_model, throughput_model = load_models([output_dir])
+        estimates = {section_id: throughput_model.predict(
+                         duration_model.predict(text_features(text), kwargs.get('speed', 1.0)))
+                     for section_id, text in pending_sections.items()}
+        pending_sections = {section_id: pending_sections[section_id] for section_id in lpt_order(estimates)}
+
+    def finish_section(section_id: str, text: str, input_hash: str, generated: bool,
+                       started: float) -> Dict[str, Any]:
+        output_file = section_file(section_id)
+        if encode_formats:
+            # Dauer exakt aus der Sample-Anzahl, kein Probe der encodierten Files
+            with tracer.span(section_id, 'encode', formats=','.join(encode_formats)):
+                delivery = encode_section(output_file, output_dir, section_id, encode_formats,
+                                          delivery_settings, pool=encode_pool, force=True)
+            delivered_file = Path(delivery['file'])
+            duration_seconds = delivery['duration_seconds']
+        else:
+            # Dauer ermitteln
+            with tracer.span(section_id, 'duration_probe') as attrs:
+                duration_info = tts.generate_duration_info(output_file)
+                attrs['source'] = duration_info['duration_source']
+            delivered_file = output_file
+            duration_seconds = duration_info['duration_seconds']
+
+        # Erst nach der Dauer cachen: ein unlesbares File soll nicht bei jedem Run als Cache-Hit zurückkommen
+        if generated and cache:
+            with tracer.span(section_id, 'cache_store'):
+                cache.store(input_hash, output_file)
+
+        with tracer.span(section_id, 'journal'):
+            journal.record(section_id, output_file, duration_seconds, input_hash, text, journal_params)
+
+        tracer.record(section_id, 'section', started, tracer.now() - started, chars=len(text),
+                      duration_seconds=duration_seconds, cached=not generated)
+        return {
+            'section_id': section_id,
+            'file': str(delivered_file),
+            'duration_seconds': duration_seconds,
+            'text': text
+        }
 
+    def process_section(section_id: str, text: str, submitted: float) -> Dict[str, Any]:
+        started = tracer.now()
+        tracer.record(section_id, 'queue_wait', submitted, started - submitted)
         print(f"\n[{section_id}]")
         print(f"Text: {text[:100]}...")
 
+        input_hash = input_key(section_id, text)
+        if fetch_cached(section_id, text, input_hash):
+            return finish_section(section_id, text, input_hash, generated=False, started=started)
+
+        # Alte Datei entfernen, damit ein Hardlink in den Cache nicht überschrieben wird
+        output_file = section_file(section_id)
+        output_file.unlink(missing_ok=True)
+
         # Audio generieren
-        audio_path = tts.generate_audio(
+        request = {}
+        request_started = tracer.now()
+        tts.generate_audio(
             text=text,
             output_path=str(output_file),
+            stats=request,
             **kwargs
         )
+        tracer.record(section_id, 'api_request', request_started, request['request_seconds'],
+                      ttfb_seconds=request['ttfb_seconds'], bytes=request['bytes'], attempts=1, retries=0)
+        if request['save_seconds']:
+            tracer.record(section_id, 'save', request_started + request['request_seconds'],
+                          request['save_seconds'])
+        return finish_section(section_id, text, input_hash, generated=True, started=started)
+
+    def write_trace(outliers: Optional[Dict[str, Dict[str, float]]] = None):
+        summary = tracer.write(output_dir, extra={
+            'engine': engine,
+            'workers': workers,
+            'resumed': len(resumed),
+            'params': journal_params,
+            'duration_outliers': outliers or {},
+        })
+        print_summary(summary)
+        print(f"Trace: {output_dir / 'trace.jsonl'}, Metriken: {output_dir / 'metrics.json'}")
 
-        # Dauer ermitteln
-        duration_info = tts.generate_duration_info(audio_path)
-
-        # Timing berechnen
-        start_time = cumulative_time
-        end_time = start_time + duration_info['duration_seconds']
-        cumulative_time = end_time
+    async_engine = None
+    if engine == "async":
+        async_engine = AsyncTTSEngine(
+            api_key=api_key,
+            base_url=base_url,
+            initial_concurrency=workers,
+            max_concurrency=max(workers, max_concurrency),
+            max_retries=max_retries
+        )
 
-        timing_info.append({
-            'section_id': section_id,
-            'file': str(output_file),
-            'duration_seconds': duration_info['duration_seconds'],
-            'start': f"{int(start_time//60)}:{int(start_time%60):02d}",
-            'end': f"{int(end_time//60)}:{int(end_time%60):02d}",
-            'text_preview': text[:100]
-        })
+    def run_batch(batch: Dict[str, str]) -> List[Dict[str, Any]]:
+        if async_engine:
+            # Cache-Hits vorab auflösen, den Rest nebenläufig mit Retries generieren
+            input_hashes = {section_id: input_key(section_id, text) for section_id, text in batch.items()}
+            cached = {section_id for section_id, text in batch.items()
+                      if fetch_cached(section_id, text, input_hashes[section_id])}
+            pending = [(section_id, text, section_file(section_id))
+                       for section_id, text in batch.items() if section_id not in cached]
+            for _, _, output_file in pending:
+                output_file.unlink(missing_ok=True)
+
+            outcomes = async_engine.run_sync(pending, **kwargs)
+            failed = {section_id: outcome for section_id, outcome in outcomes.items()
+                      if isinstance(outcome, BaseException)}
+
+            batch_results = []
+            for section_id, text in batch.items():
+                if section_id in failed:
+                    continue
+                outcome = outcomes.get(section_id)
+                if outcome is None:
+                    started = tracer.now()
+                else:
+                    # Engine misst mit perf_counter, Spans sind relativ zum Run-Beginn
+                    started = outcome['started'] - tracer.started
+                    tracer.record(section_id, 'queue_wait', started, outcome['queue_seconds'])
+                    tracer.record(section_id, 'api_request', started + outcome['queue_seconds'],
+                                  outcome['elapsed_seconds'] - outcome['queue_seconds'],
+                                  ttfb_seconds=outcome['ttfb_seconds'], bytes=outcome['bytes'],
+                                  attempts=outcome['attempts'], retries=outcome['attempts'] - 1)
+                batch_results.append(finish_section(section_id, text, input_hashes[section_id],
+                                                    generated=section_id not in cached, started=started))
+
+            print(f"\nRequests: {async_engine.stats['requests']}, Retries: {async_engine.stats['retries']}, "
+                  f"429: {async_engine.stats['throttled']}, Peak-Concurrency: {async_engine.stats['peak_concurrency']}")
+
+            if failed:
+                # Erfolgreiche Abschnitte liegen bereits im Cache, ein erneuter Run holt nur die fehlenden nach
+                for section_id, error in failed.items():
+                    print(f"FEHLER [{section_id}]: {error}")
+                write_trace()
+                raise RuntimeError(f"{len(failed)} von {len(batch)} Abschnitten fehlgeschlagen: {', '.join(failed)}")
+            return batch_results
+
+        # Jeden Abschnitt verarbeiten (bei workers > 1 parallel, Reihenfolge bleibt erhalten)
+        if workers == 1:
+            submitted = tracer.now()
+            return [process_section(section_id, text, submitted) for section_id, text in batch.items()]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(process_section, section_id, text, tracer.now())
+                       for section_id, text in batch.items()]
+            return [future.result() for future in futures]
+
+    results = run_batch(pending_sections)
+
+    # Abschnitte, deren Dauer stark von der Vorhersage abweicht (z.B. angehängte
+    # Wörter am Ende, siehe ANTI_HALLUCINATION_FIX.md), gezielt neu generieren
+    outliers = {}
+    if duration_tolerance is not None:
+        for resynthesis in range(max_resynth + 1):
+            duration_model, _ = load_models([output_dir], tolerance=duration_tolerance)
+            if duration_model.samples < MIN_SAMPLES:
+                print(f"\nDauer-Check übersprungen: zu wenig Abschnitte zur Kalibrierung ({duration_model.samples})")
+                break
+            outliers = find_outliers(results, duration_model, kwargs.get('speed', 1.0), duration_tolerance)
+            if not outliers or resynthesis == max_resynth:
+                break
+
+            print(f"\nDauer-Ausreißer (Durchgang {resynthesis + 1}/{max_resynth}), generiere neu:")
+            for section_id, outlier in outliers.items():
+                print(f"  [{section_id}] {outlier['measured']:.1f}s statt ~{outlier['predicted']:.1f}s "
+                      f"({outlier['deviation'] * 100:+.0f}%)")
+            refresh.update(outliers)
+            regenerated = {result['section_id']: result
+                           for result in run_batch({section_id: pending_sections[section_id] for section_id in outliers})}
+            results = [regenerated.get(result['section_id'], result) for result in results]
+
+        for section_id, outlier in outliers.items():
+            print(f"WARNUNG [{section_id}]: Dauer {outlier['measured']:.1f}s weicht weiterhin von "
+                  f"~{outlier['predicted']:.1f}s ab ({outlier['deviation'] * 100:+.0f}%), bitte anhören")
+
+    if encode_pool:
+        encode_pool.shutdown()
+
+    # Journal-Einträge und neue Ergebnisse in Original-Reihenfolge zusammenführen
+    results_by_id = {result['section_id']: result for result in results}
+    results_by_id.update(resumed)
+    results = [results_by_id[section_id] for section_id in sections]
+
+    # Timing erst berechnen, wenn alle Abschnitte fertig sind
+    timing_info, total_duration = build_timing_info(results)
 
     # Timing-Übersicht ausgeben
     print(f"\n{'='*60}")
@@ -294,62 +599,22 @@ def generate_from_narration_file(
         print(f"  Text:     {info['text_preview']}...")
         print()
 
-    total_duration = cumulative_time
-    print(f"Gesamt-Dauer: {int(total_duration//60)}:{int(total_duration%60):02d}")
+    print(f"Gesamt-Dauer: {format_timestamp(total_duration)}")
+
+    if cache:
+        cache_stats = cache.stats()
+        print(f"Cache: {cache_stats['hits']} Hits, {cache_stats['misses']} Misses "
+              f"({cache_stats['entries']} Einträge, {cache_stats['size_bytes'] / 1024 / 1024:.1f} MB)")
 
     # Timing als JSON speichern
-    timing_file = output_dir / "timing.json"
-    with open(timing_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            'sections': timing_info,
-            'total_duration_seconds': total_duration,
-            'total_duration_formatted': f"{int(total_duration//60)}:{int(total_duration%60):02d}"
-        }, f, indent=2, ensure_ascii=False)
+    timing_file = write_timing_file(output_dir, timing_info, total_duration)
 
     print(f"\nTiming-Daten gespeichert: {timing_file}")
+    write_trace(outliers)
 
 
-def main():
-    """CLI Interface"""
-    parser = argparse.ArgumentParser(
-        description='Fish Audio TTS Generator',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Beispiele:
-
-  # Einzelner Text zu Audio:
-  python fish_audio_tts.py --text "Hallo Welt" --output hallo.mp3
-
-  # Mit Pausen:
-  python fish_audio_tts.py --text "Hallo (break)(break) Welt" --output hallo.mp3 --no-normalize
-
-  # Mit Emotion:
-  python fish_audio_tts.py --text "(excited) Das ist großartig!" --output excited.mp3 --no-normalize
-
-  # Aus Narration-Datei:
-  python fish_audio_tts.py --narration-file narration.md --output-dir ./audio/
-
-Pause-Tags:
-  (break)          - Kurze Pause
-  (break)(break)   - Mittlere Pause
-  (break)(break)(break) - Lange Pause
-
-Emotion-Tags:
-  (laugh), (sigh), (cough), (angry), (sad), (excited), (surprised)
-
-WICHTIG: Bei Verwendung von Control Tags --no-normalize setzen!
-        """
-    )
-
-    # Input-Optionen
-    input_group = parser.add_mutually_exclusive_group(required=True)
-    input_group.add_argument('--text', '-t', help='Text für TTS')
-    input_group.add_argument('--narration-file', '-n', type=Path, help='Narration-Datei (Format: [section_id]\\ntext)')
-
-    # Output-Optionen
-    parser.add_argument('--output', '-o', help='Output-Datei (für --text)')
-    parser.add_argument('--output-dir', '-d', type=Path, help='Output-Verzeichnis (für --narration-file)')
-
+def add_tts_arguments(parser: argparse.ArgumentParser):
+    """Fügt TTS-, Cache- und API-Optionen hinzu (gemeinsam mit regenerate_single.py)"""
     # TTS-Parameter
     parser.add_argument('--speed', type=float, default=1.0, help='Sprechgeschwindigkeit (0.5-2.0, default: 1.0)')
     parser.add_argument('--volume', type=int, default=0, help='Lautstärke in dB (default: 0)')
@@ -358,13 +623,27 @@ WICHTIG: Bei Verwendung von Control Tags --no-normalize setzen!
     parser.add_argument('--no-normalize', action='store_true', help='Normalisierung deaktivieren (für Control Tags!)')
     parser.add_argument('--temperature', type=float, default=0.7, help='Expressivität (0.0-1.0, default: 0.7)')
     parser.add_argument('--top-p', type=float, default=0.7, help='Nucleus Sampling (0.0-1.0, default: 0.7)')
+    parser.add_argument('--stream', action='store_true', help='Audio während des Downloads direkt auf Disk streamen')
+    parser.add_argument('--repetition-penalty', type=float, default=1.2, help='Penalty für Wiederholungen (default: 1.2)')
     parser.add_argument('--reference-id', help='Custom Voice Reference ID')
 
-    # API Key
+    # Cache-Optionen
+    parser.add_argument('--no-cache', action='store_true', help='Audio-Cache deaktivieren (immer neu generieren)')
+    parser.add_argument('--cache-dir', type=Path, help=f'Cache-Verzeichnis (default: {DEFAULT_CACHE_DIR.name}/)')
+    parser.add_argument('--cache-max-mb', type=float, help=f'Maximale Cache-Größe in MB (default: {DEFAULT_MAX_SIZE_MB})')
+
+    # API-Optionen
+    parser.add_argument('--base-url', help='API Basis-URL (z.B. http://127.0.0.1:8765 für mock_fish_server.py)')
     parser.add_argument('--api-key', help='Fish Audio API Key (oder FISH_API_KEY env var)')
 
-    args = parser.parse_args()
 
+def resolve_tts_settings(args: argparse.Namespace) -> Tuple[Dict[str, Any], str, Optional[str], Dict[str, Any]]:
+    """
+    Kombiniert CLI-Argumente mit config.json.
+
+    Returns:
+        (config, api_key, base_url, tts_params)
+    """
     # Config laden
     config = load_config()
     fish_config = config.get('fish_audio', {})
@@ -377,6 +656,9 @@ WICHTIG: Bei Verwendung von Control Tags --no-normalize setzen!
         print("Bitte setzen in config.json, mit --api-key oder als FISH_API_KEY Environment Variable")
         sys.exit(1)
 
+    # API Basis-URL (Priorität: CLI arg > config.json > SDK-Default)
+    base_url = args.base_url or fish_config.get('base_url')
+
     # Voice ID (Priorität: CLI arg > config.json)
     reference_id = args.reference_id or fish_config.get('voice_id') or None
 
@@ -389,17 +671,35 @@ WICHTIG: Bei Verwendung von Control Tags --no-normalize setzen!
         'normalize': not args.no_normalize if args.no_normalize else not default_settings.get('normalize', False),
         'temperature': args.temperature if args.temperature != 0.7 else default_settings.get('temperature', 0.7),
         'top_p': args.top_p if args.top_p != 0.7 else default_settings.get('top_p', 0.7),
-        'reference_id': reference_id
+        'repetition_penalty': args.repetition_penalty if args.repetition_penalty != 1.2 else default_settings.get('repetition_penalty', 1.2),
+        'reference_id': reference_id,
+        'stream': args.stream
     }
 
-    # Verarbeitung
+    return config, api_key, base_url, tts_params
+
+
+def create_cache(args: argparse.Namespace, config: Dict[str, Any]) -> Optional[AudioCache]:
+    """Erstellt den Audio-Cache (Priorität: CLI arg > config.json > Default), None bei --no-cache"""
+    if args.no_cache:
+        return None
+    cache_config = config.get('cache', {})
+    return AudioCache(
+        cache_dir=args.cache_dir or Path(cache_config.get('dir', DEFAULT_CACHE_DIR)),
+        max_size_mb=args.cache_max_mb or cache_config.get('max_size_mb', DEFAULT_MAX_SIZE_MB)
+    )
+
+
+def run(args: argparse.Namespace, config: Dict[str, Any], api_key: str, base_url: Optional[str],
+        tts_params: Dict[str, Any]):
+    """Führt den Run für --text bzw. --narration-file aus"""
     if args.text:
         # Einzelner Text
         if not args.output:
             print("ERROR: --output erforderlich für --text")
             sys.exit(1)
 
-        tts = FishAudioTTS(api_key=api_key)
+        tts = FishAudioTTS(api_key=api_key, base_url=base_url)
         tts.generate_audio(
             text=args.text,
             output_path=args.output,
@@ -407,8 +707,12 @@ WICHTIG: Bei Verwendung von Control Tags --no-normalize setzen!
         )
 
         # Dauer ausgeben
-        duration_info = tts.generate_duration_info(Path(args.output))
-        print(f"\nDauer: {duration_info['duration_formatted']}")
+        try:
+            duration_info = tts.generate_duration_info(Path(args.output))
+        except RuntimeError as e:
+            print(f"WARNUNG: {e}")
+        else:
+            print(f"\nDauer: {duration_info['duration_formatted']}")
 
     elif args.narration_file:
         # Narration-Datei
@@ -416,13 +720,151 @@ WICHTIG: Bei Verwendung von Control Tags --no-normalize setzen!
             print("ERROR: --output-dir erforderlich für --narration-file")
             sys.exit(1)
 
+        cache = create_cache(args, config)
+
+        encode_formats = None
+        if args.encode:
+            try:
+                encode_formats = resolve_formats(args.encode, config)
+            except ValueError as e:
+                print(f"ERROR: {e}")
+                sys.exit(1)
+
         generate_from_narration_file(
             narration_file=args.narration_file,
             output_dir=args.output_dir,
             api_key=api_key,
+            workers=args.workers,
+            cache=cache,
+            refresh=args.refresh,
+            engine=args.engine,
+            base_url=base_url,
+            max_concurrency=args.max_concurrency,
+            max_retries=args.max_retries,
+            resume=args.resume,
+            duration_tolerance=None if args.no_duration_check else args.duration_tolerance,
+            max_resynth=max(0, args.max_resynth),
+            encode_formats=encode_formats,
+            delivery_settings=config.get('delivery'),
             **tts_params
         )
 
+
+def plan(args: argparse.Namespace):
+    """Dry-Run: schätzt Dauer, API-Zeit und Makespan aus früheren Runs"""
+    if not args.narration_file:
+        print("ERROR: --plan erfordert --narration-file")
+        sys.exit(1)
+
+    default_settings = load_config().get('fish_audio', {}).get('default_settings', {})
+    speed = args.speed if args.speed != 1.0 else default_settings.get('speed', 1.0)
+    history = args.history or ([args.output_dir] if args.output_dir else [])
+
+    sections = parse_narration_file(args.narration_file)
+    print_plan(plan_sections(sections, history, workers=max(1, args.workers), speed=speed))
+
+
+def main():
+    """CLI Interface"""
+    parser = argparse.ArgumentParser(
+        description='Fish Audio TTS Generator',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Beispiele:
+
+  # Einzelner Text zu Audio:
+  python fish_audio_tts.py --text "Hallo Welt" --output hallo.mp3
+
+  # Mit Pausen:
+  python fish_audio_tts.py --text "Hallo (break)(break) Welt" --output hallo.mp3 --no-normalize
+
+  # Mit Emotion:
+  python fish_audio_tts.py --text "(excited) Das ist großartig!" --output excited.mp3 --no-normalize
+
+  # Aus Narration-Datei:
+  python fish_audio_tts.py --narration-file narration.md --output-dir ./audio/
+
+  # Einzelnen Abschnitt trotz Cache neu generieren:
+  python fish_audio_tts.py --narration-file narration.md --output-dir ./audio/ --refresh block03
+
+  # Aus Narration-Datei mit 4 parallelen Requests:
+  python fish_audio_tts.py --narration-file narration.md --output-dir ./audio/ --workers 4
+
+  # Einmal PCM holen, MP3/Opus/WAV lokal encodieren:
+  python fish_audio_tts.py --narration-file narration.md --output-dir ./audio/ --encode mp3,opus,wav
+
+  # Vorher Dauer, API-Zeit und Makespan schätzen (ohne API-Requests):
+  python fish_audio_tts.py --narration-file narration.md --output-dir ./audio/ --workers 4 --plan
+
+Pause-Tags:
+  (break)          - Kurze Pause
+  (break)(break)   - Mittlere Pause
+  (break)(break)(break) - Lange Pause
+
+Emotion-Tags:
+  (laugh), (sigh), (cough), (angry), (sad), (excited), (surprised)
+
+WICHTIG: Bei Verwendung von Control Tags --no-normalize setzen!
+        """
+    )
+
+    # Input-Optionen
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument('--text', '-t', help='Text für TTS')
+    input_group.add_argument('--narration-file', '-n', type=Path, help='Narration-Datei (Format: [section_id]\\ntext)')
+
+    # Output-Optionen
+    parser.add_argument('--output', '-o', help='Output-Datei (für --text)')
+    parser.add_argument('--output-dir', '-d', type=Path, help='Output-Verzeichnis (für --narration-file)')
+    parser.add_argument('--resume', action='store_true', help='Unveränderte, bereits fertige Abschnitte laut Journal überspringen')
+    parser.add_argument('--workers', '-w', type=int, default=1, help='Parallele API-Requests (für --narration-file, default: 1)')
+    parser.add_argument('--refresh', action='append', default=[], metavar='SECTION_ID', help='Abschnitt trotz Cache neu generieren (mehrfach angebbar)')
+
+    # Engine-Optionen
+    parser.add_argument('--engine', choices=['sdk', 'async'], default='sdk', help='sdk = Fish Audio SDK, async = AIMD-Concurrency mit Retries (default: sdk)')
+    parser.add_argument('--max-concurrency', type=int, default=16, help='Obergrenze paralleler Requests für --engine async (default: 16)')
+    parser.add_argument('--max-retries', type=int, default=5, help='Retries pro Abschnitt bei 429/5xx für --engine async (default: 5)')
+    # Dauer-Check
+    parser.add_argument('--duration-tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Erlaubte relative Abweichung von der vorhergesagten Dauer (default: {DEFAULT_TOLERANCE})')
+    parser.add_argument('--max-resynth', type=int, default=2,
+                        help='Dauer-Ausreißer maximal so oft neu generieren (0 = nur warnen, default: 2)')
+    parser.add_argument('--no-duration-check', action='store_true', help='Dauer-Check nach der Generierung deaktivieren')
+
+    parser.add_argument('--encode', nargs='?', const='config', metavar='FORMATS',
+                        help='Einmal PCM holen und lokal encodieren, z.B. mp3,opus,wav '
+                             '(ohne Wert: delivery.formats aus config.json, für --narration-file)')
+
+    parser.add_argument('--plan', action='store_true', help='Nur planen: Zeichen, Tags, geschätzte Dauer/API-Zeit und Makespan (keine API-Requests)')
+    parser.add_argument('--history', action='append', default=[], type=Path, metavar='DIR',
+                        help='Output-Verzeichnis eines früheren Runs zur Kalibrierung von --plan (mehrfach angebbar, default: --output-dir)')
+    parser.add_argument('--profile', action='store_true', help='Run mit cProfile messen (Haupt-Thread, für Hotspots --workers 1), Stats nach profile.pstats schreiben')
+
+    add_tts_arguments(parser)
+
+    args = parser.parse_args()
+
+    if args.plan:
+        return plan(args)
+
+    config, api_key, base_url, tts_params = resolve_tts_settings(args)
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            run(args, config, api_key, base_url, tts_params)
+        finally:
+            profiler.disable()
+            profile_dir = args.output_dir or Path(args.output or '.').parent
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            profile_file = profile_dir / 'profile.pstats'
+            profiler.dump_stats(str(profile_file))
+            print(f"\nProfil gespeichert: {profile_file} (ansehen mit: python -m pstats {profile_file})")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+    else:
+        run(args, config, api_key, base_url, tts_params)
+
     print("\nFertig!")
 
 
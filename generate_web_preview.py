@@ -10,349 +10,746 @@ Creates an interactive HTML page showing:
 - Download links
 - Timing information
 
+The page itself is a constant-size shell. Sections are listed in a compact
+manifest (sections.json) and their rendered HTML is split into pages
+(preview_data/page-NNNN.<hash>.json) that are fetched on demand. Audio
+players only get their source once they scroll into view.
+
 Usage:
-    python generate_web_preview.py <output_dir> [--narration-file <file>] [--code-file <file>]
+    python generate_web_preview.py <output_dir> [--narration-file <file>] [--page-size N]
+    python generate_web_preview.py serve <output_dir> [--port 8000]
+    python generate_web_preview.py deploy <output_dir> [--target /var/www/html/tts_test]
 
 Example:
     python generate_web_preview.py ./test_audio --narration-file ../EquityEA/codeyoutube.md
 """
 
+import os
+import sys
 import json
-import re
+import hashlib
 import argparse
 from pathlib import Path
 from html import escape
 
+import preview_deploy
+import preview_server
+from narration_parser import parse_file
+
 
 def extract_narrations_and_code(narration_file):
     """
     Extract narrations and code blocks from markdown file.
 
+    Supports the tutorial markdown format (## Block N: Title) as well as the
+    simple [section_id] narration format.
+
     Returns:
         dict: {section_id: {'narration': str, 'code': str, 'title': str}}
     """
-    with open(narration_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-
     sections = {}
 
-    # Pattern for code tutorial blocks: ## Block N: Title
-    block_pattern = r'## Block (\d+): (.+?)\n\n\*\*Narration:\*\*\n\n"(.+?)"\n\n```(\w+)\n(.*?)\n```'
-    blocks = re.findall(block_pattern, content, re.DOTALL)
-
-    for block_num, title, narration, lang, code in blocks:
-        section_id = f'block{block_num.zfill(2)}'
-        sections[section_id] = {
-            'title': title,
-            'narration': narration.strip(),
-            'code': code.strip(),
-            'language': lang
+    for section in parse_file(narration_file)['sections']:
+        sections[section['id']] = {
+            'title': section['title'],
+            'narration': section['narration'],
+            'code': section['code'].strip() if section['code'] is not None else None,
+            'language': section['language']
         }
 
-    # If no code blocks found, try simple narration format: [section_id]
-    if not sections:
-        simple_pattern = r'\[(\w+)\]\n(.+?)(?=\n\[|$)'
-        simple_blocks = re.findall(simple_pattern, content, re.DOTALL)
-
-        for section_id, text in simple_blocks:
-            sections[section_id] = {
-                'title': section_id,
-                'narration': text.strip(),
-                'code': None,
-                'language': None
-            }
-
     return sections
 
 
-def generate_html(timing_json_path, sections_data, output_path):
-    """
-    Generate HTML preview page.
-
-    Args:
-        timing_json_path: Path to timing.json
-        sections_data: Dict of section data from narration file
-        output_path: Where to write index.html
-    """
-    # Load timing data
-    with open(timing_json_path, 'r', encoding='utf-8') as f:
-        timing = json.load(f)
-
-    # Build HTML
-    html_parts = []
-
-    # HTML header
-    html_parts.append('''<!DOCTYPE html>
-<html lang="de">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>TTS Audio Preview</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 20px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            overflow: hidden;
-        }
-
-        header {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 40px;
-            text-align: center;
-        }
-
-        header h1 {
-            font-size: 2.5em;
-            margin-bottom: 10px;
-            font-weight: 700;
-        }
-
-        header p {
-            font-size: 1.2em;
-            opacity: 0.9;
-        }
+PREVIEW_CSS = """\
+* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+    line-height: 1.6;
+    color: #333;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    min-height: 100vh;
+    padding: 20px;
+}
+
+.container {
+    max-width: 1200px;
+    margin: 0 auto;
+    background: white;
+    border-radius: 20px;
+    box-shadow: 0 20px 60px rgba(0,0,0,0.3);
+    overflow: hidden;
+}
+
+header {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    padding: 40px;
+    text-align: center;
+}
+
+header h1 {
+    font-size: 2.5em;
+    margin-bottom: 10px;
+    font-weight: 700;
+}
+
+header p {
+    font-size: 1.2em;
+    opacity: 0.9;
+}
+
+.stats {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+    gap: 20px;
+    padding: 30px 40px;
+    background: #f8f9fa;
+    border-bottom: 2px solid #e9ecef;
+}
+
+.stat {
+    text-align: center;
+}
+
+.stat-value {
+    font-size: 2em;
+    font-weight: 700;
+    color: #667eea;
+}
+
+.stat-label {
+    font-size: 0.9em;
+    color: #6c757d;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+}
+
+.sections {
+    padding: 40px;
+}
+
+.section {
+    background: #fff;
+    border: 2px solid #e9ecef;
+    border-radius: 12px;
+    padding: 30px;
+    margin-bottom: 30px;
+    transition: transform 0.2s, box-shadow 0.2s;
+}
+
+.section:hover {
+    transform: translateY(-5px);
+    box-shadow: 0 10px 30px rgba(102, 126, 234, 0.2);
+}
+
+.section-header {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    margin-bottom: 20px;
+    padding-bottom: 15px;
+    border-bottom: 2px solid #e9ecef;
+}
+
+.section-title {
+    font-size: 1.5em;
+    color: #667eea;
+    font-weight: 600;
+}
+
+.section-timing {
+    background: #667eea;
+    color: white;
+    padding: 8px 16px;
+    border-radius: 20px;
+    font-size: 0.9em;
+    font-weight: 600;
+}
+
+.narration-box {
+    background: #f8f9fa;
+    border-left: 4px solid #667eea;
+    padding: 20px;
+    margin: 20px 0;
+    border-radius: 8px;
+    position: relative;
+}
+
+.narration-label {
+    font-weight: 600;
+    color: #495057;
+    margin-bottom: 10px;
+    text-transform: uppercase;
+    font-size: 0.85em;
+    letter-spacing: 1px;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+}
+
+.narration-text {
+    color: #212529;
+    line-height: 1.8;
+    font-size: 1.05em;
+}
+
+.code-box {
+    margin: 20px 0;
+    position: relative;
+}
+
+.code-label {
+    font-weight: 600;
+    color: #495057;
+    margin-bottom: 10px;
+    text-transform: uppercase;
+    font-size: 0.85em;
+    letter-spacing: 1px;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+}
+
+.copy-btn {
+    background: #667eea;
+    color: white;
+    border: none;
+    padding: 6px 12px;
+    border-radius: 6px;
+    cursor: pointer;
+    font-size: 0.85em;
+    font-weight: 600;
+    transition: all 0.3s;
+    display: inline-flex;
+    align-items: center;
+    gap: 5px;
+}
+
+.copy-btn:hover {
+    background: #5568d3;
+    transform: translateY(-2px);
+}
+
+.copy-btn:active {
+    transform: translateY(0);
+}
+
+.copy-btn.copied {
+    background: #28a745;
+}
+
+pre {
+    background: #282c34;
+    color: #abb2bf;
+    padding: 20px;
+    border-radius: 8px;
+    overflow-x: auto;
+    font-family: 'Courier New', Courier, monospace;
+    font-size: 0.9em;
+    line-height: 1.5;
+}
+
+code {
+    font-family: 'Courier New', Courier, monospace;
+}
+
+.audio-player {
+    width: 100%;
+    margin: 15px 0;
+}
+
+audio {
+    width: 100%;
+    border-radius: 8px;
+}
+
+.download-link {
+    display: inline-block;
+    background: #667eea;
+    color: white;
+    padding: 10px 20px;
+    border-radius: 8px;
+    text-decoration: none;
+    font-weight: 600;
+    transition: background 0.3s;
+    margin-top: 10px;
+}
+
+.download-link:hover {
+    background: #5568d3;
+}
+
+footer {
+    background: #f8f9fa;
+    padding: 30px 40px;
+    text-align: center;
+    border-top: 2px solid #e9ecef;
+}
+
+.download-all {
+    display: inline-block;
+    background: #764ba2;
+    color: white;
+    padding: 15px 30px;
+    border-radius: 10px;
+    text-decoration: none;
+    font-weight: 700;
+    font-size: 1.1em;
+    transition: background 0.3s;
+}
+
+.download-all:hover {
+    background: #5f3a82;
+}
+
+.pager {
+    display: flex;
+    justify-content: center;
+    align-items: center;
+    gap: 15px;
+    padding: 20px 40px 0;
+}
+
+.pager[hidden] {
+    display: none;
+}
+
+.pager button,
+.pager select {
+    background: #fff;
+    color: #667eea;
+    border: 2px solid #667eea;
+    padding: 8px 16px;
+    border-radius: 8px;
+    font-size: 0.95em;
+    font-weight: 600;
+    cursor: pointer;
+}
+
+.pager button:disabled {
+    opacity: 0.4;
+    cursor: default;
+}
+
+.sections-status {
+    text-align: center;
+    color: #6c757d;
+}
+
+@media (max-width: 768px) {
+    header h1 {
+        font-size: 1.8em;
+    }
+
+    .container {
+        border-radius: 10px;
+    }
+
+    .sections {
+        padding: 20px;
+    }
+
+    .section {
+        padding: 20px;
+    }
+}
+"""
 
-        .stats {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            padding: 30px 40px;
-            background: #f8f9fa;
-            border-bottom: 2px solid #e9ecef;
-        }
+PREVIEW_JS = """\
+const preview = {manifest: null, page: -1, observer: null};
+
+// Audio players get their source only when they scroll into view
+function observeAudio(root) {
+    const players = root.querySelectorAll('audio[data-src]');
+    if (!('IntersectionObserver' in window)) {
+        players.forEach(loadAudio);
+        return;
+    }
+    if (!preview.observer) {
+        preview.observer = new IntersectionObserver(entries => {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) {
+                    preview.observer.unobserve(entry.target);
+                    loadAudio(entry.target);
+                }
+            });
+        }, {rootMargin: '200px'});
+    }
+    players.forEach(player => preview.observer.observe(player));
+}
+
+function loadAudio(player) {
+    player.src = player.dataset.src;
+    player.removeAttribute('data-src');
+    player.preload = 'metadata';
+}
+
+async function showPage(page, sectionId) {
+    const manifest = preview.manifest;
+    page = Math.max(0, Math.min(page, manifest.pages.length - 1));
+    const container = document.getElementById('sections');
+
+    if (page !== preview.page) {
+        const response = await fetch(manifest.pages[page]);
+        const data = await response.json();
+        if (preview.observer) {
+            preview.observer.disconnect();
+        }
+        container.innerHTML = data.sections.join('');
+        observeAudio(container);
+        preview.page = page;
+        updatePager();
+    }
+
+    const target = sectionId && document.getElementById('section-' + sectionId);
+    if (target) {
+        target.scrollIntoView();
+    } else if (!sectionId) {
+        container.scrollIntoView();
+    }
+}
+
+function updatePager() {
+    const count = preview.manifest.pages.length;
+    document.querySelectorAll('.pager').forEach(pager => {
+        pager.hidden = count < 2;
+        pager.querySelector('.pager-prev').disabled = preview.page === 0;
+        pager.querySelector('.pager-next').disabled = preview.page === count - 1;
+        pager.querySelector('select').value = preview.page;
+    });
+}
+
+function buildPager() {
+    const manifest = preview.manifest;
+    document.querySelectorAll('.pager').forEach(pager => {
+        const select = pager.querySelector('select');
+        for (let page = 0; page < manifest.pages.length; page++) {
+            const first = manifest.sections[page * manifest.page_size];
+            const last = manifest.sections[Math.min((page + 1) * manifest.page_size, manifest.sections.length) - 1];
+            const option = document.createElement('option');
+            option.value = page;
+            option.textContent = (page + 1) + ': ' + first[1] + (first === last ? '' : ' … ' + last[1]);
+            select.appendChild(option);
+        }
+        select.addEventListener('change', () => { location.hash = 'page-' + (Number(select.value) + 1); });
+        pager.querySelector('.pager-prev').addEventListener('click', () => { location.hash = 'page-' + preview.page; });
+        pager.querySelector('.pager-next').addEventListener('click', () => { location.hash = 'page-' + (preview.page + 2); });
+    });
+}
+
+// #page-3 opens a page, #block05 opens the page containing that section
+function showLocation() {
+    const manifest = preview.manifest;
+    const hash = decodeURIComponent(location.hash.slice(1));
+    const pageMatch = /^page-(\\d+)$/.exec(hash);
+    if (pageMatch) {
+        return showPage(Number(pageMatch[1]) - 1);
+    }
+    const index = manifest.sections.findIndex(section => section[0] === hash);
+    if (index >= 0) {
+        return showPage(Math.floor(index / manifest.page_size), hash);
+    }
+    return showPage(Math.max(preview.page, 0));
+}
+
+async function initPreview() {
+    const status = document.getElementById('sections');
+    try {
+        const response = await fetch('sections.json', {cache: 'no-cache'});
+        preview.manifest = await response.json();
+    } catch (err) {
+        console.error('Loading sections.json failed:', err);
+        status.innerHTML = '<p class="sections-status">Could not load sections.json. ' +
+            'Open the preview through a web server instead of file://.</p>';
+        return;
+    }
+    if (!preview.manifest.sections.length) {
+        status.innerHTML = '<p class="sections-status">No sections.</p>';
+        return;
+    }
+    buildPager();
+    window.addEventListener('hashchange', showLocation);
+    showLocation();
+}
+
+document.addEventListener('DOMContentLoaded', initPreview);
+
+function copyToClipboard(elementId, button) {
+    const element = document.getElementById(elementId);
+    const text = element.textContent || element.innerText;
+
+    // Use modern Clipboard API
+    navigator.clipboard.writeText(text).then(() => {
+        // Success feedback
+        const originalText = button.innerHTML;
+        button.innerHTML = '✓ Copied!';
+        button.classList.add('copied');
+
+        // Reset after 2 seconds
+        setTimeout(() => {
+            button.innerHTML = originalText;
+            button.classList.remove('copied');
+        }, 2000);
+    }).catch(err => {
+        // Fallback for older browsers
+        console.error('Copy failed:', err);
+        button.innerHTML = '✗ Failed';
+        setTimeout(() => {
+            button.innerHTML = '📋 Copy';
+        }, 2000);
+    });
+}
+"""
 
-        .stat {
-            text-align: center;
-        }
+FRAGMENT_CACHE_DIRNAME = '.preview_cache'
+FRAGMENT_CACHE_VERSION = 2
 
-        .stat-value {
-            font-size: 2em;
-            font-weight: 700;
-            color: #667eea;
-        }
+# Sections per page of the preview (one page chunk file each)
+DEFAULT_PAGE_SIZE = 20
+PAGE_DIRNAME = 'preview_data'
 
-        .stat-label {
-            font-size: 0.9em;
-            color: #6c757d;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }
 
-        .sections {
-            padding: 40px;
-        }
+def write_atomic(path, content):
+    """Write text to a temp file next to path and swap it in"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
 
-        .section {
-            background: #fff;
-            border: 2px solid #e9ecef;
-            border-radius: 12px;
-            padding: 30px;
-            margin-bottom: 30px;
-            transition: transform 0.2s, box-shadow 0.2s;
-        }
 
-        .section:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 10px 30px rgba(102, 126, 234, 0.2);
-        }
+def write_static_asset(output_dir, stem, suffix, content):
+    """
+    Write a static asset under a content-hashed name (e.g. preview.3f2a9c1d0b4e.css).
 
-        .section-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 20px;
-            padding-bottom: 15px;
-            border-bottom: 2px solid #e9ecef;
-        }
+    The file is only written if it does not exist yet; older versions of the
+    same asset (same stem) are removed.
 
-        .section-title {
-            font-size: 1.5em;
-            color: #667eea;
-            font-weight: 600;
-        }
+    Returns:
+        File name of the asset (relative to output_dir)
+    """
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+    name = f'{stem}.{digest}{suffix}'
+    path = output_dir / name
+    if not path.exists():
+        write_atomic(path, content)
+    for old in output_dir.glob(f'{stem}.*{suffix}'):
+        if old.name != name:
+            old.unlink()
+    return name
+
+
+def fragment_key(section, section_data):
+    """Hash over everything a section fragment is rendered from"""
+    payload = json.dumps([FRAGMENT_CACHE_VERSION, section, section_data], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_fragment_cache(output_dir):
+    cache_file = output_dir / FRAGMENT_CACHE_DIRNAME / 'fragments.json'
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_fragment_cache(output_dir, fragments):
+    cache_file = output_dir / FRAGMENT_CACHE_DIRNAME / 'fragments.json'
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(cache_file, json.dumps(fragments, ensure_ascii=False))
+    except OSError as e:
+        # Cache is an optimization only
+        print(f"WARNING: Could not write fragment cache: {e}")
+
+
+def render_section(section, section_data):
+    """
+    Render the HTML fragment for one timing.json entry.
 
-        .section-timing {
-            background: #667eea;
-            color: white;
-            padding: 8px 16px;
-            border-radius: 20px;
-            font-size: 0.9em;
-            font-weight: 600;
-        }
+    Args:
+        section: Entry from timing.json
+        section_data: Title/narration/code for this section (may be empty)
+    """
+    section_id = section['section_id']
+    file_name = Path(section['file']).name
+    duration = section.get('duration_seconds', 0)
+    start = section.get('start', '0:00')
+    end = section.get('end', '0:00')
+
+    title = section_data.get('title', section_id)
+    narration = section_data.get('narration', '')
+    code = section_data.get('code', '')
+    language = section_data.get('language', 'mql5')
+
+    parts = [f'''
+            <div class="section" id="section-{section_id}">
+                <div class="section-header">
+                    <div class="section-title">
+                        {escape(title)}
+                    </div>
+                    <div class="section-timing">
+                        {start} - {end} ({duration:.1f}s)
+                    </div>
+                </div>
 
-        .narration-box {
-            background: #f8f9fa;
-            border-left: 4px solid #667eea;
-            padding: 20px;
-            margin: 20px 0;
-            border-radius: 8px;
-            position: relative;
-        }
+                <div class="audio-player">
+                    <audio controls preload="none" data-src="{file_name}">
+                        Your browser does not support audio playback.
+                    </audio>
+                </div>
+''']
 
-        .narration-label {
-            font-weight: 600;
-            color: #495057;
-            margin-bottom: 10px;
-            text-transform: uppercase;
-            font-size: 0.85em;
-            letter-spacing: 1px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
+    # Add narration if available
+    if narration:
+        # Clean up control tags for display
+        display_narration = narration.replace('(break)', ' • ').replace('(excited)', '😄').replace('(laugh)', '😂')
+        parts.append(f'''
+                <div class="narration-box">
+                    <div class="narration-label">
+                        <span>📝 Narration</span>
+                        <button class="copy-btn" onclick="copyToClipboard('narration-{section_id}', this)">📋 Copy</button>
+                    </div>
+                    <div class="narration-text" id="narration-{section_id}">{escape(display_narration)}</div>
+                </div>
+''')
 
-        .narration-text {
-            color: #212529;
-            line-height: 1.8;
-            font-size: 1.05em;
-        }
+    # Add code if available
+    if code:
+        parts.append(f'''
+                <div class="code-box">
+                    <div class="code-label">
+                        <span>💻 Code ({language})</span>
+                        <button class="copy-btn" onclick="copyToClipboard('code-{section_id}', this)">📋 Copy</button>
+                    </div>
+                    <pre><code id="code-{section_id}">{escape(code)}</code></pre>
+                </div>
+''')
 
-        .code-box {
-            margin: 20px 0;
-            position: relative;
-        }
+    parts.append(f'''
+                <a href="{file_name}" download class="download-link">⬇️ Download {file_name}</a>
+            </div>
+''')
+    return ''.join(parts)
 
-        .code-label {
-            font-weight: 600;
-            color: #495057;
-            margin-bottom: 10px;
-            text-transform: uppercase;
-            font-size: 0.85em;
-            letter-spacing: 1px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
 
-        .copy-btn {
-            background: #667eea;
-            color: white;
-            border: none;
-            padding: 6px 12px;
-            border-radius: 6px;
-            cursor: pointer;
-            font-size: 0.85em;
-            font-weight: 600;
-            transition: all 0.3s;
-            display: inline-flex;
-            align-items: center;
-            gap: 5px;
-        }
+def write_section_pages(output_dir, fragments, page_size):
+    """
+    Split rendered section fragments into content-hashed page files.
 
-        .copy-btn:hover {
-            background: #5568d3;
-            transform: translateY(-2px);
-        }
+    Unchanged pages keep their file name and are not rewritten; page files
+    that are no longer referenced are removed.
 
-        .copy-btn:active {
-            transform: translateY(0);
-        }
+    Returns:
+        List of page file names relative to output_dir
+    """
+    page_dir = output_dir / PAGE_DIRNAME
+    page_dir.mkdir(exist_ok=True)
 
-        .copy-btn.copied {
-            background: #28a745;
-        }
+    pages = []
+    for number, start in enumerate(range(0, len(fragments), page_size), 1):
+        content = json.dumps({'sections': fragments[start:start + page_size]}, ensure_ascii=False)
+        pages.append(f"{PAGE_DIRNAME}/{write_static_asset(page_dir, f'page-{number:04d}', '.json', content)}")
 
-        pre {
-            background: #282c34;
-            color: #abb2bf;
-            padding: 20px;
-            border-radius: 8px;
-            overflow-x: auto;
-            font-family: 'Courier New', Courier, monospace;
-            font-size: 0.9em;
-            line-height: 1.5;
-        }
+    referenced = {Path(page).name for page in pages}
+    for old in page_dir.glob('page-*.json'):
+        if old.name not in referenced:
+            old.unlink()
+    return pages
 
-        code {
-            font-family: 'Courier New', Courier, monospace;
-        }
 
-        .audio-player {
-            width: 100%;
-            margin: 15px 0;
-        }
+def write_if_changed(path, content):
+    """Atomically write path unless it already has exactly this content"""
+    try:
+        if path.read_text(encoding='utf-8') == content:
+            return False
+    except (OSError, ValueError):
+        pass
+    write_atomic(path, content)
+    return True
 
-        audio {
-            width: 100%;
-            border-radius: 8px;
-        }
 
-        .download-link {
-            display: inline-block;
-            background: #667eea;
-            color: white;
-            padding: 10px 20px;
-            border-radius: 8px;
-            text-decoration: none;
-            font-weight: 600;
-            transition: background 0.3s;
-            margin-top: 10px;
-        }
+def generate_html(timing_json_path, sections_data, output_path, use_cache=True, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Generate HTML preview page.
 
-        .download-link:hover {
-            background: #5568d3;
-        }
+    Section fragments are cached by a hash of (timing entry, title,
+    narration, code), so only changed sections are rendered again. The page
+    is streamed to a temp file and swapped in atomically; CSS and JS are
+    written once as content-hashed static assets.
 
-        footer {
-            background: #f8f9fa;
-            padding: 30px 40px;
-            text-align: center;
-            border-top: 2px solid #e9ecef;
-        }
+    index.html does not contain the sections: the browser loads the compact
+    sections.json manifest and fetches one page of fragments at a time, so
+    the initial page weight does not grow with the course.
 
-        .download-all {
-            display: inline-block;
-            background: #764ba2;
-            color: white;
-            padding: 15px 30px;
-            border-radius: 10px;
-            text-decoration: none;
-            font-weight: 700;
-            font-size: 1.1em;
-            transition: background 0.3s;
-        }
+    Args:
+        timing_json_path: Path to timing.json
+        sections_data: Dict of section data from narration file
+        output_path: Where to write index.html
+        use_cache: Reuse cached section fragments
+        page_size: Sections per page
 
-        .download-all:hover {
-            background: #5f3a82;
-        }
+    Returns:
+        (rendered, cached) section counts
+    """
+    output_path = Path(output_path)
+    output_dir = output_path.parent
 
-        @media (max-width: 768px) {
-            header h1 {
-                font-size: 1.8em;
-            }
+    # Load timing data
+    with open(timing_json_path, 'r', encoding='utf-8') as f:
+        timing = json.load(f)
+    sections = timing.get('sections', [])
 
-            .container {
-                border-radius: 10px;
-            }
+    css_name = write_static_asset(output_dir, 'preview', '.css', PREVIEW_CSS)
+    js_name = write_static_asset(output_dir, 'preview', '.js', PREVIEW_JS)
 
-            .sections {
-                padding: 20px;
-            }
+    cached_fragments = load_fragment_cache(output_dir) if use_cache else {}
+    fragments = {}
+    rendered = 0
 
-            .section {
-                padding: 20px;
-            }
-        }
-    </style>
+    # Sections (cached fragments where nothing changed)
+    page_fragments = []
+    manifest_sections = []
+    for section in sections:
+        section_id = section['section_id']
+        section_data = sections_data.get(section_id, {})
+        key = fragment_key(section, section_data)
+        fragment = cached_fragments.get(key)
+        if fragment is None:
+            fragment = render_section(section, section_data)
+            rendered += 1
+        fragments[key] = fragment
+        page_fragments.append(fragment)
+        manifest_sections.append([
+            section_id,
+            section_data.get('title', section_id),
+            section.get('start', '0:00'),
+            section.get('end', '0:00'),
+            round(section.get('duration_seconds', 0), 2),
+        ])
+
+    pages = write_section_pages(output_dir, page_fragments, page_size)
+    write_if_changed(output_dir / 'sections.json', json.dumps({
+        'page_size': page_size,
+        'pages': pages,
+        'sections': manifest_sections,
+    }, ensure_ascii=False, separators=(',', ':')))
+
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        # HTML header
+        f.write(f'''<!DOCTYPE html>
+<html lang="de">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>TTS Audio Preview</title>
+    <link rel="stylesheet" href="{css_name}">
 </head>
 <body>
     <div class="container">
@@ -363,91 +760,35 @@ def generate_html(timing_json_path, sections_data, output_path):
 
         <div class="stats">
             <div class="stat">
-                <div class="stat-value">''' + str(len(timing.get('sections', []))) + '''</div>
+                <div class="stat-value">{len(sections)}</div>
                 <div class="stat-label">Sections</div>
             </div>
             <div class="stat">
-                <div class="stat-value">''' + timing.get('total_duration_formatted', '0:00') + '''</div>
+                <div class="stat-value">{timing.get('total_duration_formatted', '0:00')}</div>
                 <div class="stat-label">Total Duration</div>
             </div>
             <div class="stat">
-                <div class="stat-value">''' + f"{timing.get('total_duration_seconds', 0):.1f}s" + '''</div>
+                <div class="stat-value">{timing.get('total_duration_seconds', 0):.1f}s</div>
                 <div class="stat-label">Seconds</div>
             </div>
         </div>
 
-        <div class="sections">
-''')
+        <nav class="pager" hidden>
+            <button class="pager-prev">◀</button>
+            <select aria-label="Page"></select>
+            <button class="pager-next">▶</button>
+        </nav>
 
-    # Generate sections
-    for section in timing.get('sections', []):
-        section_id = section['section_id']
-        file_name = Path(section['file']).name
-        duration = section.get('duration_seconds', 0)
-        start = section.get('start', '0:00')
-        end = section.get('end', '0:00')
-
-        # Get narration and code data
-        section_data = sections_data.get(section_id, {})
-        title = section_data.get('title', section_id)
-        narration = section_data.get('narration', '')
-        code = section_data.get('code', '')
-        language = section_data.get('language', 'mql5')
-
-        html_parts.append(f'''
-            <div class="section">
-                <div class="section-header">
-                    <div class="section-title">
-                        {escape(title)}
-                    </div>
-                    <div class="section-timing">
-                        {start} - {end} ({duration:.1f}s)
-                    </div>
-                </div>
-
-                <div class="audio-player">
-                    <audio controls preload="metadata">
-                        <source src="{file_name}" type="audio/mpeg">
-                        Your browser does not support audio playback.
-                    </audio>
-                </div>
-''')
-
-        # Add narration if available
-        if narration:
-            # Clean up control tags for display
-            display_narration = narration.replace('(break)', ' • ').replace('(excited)', '😄').replace('(laugh)', '😂')
-            html_parts.append(f'''
-                <div class="narration-box">
-                    <div class="narration-label">
-                        <span>📝 Narration</span>
-                        <button class="copy-btn" onclick="copyToClipboard('narration-{section_id}', this)">📋 Copy</button>
-                    </div>
-                    <div class="narration-text" id="narration-{section_id}">{escape(display_narration)}</div>
-                </div>
-''')
-
-        # Add code if available
-        if code:
-            html_parts.append(f'''
-                <div class="code-box">
-                    <div class="code-label">
-                        <span>💻 Code ({language})</span>
-                        <button class="copy-btn" onclick="copyToClipboard('code-{section_id}', this)">📋 Copy</button>
-                    </div>
-                    <pre><code id="code-{section_id}">{escape(code)}</code></pre>
-                </div>
-''')
-
-        html_parts.append(f'''
-                <a href="{file_name}" download class="download-link">⬇️ Download {file_name}</a>
-            </div>
-''')
-
-    # Footer
-    html_parts.append('''
+        <div class="sections" id="sections">
+            <p class="sections-status">Loading sections…</p>
         </div>
 
+        <nav class="pager" hidden>
+            <button class="pager-prev">◀</button>
+            <select aria-label="Page"></select>
+            <button class="pager-next">▶</button>
+        </nav>
+
         <footer>
             <a href="timing.json" download class="download-all">📊 Download timing.json</a>
             <p style="margin-top: 20px; color: #6c757d;">
@@ -456,49 +797,35 @@ def generate_html(timing_json_path, sections_data, output_path):
         </footer>
     </div>
 
-    <script>
-        function copyToClipboard(elementId, button) {
-            const element = document.getElementById(elementId);
-            const text = element.textContent || element.innerText;
-
-            // Use modern Clipboard API
-            navigator.clipboard.writeText(text).then(() => {
-                // Success feedback
-                const originalText = button.innerHTML;
-                button.innerHTML = '✓ Copied!';
-                button.classList.add('copied');
-
-                // Reset after 2 seconds
-                setTimeout(() => {
-                    button.innerHTML = originalText;
-                    button.classList.remove('copied');
-                }, 2000);
-            }).catch(err => {
-                // Fallback for older browsers
-                console.error('Copy failed:', err);
-                button.innerHTML = '✗ Failed';
-                setTimeout(() => {
-                    button.innerHTML = '📋 Copy';
-                }, 2000);
-            });
-        }
-    </script>
+    <script src="{js_name}"></script>
 </body>
 </html>
 ''')
+    os.replace(tmp_path, output_path)
 
-    # Write HTML file
-    html_content = ''.join(html_parts)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    if use_cache and fragments != cached_fragments:
+        save_fragment_cache(output_dir, fragments)
 
-    print(f"✓ Generated: {output_path}")
+    print(f"✓ Generated: {output_path} ({rendered} sections rendered, {len(sections) - rendered} from cache, "
+          f"{len(pages)} pages)")
+    return rendered, len(sections) - rendered
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        parser = argparse.ArgumentParser(prog=f'{sys.argv[0]} serve', description='Serve the preview locally')
+        preview_server.add_serve_arguments(parser)
+        return preview_server.serve(parser.parse_args(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'deploy':
+        parser = argparse.ArgumentParser(prog=f'{sys.argv[0]} deploy', description='Deploy the preview to a web root')
+        preview_deploy.add_deploy_arguments(parser)
+        return preview_deploy.run_deploy(parser.parse_args(sys.argv[2:]))
+
     parser = argparse.ArgumentParser(description='Generate web preview for TTS audio output')
     parser.add_argument('output_dir', help='Directory containing audio files and timing.json')
     parser.add_argument('--narration-file', help='Narration markdown file (optional)')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f'Sections per preview page (default: {DEFAULT_PAGE_SIZE})')
 
     args = parser.parse_args()
 
@@ -525,17 +852,17 @@ def main():
 
     # Generate HTML
     print(f"Generating HTML preview...")
-    generate_html(timing_json, sections_data, index_html)
+    generate_html(timing_json, sections_data, index_html, page_size=max(1, args.page_size))
 
     print(f"\n✓ Done!")
-    print(f"\nOpen in browser:")
-    print(f"  file://{index_html.absolute()}")
-    print(f"\nOr deploy to web server:")
-    print(f"  sudo cp -r {output_dir}/* /var/www/html/tts_test/")
+    print(f"\nPreview with live reload:")
+    print(f"  python3 generate_web_preview.py serve {output_dir}")
+    print(f"  http://127.0.0.1:8000/")
+    print(f"\nOr deploy to web server (only changed files are copied):")
+    print(f"  sudo python3 generate_web_preview.py deploy {output_dir}")
 
     return 0
 
 
 if __name__ == '__main__':
-    import sys
     sys.exit(main())
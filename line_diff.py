@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Line Diff Engine
+================
+
+Patience diff with a Myers O(ND) fallback over interned line ids.
+Drop-in replacement for difflib.unified_diff on line lists: same header,
+hunk and line format, but near-linear on large MQL5 sources full of
+repeated lines (//+----+ banners, '}' and blank lines), where
+difflib.SequenceMatcher degrades sharply.
+
+Algorithm:
+    1. Every distinct line is mapped to a small int once.
+    2. Common prefix/suffix of a region are matched directly.
+    3. Lines that occur exactly once on both sides are used as anchors;
+       the longest increasing subsequence of anchors splits the region
+       and each gap is processed the same way.
+    4. Regions without unique lines fall back to Myers (bounded by
+       MYERS_MAX_D edits; beyond that the region is reported as replaced).
+
+Usage:
+    python line_diff.py <old_file> <new_file>
+    python line_diff.py --benchmark [EquityMonitor-V107.mq5]
+"""
+
+import sys
+import time
+import random
+import difflib
+from bisect import bisect_left
+from pathlib import Path
+
+
+# Upper bound for the edit distance Myers searches in a region without
+# unique anchor lines (memory is O(D^2))
+MYERS_MAX_D = 1000
+
+
+def _intern(a, b):
+    """Map lines of a and b to ints (equal lines get equal ids)"""
+    table = {}
+    ids_a = [table.setdefault(line, len(table)) for line in a]
+    ids_b = [table.setdefault(line, len(table)) for line in b]
+    return ids_a, ids_b
+
+
+def _unique_anchors(a, b, alo, ahi, blo, bhi):
+    """
+    Lines occurring exactly once in a[alo:ahi] and b[blo:bhi], reduced to the
+    longest chain that is increasing on both sides.
+
+    Returns:
+        List of (i, j) index pairs
+    """
+    count_a = {}
+    for i in range(alo, ahi):
+        line = a[i]
+        count_a[line] = -1 if line in count_a else i
+    position_b = {}
+    for j in range(blo, bhi):
+        line = b[j]
+        if count_a.get(line, -1) >= 0:
+            position_b[line] = -1 if line in position_b else j
+
+    pairs = [(count_a[line], j) for line, j in position_b.items() if j >= 0]
+    if not pairs:
+        return []
+    pairs.sort()
+
+    # Longest increasing subsequence on j (patience sorting)
+    tails = []
+    tail_index = []
+    previous = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        pile = bisect_left(tails, j)
+        if pile == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[pile] = j
+            tail_index[pile] = index
+        previous[index] = tail_index[pile - 1] if pile else -1
+
+    chain = []
+    index = tail_index[-1]
+    while index >= 0:
+        chain.append(pairs[index])
+        index = previous[index]
+    chain.reverse()
+    return chain
+
+
+def _myers(a, b, alo, ahi, blo, bhi, max_d=MYERS_MAX_D):
+    """
+    Minimal edit script between a[alo:ahi] and b[blo:bhi] (Myers 1986).
+
+    Returns:
+        List of matching (i, j) pairs, or None if more than max_d edits are needed
+    """
+    n = ahi - alo
+    m = bhi - blo
+    max_d = min(max_d, n + m)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+
+    for d in range(max_d + 1):
+        # Only diagonals -d-1..d+1 are read while backtracking step d
+        trace.append(v[offset - d - 1:offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _myers_backtrack(trace, n, m, alo, blo)
+    return None
+
+
+def _myers_backtrack(trace, x, y, alo, blo):
+    matches = []
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        base = d + 1
+        k = x - y
+        if k == -d or (k != d and v[base + k - 1] < v[base + k + 1]):
+            previous_k = k + 1
+        else:
+            previous_k = k - 1
+        previous_x = v[base + previous_k]
+        previous_y = previous_x - previous_k
+        while x > previous_x and y > previous_y:
+            x -= 1
+            y -= 1
+            matches.append((alo + x, blo + y))
+        x, y = previous_x, previous_y
+    matches.reverse()
+    return matches
+
+
+def matching_blocks(a, b):
+    """
+    Matching runs between two line lists.
+
+    Same contract as difflib.SequenceMatcher.get_matching_blocks(): list of
+    (i, j, size) triples, increasing in i and j, ending with (len(a), len(b), 0).
+    """
+    a, b = _intern(a, b)
+    matches = []
+    stack = [(0, len(a), 0, len(b))]
+
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            matches.append((alo, blo))
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+            matches.append((ahi, bhi))
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _unique_anchors(a, b, alo, ahi, blo, bhi)
+        if anchors:
+            i_start, j_start = alo, blo
+            for i, j in anchors:
+                matches.append((i, j))
+                stack.append((i_start, i, j_start, j))
+                i_start, j_start = i + 1, j + 1
+            stack.append((i_start, ahi, j_start, bhi))
+        else:
+            matches.extend(_myers(a, b, alo, ahi, blo, bhi) or ())
+
+    matches.sort()
+    blocks = []
+    for i, j in matches:
+        if blocks:
+            start_i, start_j, size = blocks[-1]
+            if start_i + size == i and start_j + size == j:
+                blocks[-1] = (start_i, start_j, size + 1)
+                continue
+        blocks.append((i, j, 1))
+    blocks.append((len(a), len(b), 0))
+    return blocks
+
+
+def get_opcodes(a, b):
+    """Opcodes like difflib.SequenceMatcher.get_opcodes()"""
+    opcodes = []
+    i = j = 0
+    for ai, bj, size in matching_blocks(a, b):
+        if i < ai and j < bj:
+            opcodes.append(('replace', i, ai, j, bj))
+        elif i < ai:
+            opcodes.append(('delete', i, ai, j, bj))
+        elif j < bj:
+            opcodes.append(('insert', i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size:
+            opcodes.append(('equal', ai, i, bj, j))
+    return opcodes
+
+
+def get_grouped_opcodes(a, b, n=3):
+    """Hunks with up to n lines of context, like SequenceMatcher.get_grouped_opcodes()"""
+    codes = get_opcodes(a, b) or [('equal', 0, 1, 0, 1)]
+    if codes[0][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == 'equal' and i2 - i1 > 2 * n:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == 'equal'):
+        yield group
+
+
+def _format_range(start, stop):
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f'{beginning}'
+    if not length:
+        beginning -= 1
+    return f'{beginning},{length}'
+
+
+def unified_diff(a, b, fromfile='', tofile='', lineterm='\n', n=3):
+    """
+    Unified diff of two line lists; same output format and arguments as
+    difflib.unified_diff (without the file date arguments).
+    """
+    started = False
+    for group in get_grouped_opcodes(a, b, n):
+        if not started:
+            started = True
+            yield f'--- {fromfile}{lineterm}'
+            yield f'+++ {tofile}{lineterm}'
+
+        first, last = group[0], group[-1]
+        yield f'@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@{lineterm}'
+
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                for line in a[i1:i2]:
+                    yield ' ' + line
+                continue
+            if tag in ('replace', 'delete'):
+                for line in a[i1:i2]:
+                    yield '-' + line
+            if tag in ('replace', 'insert'):
+                for line in b[j1:j2]:
+                    yield '+' + line
+
+
+def apply_opcodes(a, b, opcodes):
+    """Rebuild b from a and opcodes (used to verify diffs)"""
+    result = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        result.extend(a[i1:i2] if tag == 'equal' else b[j1:j2])
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _mutate(lines, seed, rate=0.01):
+    """Delete, change and insert about rate * len(lines) lines each"""
+    rng = random.Random(seed)
+    result = []
+    for index, line in enumerate(lines):
+        roll = rng.random()
+        if roll < rate:
+            continue
+        if roll < 2 * rate:
+            result.append(line + ' // changed')
+            continue
+        result.append(line)
+        if roll < 3 * rate:
+            result.append(f'   Print("inserted {index}");')
+    return result
+
+
+def _synthetic_source(line_count, seed):
+    """MQL5-like file: banners, braces and blank lines around short functions"""
+    rng = random.Random(seed)
+    lines = []
+    function = 0
+    while len(lines) < line_count:
+        function += 1
+        lines += [
+            '//+------------------------------------------------------------------+',
+            f'//| Function {function}                                              |',
+            '//+------------------------------------------------------------------+',
+            f'void Function{function}()',
+            '{',
+        ]
+        for statement in range(rng.randint(3, 15)):
+            if rng.random() < 0.3:
+                lines += ['   if(value > 0)', '   {', f'      value = value * {statement};', '   }']
+            elif rng.random() < 0.2:
+                lines.append('')
+            else:
+                lines.append(f'   double v{statement} = AccountInfoDouble(ACCOUNT_EQUITY) * {rng.randint(1, 10**6)};')
+        lines += ['}', '']
+    return lines[:line_count]
+
+
+def _time(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+def run_benchmark(source_file=None):
+    cases = []
+    if source_file and Path(source_file).exists():
+        lines = Path(source_file).read_text(encoding='utf-8').split('\n')
+        cases.append((Path(source_file).name, lines, _mutate(lines, 1)))
+    for line_count in (10_000, 50_000):
+        lines = _synthetic_source(line_count, 2)
+        cases.append((f'synthetic {line_count:,} lines', lines, _mutate(lines, 3)))
+
+    print(f"{'Case':<32} {'difflib':>10} {'line_diff':>10} {'Speedup':>8} {'Hunk lines (difflib/line_diff)':>32}")
+    print('-' * 96)
+    for name, a, b in cases:
+        difflib_time, difflib_lines = _time(lambda: list(difflib.unified_diff(a, b, lineterm='')))
+        own_time, own_lines = _time(lambda: list(unified_diff(a, b, lineterm='')))
+        if apply_opcodes(a, b, get_opcodes(a, b)) != b:
+            raise AssertionError(f'{name}: opcodes do not reproduce the new file')
+        print(f"{name:<32} {difflib_time:>9.3f}s {own_time:>9.3f}s {difflib_time / max(own_time, 1e-9):>7.1f}x "
+              f"{len(difflib_lines):>15,} / {len(own_lines):,}")
+
+
+def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == '--benchmark':
+        run_benchmark(sys.argv[2] if len(sys.argv) > 2 else Path(__file__).parent / 'EquityMonitor-V107.mq5')
+        return 0
+
+    if len(sys.argv) != 3:
+        print("Usage: python line_diff.py <old_file> <new_file>")
+        print("       python line_diff.py --benchmark [source_file]")
+        return 1
+
+    a = Path(sys.argv[1]).read_text(encoding='utf-8').split('\n')
+    b = Path(sys.argv[2]).read_text(encoding='utf-8').split('\n')
+    for line in unified_diff(a, b, sys.argv[1], sys.argv[2], lineterm=''):
+        print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
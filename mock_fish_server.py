@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Mock Fish Audio Server
+======================
+
+Lokaler Stand-in für den Fish Audio TTS Endpoint (POST /v1/tts), um
+fish_audio_tts.py und tts_async.py ohne API-Credits zu testen.
+
+Simuliert:
+- Latenz pro Request (Basis + Jitter, gleichverteilt, lognormal oder exponentiell)
+- Fehler mit konfigurierbarer Rate (429 mit Retry-After, 503)
+- Streaming-Antworten: gültige (stille) MP3-Frames, deren Länge
+  proportional zur Request-Größe ist
+
+Usage:
+    python mock_fish_server.py --port 8765 --latency 0.3 --error-rate 0.1
+
+    python fish_audio_tts.py -n narrations_combined.txt -d /tmp/audio \\
+        --engine async --base-url http://127.0.0.1:8765 --api-key test
+"""
+
+import sys
+import time
+import random
+import struct
+import asyncio
+import argparse
+import threading
+from typing import Optional, List, Dict, Any
+
+
+LATENCY_DISTRIBUTIONS = ('uniform', 'lognormal', 'exponential')
+
+# MPEG-1 Layer III, 44.1 kHz, mono, ohne CRC
+MP3_SAMPLE_RATE = 44100
+MP3_SAMPLES_PER_FRAME = 1152
+_MP3_BITRATE_INDEX = {32: 1, 40: 2, 48: 3, 56: 4, 64: 5, 80: 6, 96: 7, 112: 8,
+                      128: 9, 160: 10, 192: 11, 224: 12, 256: 13, 320: 14}
+
+
+def silent_mp3_frame(bitrate_kbps: int = 128) -> bytes:
+    """
+    Erzeugt einen stillen MP3-Frame.
+
+    Side-Info und Main-Data sind komplett 0 (part2_3_length = 0), jeder
+    Decoder gibt dafür Stille aus.
+    """
+    header = (0xFFE00000 | (3 << 19) | (1 << 17) | (1 << 16)
+              | (_MP3_BITRATE_INDEX[bitrate_kbps] << 12) | (3 << 6))
+    length = 144 * bitrate_kbps * 1000 // MP3_SAMPLE_RATE
+    return struct.pack('>I', header) + bytes(length - 4)
+
+
+class MockFishServer:
+    """
+    Minimaler asyncio HTTP/1.1 Server für POST /v1/tts.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.2,
+        jitter: float = 0.1,
+        error_rate: float = 0.0,
+        retry_after: Optional[float] = 1.0,
+        bitrate_kbps: int = 128,
+        seconds_per_byte: float = 0.06,
+        chunk_frames: int = 20,
+        seed: Optional[int] = None,
+        distribution: str = 'uniform'
+    ):
+        """
+        Args:
+            host: Bind-Adresse
+            port: Port (0 = freien Port wählen)
+            latency: Basis-Latenz bis zum ersten Byte in Sekunden
+            jitter: Zusätzliche zufällige Latenz (0..jitter) in Sekunden
+            error_rate: Anteil der Requests, die mit 429/503 beantwortet werden
+            retry_after: Wert für den Retry-After Header bei 429 (None = kein Header)
+            bitrate_kbps: Bitrate der erzeugten MP3-Daten
+            seconds_per_byte: Audio-Dauer pro Byte Request-Body
+            chunk_frames: MP3-Frames pro gestreamtem Chunk
+            seed: Seed für reproduzierbare Latenzen/Fehler
+            distribution: Latenz-Verteilung:
+                          'uniform'     = latency + U(0, jitter)
+                          'lognormal'   = Median latency, jitter = Sigma des Logarithmus
+                          'exponential' = latency + Exp(Mittelwert jitter)
+        """
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unbekannte Latenz-Verteilung: {distribution}")
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.bitrate_kbps = bitrate_kbps
+        self.seconds_per_byte = seconds_per_byte
+        self.chunk_frames = chunk_frames
+        self.distribution = distribution
+        self.random = random.Random(seed)
+        self.frame = silent_mp3_frame(bitrate_kbps)
+        self.stats = {'requests': 0, 'errors': 0, 'bytes_sent': 0}
+        # Ein Eintrag pro Request: status, ttfb_seconds, latency_seconds, bytes
+        self.request_log: List[Dict[str, Any]] = []
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def sample_latency(self) -> float:
+        """Latenz für einen Request gemäß distribution"""
+        if self.distribution == 'lognormal':
+            return self.latency * self.random.lognormvariate(0, self.jitter) if self.latency > 0 else 0.0
+        if self.distribution == 'exponential':
+            return self.latency + (self.random.expovariate(1 / self.jitter) if self.jitter > 0 else 0.0)
+        return self.latency + self.random.uniform(0, self.jitter)
+
+    def reset_stats(self):
+        """Zähler und Request-Log zurücksetzen (z.B. zwischen Benchmark-Runs)"""
+        self.stats = {'requests': 0, 'errors': 0, 'bytes_sent': 0}
+        self.request_log = []
+
+    def _log_request(self, received: float, status: int, first_byte: Optional[float], size: int):
+        finished = time.perf_counter()
+        self.request_log.append({
+            'status': status,
+            'ttfb_seconds': (first_byte or finished) - received,
+            'latency_seconds': finished - received,
+            'bytes': size,
+        })
+
+    async def _send(self, writer, status: str, headers: dict, body: bytes = b''):
+        lines = [f"HTTP/1.1 {status}"]
+        headers = dict(headers, **{'Content-Length': str(len(body)), 'Connection': 'keep-alive'})
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def _handle_tts(self, writer, body: bytes, received: Optional[float] = None):
+        if received is None:
+            received = time.perf_counter()
+        self.stats['requests'] += 1
+        await asyncio.sleep(self.sample_latency())
+
+        if self.random.random() < self.error_rate:
+            self.stats['errors'] += 1
+            if self.random.random() < 0.5:
+                headers = {'Content-Type': 'application/json'}
+                if self.retry_after is not None:
+                    headers['Retry-After'] = f"{self.retry_after:g}"
+                await self._send(writer, "429 Too Many Requests", headers, b'{"message": "rate limited"}')
+                self._log_request(received, 429, None, 0)
+            else:
+                await self._send(writer, "503 Service Unavailable",
+                                 {'Content-Type': 'application/json'}, b'{"message": "overloaded"}')
+                self._log_request(received, 503, None, 0)
+            return
+
+        duration = max(len(body) * self.seconds_per_byte, 0.5)
+        frames = int(duration * MP3_SAMPLE_RATE / MP3_SAMPLES_PER_FRAME)
+
+        # Chunked Transfer, damit Clients echtes Streaming sehen
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: audio/mpeg\r\n"
+                     b"Transfer-Encoding: chunked\r\nConnection: keep-alive\r\n\r\n")
+        first_byte = time.perf_counter()
+        sent = 0
+        size = 0
+        while sent < frames:
+            count = min(self.chunk_frames, frames - sent)
+            chunk = self.frame * count
+            writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            await writer.drain()
+            sent += count
+            size += len(chunk)
+            self.stats['bytes_sent'] += len(chunk)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        self._log_request(received, 200, first_byte, size)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                received = time.perf_counter()
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                if method == 'POST' and path.rstrip('/') == '/v1/tts':
+                    await self._handle_tts(writer, body, received)
+                else:
+                    await self._send(writer, "404 Not Found", {'Content-Type': 'text/plain'}, b'not found')
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        """Startet den Server im laufenden Event-Loop"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def start_in_thread(self) -> str:
+        """
+        Startet den Server in einem Hintergrund-Thread (für synchronen Code).
+
+        Returns:
+            base_url des Servers
+        """
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.base_url
+
+    def stop_thread(self):
+        if self._loop:
+            asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lokaler Mock-Server für die Fish Audio TTS API')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind-Adresse (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port (default: 8765)')
+    parser.add_argument('--latency', type=float, default=0.2, help='Basis-Latenz in Sekunden (default: 0.2)')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Zufälliger Latenz-Jitter in Sekunden (default: 0.1)')
+    parser.add_argument('--distribution', choices=LATENCY_DISTRIBUTIONS, default='uniform',
+                        help='Latenz-Verteilung (default: uniform, bei lognormal ist --jitter das Sigma)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Anteil fehlerhafter Antworten 0.0-1.0 (default: 0)')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After bei 429 in Sekunden (default: 1)')
+    parser.add_argument('--bitrate', type=int, default=128, choices=sorted(_MP3_BITRATE_INDEX), help='MP3 Bitrate (default: 128)')
+    parser.add_argument('--seed', type=int, help='Seed für reproduzierbare Runs')
+    args = parser.parse_args()
+
+    server = MockFishServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        bitrate_kbps=args.bitrate,
+        seed=args.seed,
+        distribution=args.distribution
+    )
+
+    async def serve():
+        await server.start()
+        print(f"Mock Fish Audio Server läuft auf {server.base_url}")
+        await server._server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\nBeendet. Requests: {server.stats['requests']}, Fehler: {server.stats['errors']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+MQL5 Structure Lexer
+====================
+
+Single-pass tokenizer for structural validation of MQL5 code. String
+literals, char/color/datetime literals (C'25,25,25', D'2024.01.01') and
+// or /* */ comments are skipped, so banner lines and Print("(") no longer
+distort the counts.
+
+One scan yields:
+    - counts of { } ( ) [ ] ;
+    - the same counts per code block (blocks joined with '\\n')
+    - the exact line/column of the first imbalance: a closer without or
+      with the wrong opener, or the first opener still unclosed at the end
+
+Usage:
+    python mql5_lexer.py EquityMonitor-V107.mq5
+"""
+
+import re
+import sys
+from bisect import bisect_right
+from pathlib import Path
+
+
+COUNTER_NAMES = {
+    '{': 'open_braces',
+    '}': 'close_braces',
+    '(': 'open_parens',
+    ')': 'close_parens',
+    '[': 'open_brackets',
+    ']': 'close_brackets',
+    ';': 'semicolons',
+}
+PAIRS = {'}': '{', ')': '(', ']': '['}
+
+_TOKEN = re.compile(r'''
+      (?P<comment>//[^\n]*)
+    | (?P<block_comment>/\*.*?(?:\*/|\Z))
+    | (?P<string>"(?:[^"\\\n]|\\.)*"?)
+    | (?P<char>'(?:[^'\\\n]|\\.)*'?)
+    | (?P<newline>\n)
+    | (?P<punct>[{}()\[\];])
+''', re.DOTALL | re.VERBOSE)
+
+
+def empty_counts():
+    return {name: 0 for name in COUNTER_NAMES.values()}
+
+
+def balance(counts):
+    """Net open-minus-close per bracket kind"""
+    return {
+        'braces': counts['open_braces'] - counts['close_braces'],
+        'parens': counts['open_parens'] - counts['close_parens'],
+        'brackets': counts['open_brackets'] - counts['close_brackets'],
+    }
+
+
+def scan(code, block_starts=None):
+    """
+    Scan code once and collect all structural information.
+
+    Args:
+        code: MQL5 source
+        block_starts: Optional sorted 1-based start lines of code blocks in code
+
+    Returns:
+        Dict {'counts', 'blocks': [counts per block], 'first_imbalance'}.
+        first_imbalance is None or {'line', 'column', 'char', 'message'}
+        (1-based line and column).
+    """
+    counts = empty_counts()
+    block_starts = block_starts or [1]
+    block_counts = [empty_counts() for _ in block_starts]
+    stack = []
+    first_imbalance = None
+
+    line = 1
+    line_start = 0
+    block = 0
+
+    for match in _TOKEN.finditer(code):
+        kind = match.lastgroup
+        if kind == 'newline':
+            line += 1
+            line_start = match.end()
+            continue
+        if kind == 'block_comment':
+            text = match.group()
+            newlines = text.count('\n')
+            if newlines:
+                line += newlines
+                line_start = match.start() + text.rfind('\n') + 1
+            continue
+        if kind != 'punct':
+            continue
+
+        char = match.group()
+        name = COUNTER_NAMES[char]
+        counts[name] += 1
+        if block + 1 < len(block_starts) and line >= block_starts[block + 1]:
+            block = bisect_right(block_starts, line) - 1
+        block_counts[block][name] += 1
+
+        if char in PAIRS:
+            column = match.start() - line_start + 1
+            if stack and stack[-1][0] == PAIRS[char]:
+                stack.pop()
+            elif first_imbalance is None:
+                if stack:
+                    opener, open_line, open_column = stack[-1]
+                    message = f"'{char}' closes '{opener}' opened at line {open_line}, column {open_column}"
+                else:
+                    message = f"'{char}' without matching '{PAIRS[char]}'"
+                first_imbalance = {'line': line, 'column': column, 'char': char, 'message': message}
+        elif char != ';':
+            stack.append((char, line, match.start() - line_start + 1))
+
+    if first_imbalance is None and stack:
+        opener, open_line, open_column = stack[0]
+        first_imbalance = {'line': open_line, 'column': open_column, 'char': opener,
+                           'message': f"'{opener}' is never closed"}
+
+    return {'counts': counts, 'blocks': block_counts, 'first_imbalance': first_imbalance}
+
+
+def scan_blocks(code_blocks):
+    """
+    Scan code blocks as they are copied sequentially ('\\n'.join(code_blocks)).
+
+    Returns:
+        scan() result; first_imbalance additionally carries 'block' (0-based)
+        and 'block_line' (1-based line inside that block)
+    """
+    block_starts = []
+    line = 1
+    for code in code_blocks:
+        block_starts.append(line)
+        line += code.count('\n') + 1
+
+    result = scan('\n'.join(code_blocks), block_starts)
+    imbalance = result['first_imbalance']
+    if imbalance:
+        block = bisect_right(block_starts, imbalance['line']) - 1
+        imbalance['block'] = block
+        imbalance['block_line'] = imbalance['line'] - block_starts[block] + 1
+    return result
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python mql5_lexer.py <source_file> [...]")
+        return 1
+
+    failed = False
+    for name in sys.argv[1:]:
+        result = scan(Path(name).read_text(encoding='utf-8'))
+        counts = result['counts']
+        print(f"{name}: {{ {counts['open_braces']} }} {counts['close_braces']}  "
+              f"( {counts['open_parens']} ) {counts['close_parens']}  "
+              f"[ {counts['open_brackets']} ] {counts['close_brackets']}  ; {counts['semicolons']}")
+        imbalance = result['first_imbalance']
+        if imbalance:
+            failed = True
+            print(f"  line {imbalance['line']}, column {imbalance['column']}: {imbalance['message']}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
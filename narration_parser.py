@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Narration Markdown Parser
+=========================
+
+Single-pass, line-oriented parser for the tutorial markdown files
+(codeyoutube.md, interlude_value_proposition.md) and the combined
+[section_id] narration format.
+
+Recognized structure:
+    ## Block N: Title            -> section 'blockNN'
+    ### Section N: Title         -> section 'interlude_sectionN'
+    **Narration:**
+    "Narration text, may contain "inner" quotes and span several lines"
+    ```mql5
+    code...
+    ```
+
+    [section_id]                 -> simple format (only used if no headings found)
+    Narration text...
+
+Each section is a dict:
+    {'id', 'kind', 'number', 'title', 'narration', 'code', 'language',
+     'code_blocks': [{'language', 'code', 'line_start', 'line_end'}],
+     'line_start', 'line_end', 'narration_line_start', 'narration_line_end'}
+
+Line numbers are 1-based and inclusive; code block spans cover the code
+lines only (without the fences).
+
+Parse results are cached in .narration_cache/ next to the input file,
+keyed by size/mtime (fast path) and SHA-256 (after touch/checkout).
+
+Usage:
+    python narration_parser.py codeyoutube.md
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+from pathlib import Path
+
+
+PARSER_VERSION = 1
+CACHE_DIRNAME = '.narration_cache'
+
+_BLOCK_HEADING = re.compile(r'^## Block (\d+): (.+?)\s*$')
+_INTERLUDE_HEADING = re.compile(r'^### Section (\d+): (.+?)\s*$')
+_ANY_HEADING = re.compile(r'^#{1,6} ')
+_SIMPLE_SECTION = re.compile(r'^\[([\w\-]+)\]$')
+_NARRATION_MARKER = '**Narration:**'
+
+
+def parse_lines(lines):
+    """
+    Parse an iterable of lines in one pass.
+
+    Args:
+        lines: Iterable of text lines (with or without line endings)
+
+    Returns:
+        dict: {'sections': [...], 'code_blocks': [...]} where code_blocks
+        lists every fenced block in the file (also those outside sections)
+    """
+    sections = []
+    simple_sections = []
+    code_blocks = []
+
+    current = None          # current markdown section
+    simple = None           # current [section_id] section
+    mode = None             # None | 'marker' | 'quote' | 'narration'
+    narration_lines = []
+    fence = None            # open code block
+    interlude_count = 0
+    line_number = 0
+
+    def close_section(end_line):
+        nonlocal current, mode
+        if current is not None:
+            current['line_end'] = end_line
+            if current['narration'] is not None:
+                sections.append(current)
+        current = None
+        mode = None
+
+    def finish_narration(end_line):
+        nonlocal mode
+        text = ' '.join(narration_lines).strip()
+        if text.startswith('"'):
+            text = text[1:]
+        if text.endswith('"'):
+            text = text[:-1]
+        current['narration'] = text.strip()
+        current['narration_line_end'] = end_line
+        mode = None
+
+    for line_number, raw_line in enumerate(lines, 1):
+        line = raw_line.rstrip('\r\n')
+        stripped = line.strip()
+
+        # Inside a code fence nothing else is interpreted
+        if fence is not None:
+            if stripped == '```':
+                fence['line_end'] = line_number - 1
+                fence['code'] = '\n'.join(fence.pop('lines'))
+                fence = None
+            else:
+                fence['lines'].append(line)
+            continue
+
+        if line.startswith('```'):
+            fence = {
+                'language': line[3:].strip(),
+                'lines': [],
+                'line_start': line_number + 1,
+                'line_end': line_number,
+            }
+            code_blocks.append(fence)
+            if current is not None:
+                current['code_blocks'].append(fence)
+            continue
+
+        block_match = _BLOCK_HEADING.match(line)
+        interlude_match = None if block_match else _INTERLUDE_HEADING.match(line)
+
+        if block_match or interlude_match:
+            close_section(line_number - 1)
+            if block_match:
+                number = int(block_match.group(1))
+                section_id = f'block{block_match.group(1).zfill(2)}'
+                kind, title = 'block', block_match.group(2)
+            else:
+                interlude_count += 1
+                number = int(interlude_match.group(1))
+                section_id = f'interlude_section{interlude_count}'
+                kind, title = 'interlude', interlude_match.group(2)
+
+            current = {
+                'id': section_id,
+                'kind': kind,
+                'number': number,
+                'title': title,
+                'narration': None,
+                'code': None,
+                'language': None,
+                'code_blocks': [],
+                'line_start': line_number,
+                'line_end': line_number,
+                'narration_line_start': None,
+                'narration_line_end': None,
+            }
+            mode = 'marker'
+            continue
+
+        if _ANY_HEADING.match(line):
+            close_section(line_number - 1)
+            continue
+
+        if current is not None:
+            if mode == 'marker' and stripped == _NARRATION_MARKER:
+                mode = 'quote'
+            elif mode == 'quote' and stripped:
+                if stripped.startswith('"'):
+                    narration_lines = [stripped]
+                    current['narration_line_start'] = line_number
+                    if len(stripped) > 1 and stripped.endswith('"'):
+                        finish_narration(line_number)
+                    else:
+                        mode = 'narration'
+                else:
+                    mode = None
+            elif mode == 'narration':
+                if stripped:
+                    narration_lines.append(stripped)
+                    if stripped.endswith('"'):
+                        finish_narration(line_number)
+            continue
+
+        simple_match = _SIMPLE_SECTION.match(stripped)
+        if simple_match:
+            simple = {
+                'id': simple_match.group(1),
+                'kind': 'simple',
+                'number': None,
+                'title': simple_match.group(1),
+                'narration_parts': [],
+                'code': None,
+                'language': None,
+                'code_blocks': [],
+                'line_start': line_number,
+                'line_end': line_number,
+                'narration_line_start': line_number + 1,
+                'narration_line_end': line_number,
+            }
+            simple_sections.append(simple)
+        elif simple is not None and stripped:
+            simple['narration_parts'].append(stripped)
+            simple['line_end'] = simple['narration_line_end'] = line_number
+
+    # Unterminated narration counts up to the end of the file
+    if current is not None and mode == 'narration':
+        finish_narration(line_number)
+    close_section(line_number)
+
+    if fence is not None:
+        fence['line_end'] = line_number
+        fence['code'] = '\n'.join(fence.pop('lines'))
+
+    for section in sections:
+        if section['code_blocks']:
+            section['code'] = section['code_blocks'][0]['code']
+            section['language'] = section['code_blocks'][0]['language']
+
+    if not sections:
+        for section in simple_sections:
+            section['narration'] = '\n'.join(section.pop('narration_parts'))
+            sections.append(section)
+
+    return {'sections': sections, 'code_blocks': code_blocks}
+
+
+def parse_text(content):
+    """Parse markdown content given as a string"""
+    return parse_lines(content.splitlines())
+
+
+def _cache_file(path):
+    return path.parent / CACHE_DIRNAME / f'{path.name}.json'
+
+
+def _parse_and_hash(path):
+    """Stream the file once, hashing the raw bytes while parsing the lines"""
+    digest = hashlib.sha256()
+
+    def lines():
+        with open(path, 'rb') as f:
+            for raw in f:
+                digest.update(raw)
+                yield raw.decode('utf-8')
+
+    result = parse_lines(lines())
+    return result, digest.hexdigest()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_file(path, use_cache=True):
+    """
+    Parse a narration markdown file, using the on-disk cache when possible.
+
+    Args:
+        path: Markdown or [section_id] narration file
+        use_cache: Read/write .narration_cache/<name>.json
+
+    Returns:
+        dict: {'sections': [...], 'code_blocks': [...], 'sha256': str}
+    """
+    path = Path(path)
+    stat = path.stat()
+
+    if not use_cache:
+        result, sha256 = _parse_and_hash(path)
+        result['sha256'] = sha256
+        return result
+
+    cache_file = _cache_file(path)
+    cached = None
+    if cache_file.exists():
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = None
+
+    if cached and cached.get('version') == PARSER_VERSION and cached.get('size') == stat.st_size:
+        # Fast path: unchanged size and mtime
+        if cached.get('mtime_ns') == stat.st_mtime_ns:
+            return cached['result']
+        # Touched but possibly identical content (e.g. git checkout)
+        if file_sha256(path) == cached.get('sha256'):
+            cached['mtime_ns'] = stat.st_mtime_ns
+            _write_cache(cache_file, cached)
+            return cached['result']
+
+    result, sha256 = _parse_and_hash(path)
+    result['sha256'] = sha256
+    _write_cache(cache_file, {
+        'version': PARSER_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha256,
+        'result': result,
+    })
+    return result
+
+
+def _write_cache(cache_file, data):
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        # Cache is an optimization only (e.g. read-only checkout)
+        print(f"WARNING: Could not write parse cache {cache_file}: {e}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} <narration_file> [...]")
+        return 1
+
+    for name in sys.argv[1:]:
+        result = parse_file(name)
+        print(f"{name}: {len(result['sections'])} sections, {len(result['code_blocks'])} code blocks")
+        for section in result['sections']:
+            code = f", code {section['code_blocks'][0]['line_start']}-{section['code_blocks'][-1]['line_end']}" \
+                if section['code_blocks'] else ''
+            print(f"  {section['id']:<20} lines {section['line_start']}-{section['line_end']}{code}  {section['title']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
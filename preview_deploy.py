@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Incremental Preview Deploy
+==========================
+
+Deploys the preview of an audio output directory (index.html, preview assets,
+timing.json and the audio files it references) to a web root such as
+/var/www/html/tts_test. Journal, traces, metrics, masters and subtitles are
+never published.
+
+Every deploy builds a new release directory next to the target:
+    /var/www/html/.tts_test.releases/<timestamp>/
+Files whose SHA-256 matches the manifest of the live release are hard-linked
+from it, only new or changed files are copied (in parallel). The target path
+is a symlink that is switched to the new release atomically; stale files
+simply do not exist in the new release, and old releases are pruned.
+
+Content-hashed assets (preview.<hash>.css, preview_data/page-*.<hash>.json)
+get far-future Cache-Control headers via a generated .htaccess.
+
+Usage:
+    python preview_deploy.py audio/ --target /var/www/html/tts_test
+    python generate_web_preview.py deploy audio/ --target /var/www/html/tts_test
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+
+DEFAULT_TARGET = Path('/var/www/html/tts_test')
+MANIFEST_NAME = '.deploy_manifest.json'
+HASH_CACHE = Path('.preview_cache') / 'deploy_hashes.json'
+DEFAULT_KEEP_RELEASES = 3
+PAGE_DIRNAME = 'preview_data'
+HASHED_ASSET = re.compile(r'^preview\.[0-9a-f]{12}\.(css|js)$')
+
+HTACCESS = '''\
+# Generated by preview_deploy.py
+<IfModule mod_headers.c>
+    Header set Cache-Control "no-cache"
+    <FilesMatch "\\.[0-9a-f]{12}\\.(css|js|json)$">
+        Header set Cache-Control "public, max-age=31536000, immutable"
+    </FilesMatch>
+</IfModule>
+<Files ".deploy_manifest.json">
+    Require all denied
+</Files>
+'''
+
+
+def releases_dir(target: Path) -> Path:
+    return target.parent / f'.{target.name}.releases'
+
+
+def source_files(source_dir: Path):
+    """
+    Deployable files (relative POSIX paths): index.html, the hashed preview
+    assets, sections.json and preview_data/, timing.json and the audio files
+    timing.json references. Everything else in the output directory (journal,
+    traces, metrics, masters, subtitles, caches) stays private.
+    """
+    files = [name for name in ('index.html', 'sections.json', 'timing.json')
+             if (source_dir / name).is_file()]
+    files += sorted(path.name for path in source_dir.iterdir()
+                    if path.is_file() and HASHED_ASSET.match(path.name))
+
+    page_dir = source_dir / PAGE_DIRNAME
+    if page_dir.is_dir():
+        files += sorted(f'{PAGE_DIRNAME}/{path.name}' for path in page_dir.iterdir()
+                        if path.is_file() and path.suffix == '.json')
+
+    try:
+        with open(source_dir / 'timing.json', 'r', encoding='utf-8') as f:
+            sections = json.load(f).get('sections', [])
+    except (OSError, ValueError):
+        sections = []
+    for section in sections:
+        # The preview links audio by file name relative to index.html
+        name = Path(section.get('file', '')).name
+        if name and name not in files and (source_dir / name).is_file():
+            files.append(name)
+    return files
+
+
+def hash_files(source_dir: Path, files, jobs: int) -> Dict[str, Dict[str, int]]:
+    """
+    SHA-256 of every file; reuses hashes from the last deploy when size and
+    mtime are unchanged.
+
+    Returns:
+        {relative_path: {'sha256', 'size', 'mtime_ns'}}
+    """
+    cache_file = source_dir / HASH_CACHE
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = {}
+
+    def entry(name):
+        stat = (source_dir / name).stat()
+        previous = cached.get(name)
+        if previous and previous['size'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns:
+            return name, previous
+        digest = hashlib.sha256()
+        with open(source_dir / name, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return name, {'sha256': digest.hexdigest(), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        hashes = dict(pool.map(entry, files))
+
+    if hashes != cached:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(hashes, f)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            # Cache is an optimization only
+            print(f"WARNING: Could not write deploy hash cache: {e}")
+    return hashes
+
+
+def load_live_manifest(target: Path) -> Dict[str, Dict[str, int]]:
+    try:
+        with open(target / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)['files']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def switch_symlink(target: Path, release: Path):
+    """Point target at release atomically (symlink + rename)"""
+    tmp_link = target.parent / f'.{target.name}.switch'
+    if tmp_link.is_symlink() or tmp_link.exists():
+        tmp_link.unlink()
+    os.symlink(os.path.relpath(release, target.parent), tmp_link)
+    os.replace(tmp_link, target)
+
+
+def deploy(source_dir, target=DEFAULT_TARGET, jobs: int = 8, keep: int = DEFAULT_KEEP_RELEASES,
+           dry_run: bool = False) -> Optional[Dict[str, int]]:
+    """
+    Deploy source_dir to target incrementally.
+
+    Args:
+        source_dir: Audio output directory
+        target: Live web path (becomes a symlink to the current release)
+        jobs: Parallel hash/copy workers
+        keep: Number of releases to keep (including the new one)
+        dry_run: Only report what would change
+
+    Returns:
+        {'copied', 'linked', 'removed', 'bytes_copied'} or None on error
+    """
+    source_dir = Path(source_dir)
+    target = Path(target)
+    files = source_files(source_dir)
+    if 'index.html' not in files:
+        print(f"ERROR: {source_dir} has no index.html (run generate_web_preview.py first)")
+        return None
+
+    hashes = hash_files(source_dir, files, jobs)
+    live = load_live_manifest(target)
+    live_dir = target.resolve() if target.exists() else None
+
+    changed = [name for name in files if live.get(name, {}).get('sha256') != hashes[name]['sha256']]
+    unchanged = [name for name in files if name not in changed]
+    removed = sorted(set(live) - set(files))
+    stats = {
+        'copied': len(changed),
+        'linked': len(unchanged),
+        'removed': len(removed),
+        'bytes_copied': sum(hashes[name]['size'] for name in changed),
+    }
+
+    if dry_run:
+        for name in changed:
+            print(f"  + {name}")
+        for name in removed:
+            print(f"  - {name}")
+        return stats
+
+    if not changed and not removed and live_dir is not None:
+        return stats
+
+    releases = releases_dir(target)
+    release = releases / time.strftime('%Y%m%d-%H%M%S')
+    suffix = 1
+    while release.exists():
+        suffix += 1
+        release = releases / f"{time.strftime('%Y%m%d-%H%M%S')}-{suffix}"
+    release.mkdir(parents=True)
+
+    def place(name):
+        destination = release / name
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if name in unchanged and live_dir is not None:
+            try:
+                os.link(live_dir / name, destination)
+                return
+            except OSError:
+                pass
+        tmp = destination.with_name(destination.name + '.tmp')
+        shutil.copy2(source_dir / name, tmp)
+        os.replace(tmp, destination)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        list(pool.map(place, files))
+
+    (release / '.htaccess').write_text(HTACCESS, encoding='utf-8')
+    with open(release / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump({'deployed_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'files': {name: {'sha256': hashes[name]['sha256'], 'size': hashes[name]['size']}
+                             for name in files}}, f, indent=1)
+
+    # First deploy onto a plain directory: move it into the releases dir
+    if target.exists() and not target.is_symlink():
+        target.rename(releases / f'{target.name}.previous')
+    switch_symlink(target, release)
+
+    # Prune old releases (never the live one)
+    old_releases = sorted((path for path in releases.iterdir() if path.is_dir() and path != release),
+                          key=lambda path: path.stat().st_mtime)
+    for path in old_releases[:max(len(old_releases) - (keep - 1), 0)]:
+        shutil.rmtree(path, ignore_errors=True)
+
+    return stats
+
+
+def add_deploy_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('output_dir', help='Directory containing audio files, timing.json and index.html')
+    parser.add_argument('--target', type=Path, default=DEFAULT_TARGET,
+                        help=f'Live web path, becomes a symlink to the current release (default: {DEFAULT_TARGET})')
+    parser.add_argument('--jobs', '-j', type=int, default=8, help='Parallel copy workers (default: 8)')
+    parser.add_argument('--keep', type=int, default=DEFAULT_KEEP_RELEASES,
+                        help=f'Releases to keep for rollback (default: {DEFAULT_KEEP_RELEASES})')
+    parser.add_argument('--dry-run', action='store_true', help='Only show which files would change')
+
+
+def run_deploy(args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    try:
+        stats = deploy(args.output_dir, args.target, jobs=max(1, args.jobs), keep=max(1, args.keep),
+                       dry_run=args.dry_run)
+    except PermissionError as e:
+        print(f"ERROR: {e}")
+        print("The web root is not writable, run with sudo or adjust the permissions")
+        return 1
+    if stats is None:
+        return 1
+
+    action = 'Would copy' if args.dry_run else 'Copied'
+    print(f"✓ {action} {stats['copied']} files ({stats['bytes_copied'] / 1024 / 1024:.1f} MB), "
+          f"{stats['linked']} unchanged, {stats['removed']} removed "
+          f"-> {args.target} ({time.perf_counter() - started:.2f}s)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Incrementally deploy the TTS audio preview to a web root')
+    add_deploy_arguments(parser)
+    return run_deploy(parser.parse_args())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Local Preview Server
+====================
+
+Serves the audio output directory (MP3s, timing.json, index.html from
+generate_web_preview.py) directly, so regenerated sections can be reviewed
+without copying anything to /var/www.
+
+Features:
+- HTTP/1.1 keep-alive, GET and HEAD
+- Byte ranges (206 Partial Content, If-Range) so MP3 seeking does not
+  re-download the file
+- Strong ETags (SHA-256 of the content, cached per size/mtime) and 304
+  responses for If-None-Match
+- gzip for HTML/JSON/JS/CSS when the client accepts it
+- Far-future Cache-Control for content-hashed assets (name.<hash>.ext)
+- Live reload: pages get a small script that listens on /__live
+  (Server-Sent Events); a reload event is pushed whenever timing.json,
+  the preview data or a section audio file changes
+
+Usage:
+    python preview_server.py audio/ --port 8000
+    python generate_web_preview.py serve audio/ --port 8000
+"""
+
+import re
+import sys
+import gzip
+import json
+import asyncio
+import hashlib
+import argparse
+import mimetypes
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+import preview_deploy
+
+
+CHUNK_SIZE = 256 * 1024
+WATCH_INTERVAL = 0.5
+LIVE_RELOAD_PATH = '/__live'
+COMPRESSIBLE_TYPES = ('text/html', 'application/json', 'text/javascript', 'application/javascript', 'text/css')
+
+# name.<12 hex>.ext, as written by generate_web_preview.write_static_asset
+_HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[A-Za-z0-9]+$')
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+LIVE_RELOAD_SCRIPT = b'''<script>
+(function () {
+    const events = new EventSource('/__live');
+    events.addEventListener('reload', () => location.reload());
+})();
+</script>
+'''
+
+_STATUS_TEXT = {
+    200: 'OK',
+    206: 'Partial Content',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    416: 'Range Not Satisfiable',
+}
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range.
+
+    Returns:
+        (start, end) inclusive, or None if the range is not satisfiable.
+        Multi-range requests are answered with the first range only.
+
+    Raises:
+        ValueError: malformed header (caller ignores the Range header)
+    """
+    match = _RANGE.match(header.split(',')[0].strip())
+    if not match:
+        raise ValueError(header)
+    first, last = match.groups()
+    if not first and not last:
+        raise ValueError(header)
+
+    if not first:
+        # Suffix range: last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            return None
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+class PreviewServer:
+    """
+    Minimal asyncio HTTP/1.1 static file server with live reload.
+    """
+
+    def __init__(self, root, host: str = '127.0.0.1', port: int = 8000, live_reload: bool = True):
+        """
+        Args:
+            root: Directory to serve (audio output dir)
+            host: Bind address
+            port: Port (0 = pick a free port)
+            live_reload: Inject the reload script and watch for changes
+        """
+        self.root = Path(root).resolve()
+        self.host = host
+        self.port = port
+        self.live_reload = live_reload
+        self.stats = {'requests': 0, 'bytes_sent': 0, 'reloads': 0}
+        self._etags: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._compressed: Dict[str, Tuple[str, bytes]] = {}
+        self._listeners = set()
+        self._server = None
+        self._watcher = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def resolve(self, url_path: str) -> Optional[Path]:
+        """Map a URL path to a file below root (None if outside or missing)"""
+        path = unquote(urlsplit(url_path).path)
+        if path.endswith('/'):
+            path += 'index.html'
+        candidate = (self.root / path.lstrip('/')).resolve()
+        if candidate != self.root and self.root not in candidate.parents:
+            return None
+        if any(part.startswith('.') for part in candidate.relative_to(self.root).parts):
+            return None
+        return candidate if candidate.is_file() else None
+
+    def etag(self, path: Path, stat) -> str:
+        """Strong ETag from the file content, hashed once per (size, mtime)"""
+        version = (stat.st_size, stat.st_mtime_ns)
+        cached = self._etags.get(str(path))
+        if cached and cached[0] == version:
+            return cached[1]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        etag = f'"{digest.hexdigest()[:32]}"'
+        self._etags[str(path)] = (version, etag)
+        return etag
+
+    def cache_control(self, path: Path) -> str:
+        if _HASHED_NAME.search(path.name):
+            return 'public, max-age=31536000, immutable'
+        return 'no-cache'
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _send(self, writer, status: int, headers: dict, body: bytes = b'', head: bool = False):
+        lines = [f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}"]
+        headers = dict(headers, **{'Content-Length': str(len(body)), 'Connection': 'keep-alive'})
+        if status == 304:
+            del headers['Content-Length']
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if not head and body:
+            writer.write(body)
+            self.stats['bytes_sent'] += len(body)
+        await writer.drain()
+
+    async def _send_file_range(self, writer, status: int, headers: dict, path: Path,
+                               start: int, end: int, head: bool):
+        length = end - start + 1
+        lines = [f"HTTP/1.1 {status} {_STATUS_TEXT[status]}"]
+        headers = dict(headers, **{'Content-Length': str(length), 'Connection': 'keep-alive'})
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if not head:
+            with open(path, 'rb') as f:
+                f.seek(start)
+                remaining = length
+                while remaining > 0:
+                    block = f.read(min(CHUNK_SIZE, remaining))
+                    if not block:
+                        break
+                    writer.write(block)
+                    remaining -= len(block)
+                    self.stats['bytes_sent'] += len(block)
+                    await writer.drain()
+        await writer.drain()
+
+    async def _handle_file(self, writer, method: str, url_path: str, headers: dict):
+        head = method == 'HEAD'
+        path = self.resolve(url_path)
+        if path is None:
+            await self._send(writer, 404, {'Content-Type': 'text/plain'}, b'not found', head)
+            return
+
+        stat = path.stat()
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        if path.suffix == '.mp3':
+            content_type = 'audio/mpeg'
+        etag = self.etag(path, stat)
+        response_headers = {
+            'Content-Type': content_type + ('; charset=utf-8' if content_type.startswith('text/')
+                                            or content_type == 'application/json' else ''),
+            'Cache-Control': self.cache_control(path),
+            'Accept-Ranges': 'bytes',
+        }
+
+        # Small text files: optional live-reload injection and gzip
+        if content_type in COMPRESSIBLE_TYPES:
+            body = path.read_bytes()
+            variant = ''
+            if self.live_reload and content_type == 'text/html' and b'</body>' in body:
+                body = body.replace(b'</body>', LIVE_RELOAD_SCRIPT + b'</body>', 1)
+                variant = '-live'
+            response_headers['Vary'] = 'Accept-Encoding'
+            if 'gzip' in headers.get('accept-encoding', ''):
+                variant += '-gzip'
+                cached = self._compressed.get(str(path))
+                if cached and cached[0] == etag + variant:
+                    body = cached[1]
+                else:
+                    body = gzip.compress(body, compresslevel=6, mtime=0)
+                    self._compressed[str(path)] = (etag + variant, body)
+                response_headers['Content-Encoding'] = 'gzip'
+            etag = f'{etag[:-1]}{variant}"'
+            response_headers['ETag'] = etag
+            del response_headers['Accept-Ranges']
+            if etag in headers.get('if-none-match', ''):
+                await self._send(writer, 304, response_headers, head=head)
+            else:
+                await self._send(writer, 200, response_headers, body, head)
+            return
+
+        response_headers['ETag'] = etag
+        if etag in headers.get('if-none-match', ''):
+            await self._send(writer, 304, response_headers, head=head)
+            return
+
+        start, end = 0, stat.st_size - 1
+        status = 200
+        range_header = headers.get('range')
+        # If-Range: only honour the range if the client's copy is current
+        if range_header and headers.get('if-range', etag) == etag:
+            try:
+                byte_range = parse_range(range_header, stat.st_size)
+            except ValueError:
+                byte_range = (start, end)
+            if byte_range is None:
+                response_headers['Content-Range'] = f'bytes */{stat.st_size}'
+                await self._send(writer, 416, response_headers, head=head)
+                return
+            if byte_range != (0, stat.st_size - 1):
+                start, end = byte_range
+                status = 206
+                response_headers['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+
+        await self._send_file_range(writer, status, response_headers, path, start, end, head)
+
+    async def _handle_live(self, writer):
+        """Server-Sent Events stream; stays open until the client disconnects"""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n"
+                     b"retry: 1000\n\n")
+        await writer.drain()
+        queue = asyncio.Queue()
+        self._listeners.add(queue)
+        try:
+            while True:
+                try:
+                    changed = await asyncio.wait_for(queue.get(), timeout=15)
+                    writer.write(f"event: reload\ndata: {json.dumps(changed)}\n\n".encode('utf-8'))
+                except asyncio.TimeoutError:
+                    writer.write(b": keep-alive\n\n")
+                await writer.drain()
+        finally:
+            self._listeners.discard(queue)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                await reader.readexactly(int(headers.get('content-length', 0)))
+                self.stats['requests'] += 1
+
+                if method not in ('GET', 'HEAD'):
+                    await self._send(writer, 405, {'Content-Type': 'text/plain', 'Allow': 'GET, HEAD'},
+                                     b'method not allowed')
+                elif self.live_reload and urlsplit(path).path == LIVE_RELOAD_PATH:
+                    await self._handle_live(writer)
+                    break
+                else:
+                    await self._handle_file(writer, method, path, headers)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    # ------------------------------------------------------------------
+    # Live reload
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """(size, mtime) of the preview files: index.html, assets, sections.json,
+        preview_data/, timing.json and the audio files timing.json references"""
+        files = {}
+        for name in preview_deploy.source_files(self.root):
+            try:
+                stat = (self.root / name).stat()
+            except OSError:
+                continue
+            files[name] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    async def _watch(self):
+        previous = self.snapshot()
+        while True:
+            await asyncio.sleep(WATCH_INTERVAL)
+            current = self.snapshot()
+            changed = sorted(name for name in previous.keys() | current.keys()
+                             if previous.get(name) != current.get(name))
+            previous = current
+            if changed:
+                self.stats['reloads'] += 1
+                print(f"Changed: {', '.join(changed[:5])}{' ...' if len(changed) > 5 else ''}"
+                      f" -> reload ({len(self._listeners)} clients)")
+                for queue in self._listeners:
+                    queue.put_nowait(changed)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Start the server in the running event loop"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.live_reload:
+            self._watcher = asyncio.ensure_future(self._watch())
+        return self
+
+    async def stop(self):
+        if self._watcher:
+            self._watcher.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+
+def add_serve_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('output_dir', help='Directory containing audio files, timing.json and index.html')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port (default: 8000)')
+    parser.add_argument('--no-live-reload', action='store_true', help='Do not push reload events on changes')
+
+
+def serve(args: argparse.Namespace) -> int:
+    output_dir = Path(args.output_dir)
+    if not output_dir.is_dir():
+        print(f"ERROR: Directory not found: {output_dir}")
+        return 1
+
+    server = PreviewServer(output_dir, host=args.host, port=args.port, live_reload=not args.no_live_reload)
+
+    async def run():
+        await server.start()
+        print(f"Serving {server.root} on {server.base_url}/")
+        if server.live_reload:
+            print("Live reload enabled (timing.json, preview data and audio files are watched)")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print(f"\nStopped. Requests: {server.stats['requests']}, "
+              f"sent: {server.stats['bytes_sent'] / 1024 / 1024:.1f} MB, reloads: {server.stats['reloads']}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the TTS audio preview locally')
+    add_serve_arguments(parser)
+    return serve(parser.parse_args())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,95 +1,245 @@
 #!/usr/bin/env python3
 """
-Regeneriere einzelnen Audio-Block.
+Regeneriere einzelne Audio-Blöcke.
+
+Generates the selected sections in-process (concurrently) and splices the
+new durations into the existing audio/timing.json instead of overwriting it.
 
 Usage:
     python3 regenerate_single.py block03
-    python3 regenerate_single.py interlude_section2
+    python3 regenerate_single.py interlude_section2 block11
+    python3 regenerate_single.py block03..block07
+    python3 regenerate_single.py 'interlude_*'
+    python3 regenerate_single.py --changes narrations/changes.json
+    python3 regenerate_single.py block03 --encode      # PCM master + local encoding
+
+Output dirs built with fish_audio_tts.py --encode are detected from the
+journal: sections are fetched once as PCM into .pcm/ and encoded locally
+into all delivery formats (see audio_encode.py).
 """
 
+import os
 import sys
-import subprocess
+import json
+import argparse
+from fnmatch import fnmatchcase
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from fish_audio_tts import (
+    FishAudioTTS,
+    add_tts_arguments,
+    resolve_tts_settings,
+    create_cache,
+)
+from tts_timing import parse_narration_file, update_timing_file
+from tts_cache import make_cache_key, KEY_PARAMS
+from tts_journal import CompletionJournal
+from audio_encode import encode_section, resolve_formats, PCM_DIRNAME, DELIVERY_FORMATS
+
+
+def select_sections(selectors, section_ids):
+    """
+    Resolve section selectors to section ids in narration order.
+
+    Supported selectors:
+        block03              exact id
+        block03..block07     inclusive range (narration order)
+        interlude_*          glob pattern
+
+    Returns:
+        (selected ids, list of selectors that matched nothing)
+    """
+    selected = set()
+    unknown = []
+
+    for selector in selectors:
+        if '..' in selector:
+            first, last = selector.split('..', 1)
+            if first not in section_ids or last not in section_ids:
+                unknown.append(selector)
+                continue
+            start, end = section_ids.index(first), section_ids.index(last)
+            if start > end:
+                start, end = end, start
+            selected.update(section_ids[start:end + 1])
+        elif any(char in selector for char in '*?['):
+            matches = [section_id for section_id in section_ids if fnmatchcase(section_id, selector)]
+            if not matches:
+                unknown.append(selector)
+            selected.update(matches)
+        elif selector in section_ids:
+            selected.add(selector)
+        else:
+            unknown.append(selector)
+
+    return [section_id for section_id in section_ids if section_id in selected], unknown
+
+
+def delivered_formats(output_dir, section_ids):
+    """
+    Delivery formats an --encode output dir already contains, primary format
+    (the one timing.json references) first. Empty if none are found.
+    """
+    formats = [fmt for fmt in DELIVERY_FORMATS
+               if any((output_dir / f"{section_id}.{fmt}").exists() for section_id in section_ids)]
+    timing_file = output_dir / "timing.json"
+    if timing_file.exists():
+        with open(timing_file, 'r', encoding='utf-8') as f:
+            entries = json.load(f).get('sections', [])
+        primary = Path(entries[0]['file']).suffix.lstrip('.') if entries else None
+        if primary in formats:
+            formats.remove(primary)
+            formats.insert(0, primary)
+    return formats
 
-def extract_section(section_id, input_file='narrations_combined.txt'):
-    """Extrahiere einzelne Sektion aus kombinierter Datei"""
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Finde Start und Ende
-    start_marker = f'[{section_id}]'
-    sections = content.split('[')
-
-    for i, section in enumerate(sections):
-        if section.startswith(section_id + ']'):
-            # Finde Text bis zur nächsten Sektion
-            text = section.split(']', 1)[1].strip()
-            if i + 1 < len(sections):
-                # Entferne nächste Sektion
-                next_section_start = text.find('\n\n[')
-                if next_section_start > 0:
-                    text = text[:next_section_start]
-
-            return f'[{section_id}]\n{text}\n'
-
-    return None
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python3 regenerate_single.py <section_id>")
-        print("\nExamples:")
-        print("  python3 regenerate_single.py block03")
-        print("  python3 regenerate_single.py interlude_section2")
-        print("\nAvailable sections:")
-        print("  Run: grep '^\\[' narrations_combined.txt")
+    parser = argparse.ArgumentParser(
+        description='Regenerate selected audio sections and patch timing.json',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python3 regenerate_single.py block03
+  python3 regenerate_single.py block03..block07 interlude_section2
+  python3 regenerate_single.py 'interlude_*' --workers 5
+  python3 regenerate_single.py --changes narrations/changes.json
+        """
+    )
+    parser.add_argument('sections', nargs='*', help='Section ids, ranges (a..b) or glob patterns')
+    parser.add_argument('--changes', type=Path,
+                        help='Change set from extract_narrations.py: regenerate added/changed, drop removed sections')
+    parser.add_argument('--narration-file', '-n', type=Path, default=Path('narrations_combined.txt'),
+                        help='Combined narration file (default: narrations_combined.txt)')
+    parser.add_argument('--output-dir', '-d', type=Path, default=Path('audio'),
+                        help='Audio output directory with timing.json (default: ./audio/)')
+    parser.add_argument('--workers', '-w', type=int, default=4, help='Concurrent API requests (default: 4)')
+    parser.add_argument('--encode', nargs='?', const='config', metavar='FORMATS',
+                        help='Fetch PCM once and encode locally, e.g. mp3,opus,wav (no value: delivery.formats '
+                             'from config.json). Default when the journal points at .pcm/ masters: '
+                             'the formats already in the output dir')
+    add_tts_arguments(parser)
+
+    args = parser.parse_args()
+
+    if not args.narration_file.exists():
+        print(f"ERROR: Narration file not found: {args.narration_file}")
         sys.exit(1)
 
-    section_id = sys.argv[1]
+    sections = parse_narration_file(args.narration_file)
+    section_ids = list(sections)
+
+    selectors = list(args.sections)
+    removed = []
+    if args.changes:
+        with open(args.changes, 'r', encoding='utf-8') as f:
+            changes = json.load(f)
+        selectors += changes.get('added', []) + changes.get('changed', [])
+        removed = [section_id for section_id in changes.get('removed', []) if section_id not in sections]
 
-    # Extrahiere Sektion
-    print(f"Extracting {section_id}...")
-    text = extract_section(section_id)
+    if not selectors and not removed:
+        print("Nothing to regenerate (no sections given, change set is empty).")
+        return
 
-    if not text:
-        print(f"ERROR: Section {section_id} not found!")
+    selected, unknown = select_sections(selectors, section_ids)
+    if unknown:
+        print(f"ERROR: No section matches: {', '.join(unknown)}")
         print("\nAvailable sections:")
-        subprocess.run(['grep', '^\\[', 'narrations_combined.txt'])
+        for section_id in section_ids:
+            print(f"  {section_id}")
         sys.exit(1)
 
-    # Schreibe temporäre Datei
-    temp_file = Path(f'temp_{section_id}.txt')
-    temp_file.write_text(text, encoding='utf-8')
-    print(f"✓ Created {temp_file}")
-
-    # Generiere Audio
-    print(f"\nGenerating audio for {section_id}...")
-    result = subprocess.run([
-        '../template/venv/bin/python',
-        '../template/fish_audio_tts.py',
-        '--narration-file', str(temp_file),
-        '--output-dir', './audio/'
-    ])
-
-    if result.returncode == 0:
-        print(f"\n✓ Successfully regenerated audio/{section_id}.mp3")
-
-        # Cleanup
-        temp_file.unlink()
-        print(f"✓ Cleaned up {temp_file}")
-
-        print(f"\nNext steps:")
-        print(f"1. Listen to audio/{section_id}.mp3:")
-        print(f"   mpg123 audio/{section_id}.mp3")
-        print(f"\n2. If good, update web preview:")
-        print(f"   cd ../template")
-        print(f"   python3 generate_web_preview.py ../EquityEA/audio/ --narration-file ../EquityEA/codeyoutube.md")
-        print(f"\n3. Deploy to web server:")
-        print(f"   sudo cp ../EquityEA/audio/{section_id}.mp3 /var/www/html/tts_test/")
-        print(f"   sudo cp ../EquityEA/audio/index.html /var/www/html/tts_test/")
-    else:
-        print(f"\n✗ Audio generation failed!")
-        temp_file.unlink()
+    config, api_key, base_url, tts_params = resolve_tts_settings(args)
+    cache = create_cache(args, config)
+
+    output_dir = args.output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tts = FishAudioTTS(api_key=api_key, base_url=base_url)
+    journal = CompletionJournal(output_dir)
+
+    # Same flow as the original run: an --encode output dir keeps its PCM masters
+    pcm_dir = output_dir / PCM_DIRNAME
+    encode = args.encode
+    if not encode and any(Path(entry['file']).parent.resolve() == pcm_dir.resolve()
+                          for entry in journal.entries.values()):
+        encode = ','.join(delivered_formats(output_dir, journal.entries)) or 'config'
+        print(f"Journal points at PCM masters in {pcm_dir}, encoding locally (--encode {encode})")
+    encode_formats = None
+    if encode:
+        try:
+            encode_formats = resolve_formats(encode, config)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        tts_params = dict(tts_params, format='pcm')
+        pcm_dir.mkdir(exist_ok=True)
+
+    journal_params = {name: tts_params[name] for name in KEY_PARAMS if name in tts_params}
+
+    print(f"Regenerating {len(selected)} section(s): {', '.join(selected)}\n")
+
+    def regenerate(section_id, encode_pool):
+        text = sections[section_id]
+        output_file = pcm_dir / f"{section_id}.pcm" if encode_formats else output_dir / f"{section_id}.mp3"
+        input_hash = make_cache_key(text, tts_params)
+
+        # Never write through a hardlink into the cache
+        output_file.unlink(missing_ok=True)
+        tts.generate_audio(text=text, output_path=str(output_file), **tts_params)
+        delivered_file = output_file
+        if encode_formats:
+            # Duration from the sample count, delivery files from the new master
+            delivery = encode_section(output_file, output_dir, section_id, encode_formats,
+                                      config.get('delivery'), pool=encode_pool, force=True)
+            delivered_file = Path(delivery['file'])
+            duration = delivery['duration_seconds']
+        else:
+            duration = tts.generate_duration_info(output_file)['duration_seconds']
+        if cache:
+            cache.store(input_hash, output_file)
+
+        journal.record(section_id, output_file, duration, input_hash, text, journal_params)
+        return {'section_id': section_id, 'file': str(delivered_file), 'duration_seconds': duration, 'text': text}
+
+    results = {}
+    failed = {}
+    workers = max(1, min(args.workers, len(selected)))
+    encode_pool = (ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, workers * len(encode_formats)))
+                   if encode_formats else None)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {section_id: pool.submit(regenerate, section_id, encode_pool) for section_id in selected}
+        for section_id, future in futures.items():
+            try:
+                results[section_id] = future.result()
+            except Exception as e:
+                failed[section_id] = e
+    if encode_pool:
+        encode_pool.shutdown()
+
+    if results or removed:
+        timing_file, first_changed = update_timing_file(output_dir, results, section_ids, removed)
+        print(f"\n✓ Patched {timing_file} ({len(results)} updated, {len(removed)} removed, "
+              f"offsets recomputed from position {first_changed + 1})")
+        for section_id, result in results.items():
+            print(f"  {section_id}: {result['duration_seconds']:.1f}s")
+
+    if failed:
+        print(f"\n✗ Audio generation failed:")
+        for section_id, error in failed.items():
+            print(f"  {section_id}: {error}")
         sys.exit(1)
 
+    print(f"\nNext steps:")
+    print(f"1. Listen to the regenerated files:")
+    for section_id in selected:
+        listen_file = results[section_id]['file'] if section_id in results else output_dir / f'{section_id}.mp3'
+        print(f"   mpg123 {listen_file}")
+    print(f"\n2. If good, update web preview (a running 'serve' reloads automatically):")
+    print(f"   python3 generate_web_preview.py {output_dir}/ --narration-file codeyoutube.md")
+    print(f"   python3 generate_web_preview.py serve {output_dir}/")
+    print(f"\n3. Deploy to web server (only changed files are copied):")
+    print(f"   sudo python3 generate_web_preview.py deploy {output_dir}/")
+
+
 if __name__ == '__main__':
     main()
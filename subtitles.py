@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Untertitel aus Audio + Break-Tags
+=================================
+
+Erzeugt millisekundengenaue WebVTT/SRT-Untertitel für die ganze Timeline.
+
+Pro Abschnitt:
+1. Text in Cue-Einheiten zerlegen: Sätze und (break)/(long-break) Grenzen
+2. Pausen im Audio finden (audio_silence.py, vektorisiert)
+3. Grenzen per dynamischer Programmierung monoton den Pausen zuordnen,
+   die am besten zur erwarteten Position passen (DurationModel aus
+   tts_plan.py); Grenzen ohne passende Pause bekommen die erwartete Zeit
+4. Cues beginnen am Ende einer Pause und enden am Anfang der nächsten
+
+Die Pausen-Analyse läuft parallel in einem Process-Pool und wird pro
+Audio-Hash in <output_dir>/.silence_cache.json gespeichert: nach der
+Korrektur eines Blocks wird nur dieser eine Abschnitt neu analysiert.
+
+Texte kommen aus journal.jsonl (voller Text), alternativ aus --narration-file.
+
+Die Abschnitte liegen hintereinander wie in timing.json. Gibt es einen von
+audio_assemble.py gebauten Master (master.json), gelten dessen Startzeiten,
+die Pausen und Ausrichtung auf Video-Frames enthalten.
+
+Usage:
+    python subtitles.py audio/
+    python subtitles.py audio/ --narration-file narrations_combined.txt
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Tuple, Optional
+
+from audio_silence import detect_silences, MIN_SILENCE_SECONDS, RELATIVE_DB
+from tts_journal import CompletionJournal, file_sha256
+from tts_plan import load_models, TAG_PATTERN, DurationModel, DEFAULT_TOLERANCE
+from tts_timing import parse_narration_file
+from audio_assemble import MASTER_TIMELINE_FILENAME
+
+
+CACHE_FILENAME = ".silence_cache.json"
+CACHE_VERSION = 1
+
+MAX_CUE_CHARS = 84
+MAX_LINE_CHARS = 42
+
+# Kosten (Sekunden) für eine Grenze ohne zugeordnete Pause
+SKIP_COST = 1.0
+
+# Grenz-Stärke: bestimmt die angenommene Pausenlänge bei der Vorhersage
+SENTENCE, BREAK, LONG_BREAK = 'sentence', 'break', 'long-break'
+SENTENCE_PAUSE_SECONDS = 0.25
+
+BREAK_SPLIT = re.compile(r'(\((?:long-)?break\))')
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+
+
+def split_units(text: str) -> List[Dict[str, Any]]:
+    """
+    Zerlegt einen Abschnitt in Cue-Einheiten.
+
+    Returns:
+        Liste von {'text', 'words', 'pause'}; pause = geschätzte Pausen-Art
+        nach der Einheit als Liste (z.B. ['break', 'break'] oder ['sentence'])
+    """
+    units = []
+    for piece in BREAK_SPLIT.split(text):
+        tag = TAG_PATTERN.fullmatch(piece.strip()) if piece.strip() else None
+        if tag and tag.group(1) in (BREAK, LONG_BREAK):
+            if units:
+                units[-1]['pause'] = [p for p in units[-1]['pause'] if p != SENTENCE] + [tag.group(1)]
+            continue
+
+        for sentence in SENTENCE_SPLIT.split(piece):
+            spoken = ' '.join(TAG_PATTERN.sub(' ', sentence).split())
+            if spoken:
+                units.append({'text': spoken, 'words': len(spoken.split()), 'pause': [SENTENCE]})
+    return units
+
+
+def expected_boundaries(units: List[Dict[str, Any]], model: DurationModel, start: float, end: float) -> List[float]:
+    """Erwartete Mitte jeder Pause zwischen zwei Einheiten, skaliert auf den Sprachbereich"""
+    pause_seconds = {SENTENCE: SENTENCE_PAUSE_SECONDS, BREAK: model.break_seconds, LONG_BREAK: model.long_break_seconds}
+    position = 0.0
+    boundaries = []
+    for unit in units:
+        position += unit['words'] * model.seconds_per_word
+        pause = sum(pause_seconds[kind] for kind in unit['pause'])
+        boundaries.append(position + pause / 2)
+        position += pause
+    boundaries.pop()
+
+    # Letzte Pause zählt nicht zur Sprechdauer
+    total = position - sum(pause_seconds[kind] for kind in units[-1]['pause'])
+    scale = (end - start) / total if total > 0 else 0.0
+    return [start + boundary * scale for boundary in boundaries]
+
+
+def align(expected: List[float], silences: List[Tuple[float, float]]) -> List[Optional[Tuple[float, float]]]:
+    """
+    Ordnet jeder erwarteten Grenze höchstens eine Pause zu (monoton, minimale Abweichung).
+
+    Returns:
+        Pro Grenze die Pause (start, end) oder None
+    """
+    count, available = len(expected), len(silences)
+    infinity = float('inf')
+    cost = [[infinity] * (available + 1) for _ in range(count + 1)]
+    choice = [[None] * (available + 1) for _ in range(count + 1)]
+    for j in range(available + 1):
+        cost[0][j] = 0.0
+
+    for i in range(1, count + 1):
+        cost[i][0] = cost[i - 1][0] + SKIP_COST
+        choice[i][0] = 'skip'
+        for j in range(1, available + 1):
+            start, end = silences[j - 1]
+            options = (
+                (cost[i][j - 1], 'unused'),
+                (cost[i - 1][j] + SKIP_COST, 'skip'),
+                (cost[i - 1][j - 1] + abs((start + end) / 2 - expected[i - 1]), 'match'),
+            )
+            cost[i][j], choice[i][j] = min(options, key=lambda option: option[0])
+
+    matched = [None] * count
+    i, j = count, available
+    while i > 0:
+        step = choice[i][j]
+        if step == 'match':
+            matched[i - 1] = silences[j - 1]
+            i, j = i - 1, j - 1
+        elif step == 'skip':
+            i -= 1
+        else:
+            j -= 1
+    return matched
+
+
+def wrap_lines(text: str) -> str:
+    """Bricht einen Cue in höchstens zwei ausgeglichene Zeilen um"""
+    if len(text) <= MAX_LINE_CHARS:
+        return text
+    middle = len(text) // 2
+    spaces = [index for index, char in enumerate(text) if char == ' ']
+    if not spaces:
+        return text
+    split = min(spaces, key=lambda index: abs(index - middle))
+    return text[:split] + '\n' + text[split + 1:]
+
+
+def split_long(text: str, start: float, end: float) -> List[Tuple[float, float, str]]:
+    """Zu lange Einheiten an Wortgrenzen teilen, Zeit proportional zu den Zeichen"""
+    if len(text) <= MAX_CUE_CHARS:
+        return [(start, end, text)]
+
+    chunks, current = [], ''
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > MAX_CUE_CHARS:
+            chunks.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    chunks.append(current)
+
+    total = sum(len(chunk) for chunk in chunks)
+    cues, position = [], start
+    for chunk in chunks:
+        chunk_end = position + (end - start) * len(chunk) / total
+        cues.append((position, chunk_end, chunk))
+        position = chunk_end
+    return cues
+
+
+def section_cues(text: str, silences: List[Tuple[float, float]], duration: float,
+                 model: DurationModel) -> List[Tuple[float, float, str]]:
+    """Cues (start, end, text) eines Abschnitts, Zeiten relativ zum Abschnitts-Anfang"""
+    units = split_units(text)
+    if not units:
+        return []
+
+    # Stille am Anfang/Ende gehört zu keinem Cue
+    silences = list(silences)
+    start, end = 0.0, duration
+    if silences and silences[0][0] <= 0.05:
+        start = silences.pop(0)[1]
+    if silences and silences[-1][1] >= duration - 0.05:
+        end = silences.pop()[0]
+    if end <= start:
+        start, end = 0.0, duration
+
+    boundaries = []
+    if len(units) > 1:
+        expected = expected_boundaries(units, model, start, end)
+        for guess, silence in zip(expected, align(expected, silences)):
+            boundaries.append(silence if silence else (guess, guess))
+
+    cues = []
+    position = start
+    for unit, boundary in zip(units, boundaries + [(end, end)]):
+        cue_end = max(boundary[0], position)
+        cues.extend(split_long(unit['text'], position, cue_end))
+        position = max(boundary[1], cue_end)
+    return cues
+
+
+def format_cue_time(seconds: float, separator: str = '.') -> str:
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+
+def write_vtt(path: Path, cues: List[Tuple[float, float, str]]):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("WEBVTT\n\n")
+        for start, end, text in cues:
+            f.write(f"{format_cue_time(start)} --> {format_cue_time(end)}\n{wrap_lines(text)}\n\n")
+
+
+def write_srt(path: Path, cues: List[Tuple[float, float, str]]):
+    with open(path, 'w', encoding='utf-8') as f:
+        for index, (start, end, text) in enumerate(cues, 1):
+            f.write(f"{index}\n{format_cue_time(start, ',')} --> {format_cue_time(end, ',')}\n{wrap_lines(text)}\n\n")
+
+
+def _analyze(job: Tuple[str, float]) -> Dict[str, Any]:
+    """Worker (läuft im Process-Pool): Pausen eines Files"""
+    path, min_silence = job
+    silences, duration = detect_silences(path, min_silence=min_silence)
+    return {'silences': silences, 'duration': duration}
+
+
+def silence_map(files: Dict[str, Path], cache_file: Path, jobs: int,
+                min_silence: float = MIN_SILENCE_SECONDS) -> Dict[str, Dict[str, Any]]:
+    """
+    Pausen aller Files, gecacht pro Audio-Hash.
+
+    Returns:
+        {section_id: {'silences', 'duration'}}
+    """
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') != CACHE_VERSION:
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    entries = cache.get('entries', {})
+
+    params = f"{min_silence}:{RELATIVE_DB}"
+    keys = {section_id: f"{file_sha256(path)}:{params}" for section_id, path in files.items()}
+    missing = {section_id: path for section_id, path in files.items() if keys[section_id] not in entries}
+
+    if missing:
+        with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(missing)))) as pool:
+            analyzed = pool.map(_analyze, [(str(path), min_silence) for path in missing.values()])
+            for section_id, result in zip(missing, analyzed):
+                entries[keys[section_id]] = result
+
+        # Nur Einträge der aktuellen Files behalten
+        live = set(keys.values())
+        tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION,
+                       'entries': {key: value for key, value in entries.items() if key in live}}, f)
+        os.replace(tmp_file, cache_file)
+
+    print(f"Pausen-Analyse: {len(missing)} analysiert, {len(files) - len(missing)} aus Cache")
+    return {section_id: entries[keys[section_id]] for section_id in files}
+
+
+def section_offsets(timing: Dict[str, Any], timeline_file: Path) -> Dict[str, float]:
+    """
+    Startzeit jedes Abschnitts: aus dem Master-Timeline-File von
+    audio_assemble.py, falls es zu timing.json passt, sonst kumulativ.
+    """
+    section_ids = [entry['section_id'] for entry in timing['sections']]
+    if timeline_file.exists():
+        with open(timeline_file, 'r', encoding='utf-8') as f:
+            timeline = json.load(f)
+        if [section['section_id'] for section in timeline['sections']] == section_ids:
+            return {section['section_id']: section['start_seconds'] for section in timeline['sections']}
+        print(f"WARNUNG: {timeline_file} passt nicht zu timing.json (Master neu bauen mit audio_assemble.py), "
+              f"Abschnitte werden ohne Pausen aneinandergereiht")
+
+    offsets = {}
+    offset = 0.0
+    for entry in timing['sections']:
+        offsets[entry['section_id']] = offset
+        offset += entry['duration_seconds']
+    return offsets
+
+
+def generate_subtitles(output_dir: Path, texts: Optional[Dict[str, str]] = None, jobs: int = os.cpu_count() or 1,
+                       min_silence: float = MIN_SILENCE_SECONDS,
+                       timeline_file: Optional[Path] = None) -> List[Tuple[float, float, str]]:
+    """
+    Erzeugt subtitles.vtt und subtitles.srt im Output-Verzeichnis.
+
+    Args:
+        output_dir: Verzeichnis mit timing.json
+        texts: {section_id: Text} (default: Texte aus journal.jsonl)
+        jobs: Worker-Prozesse für die Pausen-Analyse
+        min_silence: Mindestlänge einer Pause in Sekunden
+        timeline_file: Timeline des Masters (default: <output_dir>/master.json)
+
+    Returns:
+        Alle Cues (start, end, text) mit absoluten Zeiten
+    """
+    output_dir = Path(output_dir)
+    with open(output_dir / "timing.json", 'r', encoding='utf-8') as f:
+        timing = json.load(f)
+
+    journal = CompletionJournal(output_dir)
+    texts = dict(texts or {})
+    for section_id, entry in journal.entries.items():
+        texts.setdefault(section_id, entry.get('text', ''))
+
+    sections = timing['sections']
+    missing_text = [entry['section_id'] for entry in sections if not texts.get(entry['section_id'])]
+    if missing_text:
+        print(f"WARNUNG: Kein Text für {', '.join(missing_text)} (Abschnitte ohne Untertitel)")
+
+    files = {entry['section_id']: Path(entry['file']) for entry in sections if texts.get(entry['section_id'])}
+    silences = silence_map(files, output_dir / CACHE_FILENAME, jobs, min_silence)
+    duration_model, _ = load_models([output_dir], tolerance=DEFAULT_TOLERANCE)
+
+    offsets = section_offsets(timing, Path(timeline_file or output_dir / MASTER_TIMELINE_FILENAME))
+    cues = []
+    for entry in sections:
+        section_id = entry['section_id']
+        if section_id in files:
+            analysis = silences[section_id]
+            for start, end, text in section_cues(texts[section_id], analysis['silences'],
+                                                 analysis['duration'], duration_model):
+                cues.append((offsets[section_id] + start, offsets[section_id] + end, text))
+
+    write_vtt(output_dir / "subtitles.vtt", cues)
+    write_srt(output_dir / "subtitles.srt", cues)
+    return cues
+
+
+def main():
+    parser = argparse.ArgumentParser(description='WebVTT/SRT-Untertitel aus Audio-Pausen und Break-Tags erzeugen')
+    parser.add_argument('output_dir', type=Path, help='Verzeichnis mit timing.json und Audio-Files')
+    parser.add_argument('--narration-file', '-n', type=Path, help='Texte aus der Narration-Datei statt aus journal.jsonl')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1, help='Worker-Prozesse (default: CPU-Anzahl)')
+    parser.add_argument('--min-silence', type=float, default=MIN_SILENCE_SECONDS,
+                        help=f'Mindestlänge einer Pause in Sekunden (default: {MIN_SILENCE_SECONDS})')
+    parser.add_argument('--master-timeline', type=Path,
+                        help=f'Timeline von audio_assemble.py (default: <output_dir>/{MASTER_TIMELINE_FILENAME})')
+    args = parser.parse_args()
+
+    if not (args.output_dir / "timing.json").exists():
+        print(f"ERROR: {args.output_dir / 'timing.json'} nicht gefunden")
+        return 1
+
+    texts = None
+    if args.narration_file:
+        texts = parse_narration_file(args.narration_file)
+
+    cues = generate_subtitles(args.output_dir, texts, jobs=args.jobs, min_silence=args.min_silence,
+                              timeline_file=args.master_timeline)
+    print(f"✓ {len(cues)} Cues: {args.output_dir / 'subtitles.vtt'}, {args.output_dir / 'subtitles.srt'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Async Fish Audio TTS Engine
+===========================
+
+asyncio-basierte Alternative zu FishAudioTTS für Batch-Runs:
+- Viele Requests gleichzeitig, Concurrency wird per AIMD angepasst
+  (additive increase bei Erfolg, multiplicative decrease bei 429/5xx)
+- Retries mit Exponential Backoff + Full Jitter, Retry-After wird respektiert
+- Ein fehlgeschlagener Abschnitt bricht den Batch nicht ab
+
+Spricht direkt die HTTP API (POST /v1/tts, msgpack) über httpx an, beides
+sind Abhängigkeiten des fish-audio-sdk.
+"""
+
+import os
+import time
+import random
+import asyncio
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Union
+
+try:
+    import httpx
+    import ormsgpack
+except ImportError:
+    httpx = None
+    ormsgpack = None
+
+
+DEFAULT_BASE_URL = "https://api.fish.audio"
+
+# Status-Codes, bei denen ein Retry sinnvoll ist
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class TTSRequestError(Exception):
+    """Fehler eines einzelnen TTS-Requests"""
+
+    def __init__(self, message: str, status: Optional[int] = None,
+                 retry_after: Optional[float] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parst einen Retry-After Header (Sekunden oder HTTP-Datum)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency-Limit nach AIMD (wie TCP Congestion Control).
+
+    Bei Erfolg wächst das Limit um increase/limit (≈ +increase pro voller Runde),
+    bei Überlast (429/5xx) wird es mit decrease multipliziert. Mehrere
+    Fehler derselben Runde führen nur zu einer Reduktion.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 16,
+                 increase: float = 1.0, decrease: float = 0.5):
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self._started = 0
+        self._last_decrease_at = -1
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> int:
+        """Wartet auf einen freien Slot und liefert die Ticket-Nummer"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            self._started += 1
+            return self._started
+
+    async def release(self, ticket: int, succeeded: bool = True, overloaded: bool = False):
+        """Gibt einen Slot frei und passt das Limit an"""
+        async with self._condition:
+            self.in_flight -= 1
+            if overloaded:
+                # Nur einmal pro Runde reduzieren: Requests, die vor der letzten
+                # Reduktion gestartet wurden, zählen nicht erneut
+                if ticket > self._last_decrease_at:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._last_decrease_at = self._started
+            elif succeeded:
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            self._condition.notify_all()
+
+
+class AsyncTTSEngine:
+    """
+    Async Batch-Engine für Fish Audio TTS mit adaptiver Concurrency und Retries.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        initial_concurrency: int = 4,
+        max_concurrency: int = 16,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 240.0
+    ):
+        """
+        Args:
+            api_key: Fish Audio API Key (optional, nutzt FISH_API_KEY env var falls nicht angegeben)
+            base_url: API Basis-URL (z.B. lokaler Mock-Server für Tests)
+            initial_concurrency: Start-Anzahl paralleler Requests
+            max_concurrency: Obergrenze paralleler Requests
+            max_retries: Maximale Retries pro Abschnitt
+            backoff_base: Basis-Wartezeit in Sekunden für Exponential Backoff
+            backoff_max: Maximale Wartezeit zwischen zwei Versuchen
+            timeout: Timeout pro Request in Sekunden
+        """
+        if httpx is None:
+            raise RuntimeError("httpx/ormsgpack nicht installiert! Bitte installieren mit: pip install fish-audio-sdk")
+
+        self.api_key = api_key or os.getenv('FISH_API_KEY')
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'failed': 0, 'peak_concurrency': 0}
+
+    @staticmethod
+    def build_payload(
+        text: str,
+        speed: float = 1.0,
+        volume: int = 0,
+        format: str = "mp3",
+        normalize: bool = False,
+        temperature: float = 0.7,
+        top_p: float = 0.7,
+        repetition_penalty: float = 1.2,
+        reference_id: Optional[str] = None,
+        **_ignored
+    ) -> Dict[str, Any]:
+        """Baut den /v1/tts Request-Body (gleiche Felder wie das SDK)"""
+        payload = {
+            'text': text,
+            'format': format,
+            'normalize': normalize,
+            'temperature': temperature,
+            'top_p': top_p,
+            'repetition_penalty': repetition_penalty,
+            'prosody': {'speed': speed, 'volume': volume},
+        }
+        if reference_id:
+            payload['reference_id'] = reference_id
+        return payload
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # Full Jitter: zufällig zwischen 0 und der exponentiellen Obergrenze
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _request(self, client: "httpx.AsyncClient", text: str, output_file: Path,
+                       model: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Ein einzelner Request, Antwort wird direkt in eine .part-Datei gestreamt"""
+        body = ormsgpack.packb(self.build_payload(text, **params))
+        headers = {
+            'Authorization': f"Bearer {self.api_key}",
+            'Content-Type': 'application/msgpack',
+            'model': model,
+        }
+        tmp_file = output_file.with_name(f".{output_file.name}.part")
+        started = time.perf_counter()
+        ttfb = None
+        total_bytes = 0
+
+        try:
+            async with client.stream('POST', f"{self.base_url}/v1/tts", content=body, headers=headers) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    raise TTSRequestError(
+                        f"HTTP {response.status_code}: {response.text[:200]}",
+                        status=response.status_code,
+                        retry_after=parse_retry_after(response.headers.get('retry-after')),
+                        retryable=response.status_code in RETRYABLE_STATUS
+                    )
+                with open(tmp_file, 'wb') as f:
+                    async for chunk in response.aiter_bytes():
+                        if ttfb is None:
+                            ttfb = time.perf_counter() - started
+                        f.write(chunk)
+                        total_bytes += len(chunk)
+            os.replace(tmp_file, output_file)
+        except httpx.TransportError as e:
+            raise TTSRequestError(f"{type(e).__name__}: {e}", retryable=True) from e
+        finally:
+            tmp_file.unlink(missing_ok=True)
+
+        total = time.perf_counter() - started
+        return {
+            'ttfb_seconds': ttfb if ttfb is not None else total,
+            'total_seconds': total,
+            'bytes': total_bytes,
+        }
+
+    async def synthesize(self, client: "httpx.AsyncClient", limiter: AdaptiveLimiter,
+                         section_id: str, text: str, output_path: Union[str, Path],
+                         model: str = "s1", **params) -> Dict[str, Any]:
+        """
+        Generiert einen Abschnitt mit Retries.
+
+        Returns:
+            Dict mit file, attempts, ttfb_seconds, total_seconds (letzter Versuch), bytes,
+            started (perf_counter), queue_seconds (Warten auf Slots) und
+            elapsed_seconds (inkl. Retries und Backoff)
+
+        Raises:
+            TTSRequestError: wenn alle Versuche fehlschlagen oder der Fehler nicht retrybar ist
+        """
+        output_file = Path(output_path)
+        started = time.perf_counter()
+        queued = 0.0
+
+        for attempt in range(self.max_retries + 1):
+            waiting = time.perf_counter()
+            ticket = await limiter.acquire()
+            queued += time.perf_counter() - waiting
+            self.stats['requests'] += 1
+            self.stats['peak_concurrency'] = max(self.stats['peak_concurrency'], limiter.in_flight)
+            succeeded = overloaded = False
+            try:
+                result = await self._request(client, text, output_file, model, params)
+                succeeded = True
+                result.update({'section_id': section_id, 'file': str(output_file), 'attempts': attempt + 1,
+                               'started': started, 'queue_seconds': queued,
+                               'elapsed_seconds': time.perf_counter() - started})
+                print(f"[{section_id}] gespeichert: {output_file} "
+                      f"(TTFB: {result['ttfb_seconds']:.2f}s, Versuch {attempt + 1}, Limit {limiter.limit:.1f})")
+                return result
+            except TTSRequestError as e:
+                overloaded = e.retryable and (e.status is None or e.status == 429 or e.status >= 500)
+                if e.status == 429:
+                    self.stats['throttled'] += 1
+                if not e.retryable or attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt, e.retry_after)
+                self.stats['retries'] += 1
+                print(f"[{section_id}] {e} - Retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            finally:
+                await limiter.release(ticket, succeeded=succeeded, overloaded=overloaded)
+
+            await asyncio.sleep(delay)
+
+    async def run(self, jobs: List[Tuple[str, str, Union[str, Path]]],
+                  **params) -> Dict[str, Union[Dict[str, Any], Exception]]:
+        """
+        Generiert alle Abschnitte nebenläufig.
+
+        Args:
+            jobs: Liste von (section_id, text, output_path)
+            **params: Synthese-Parameter wie bei FishAudioTTS.generate_audio()
+
+        Returns:
+            Dict {section_id: Ergebnis-Dict oder Exception} - Fehler einzelner
+            Abschnitte werden zurückgegeben statt den Batch abzubrechen
+        """
+        params = dict(params)
+        params.pop('stream', None)
+        limiter = AdaptiveLimiter(initial=self.initial_concurrency, maximum=self.max_concurrency)
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            tasks = [
+                self.synthesize(client, limiter, section_id, text, output_path, **params)
+                for section_id, text, output_path in jobs
+            ]
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = {}
+        for (section_id, _, _), outcome in zip(jobs, outcomes):
+            if isinstance(outcome, BaseException):
+                self.stats['failed'] += 1
+            results[section_id] = outcome
+        return results
+
+    def run_sync(self, jobs: List[Tuple[str, str, Union[str, Path]]],
+                 **params) -> Dict[str, Union[Dict[str, Any], Exception]]:
+        """Synchroner Wrapper um run() für CLI und generate_from_narration_file"""
+        return asyncio.run(self.run(jobs, **params))
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+TTS Pipeline Benchmark
+======================
+
+Misst Durchsatz und Latenzen von fish_audio_tts.py gegen den lokalen
+mock_fish_server.py, ohne API-Credits zu verbrauchen.
+
+Für jede Kombination aus Modus (api = generate_from_narration_file,
+cli = fish_audio_tts.py), Engine und Abschnittsanzahl wird eine synthetische
+Narration-Datei erzeugt und in einem eigenen Prozess generiert, damit
+Peak-RSS pro Run messbar ist.
+
+Gemessen werden:
+- End-to-End Wall-Time und Abschnitte/s
+- p50/p95/p99 Latenz pro Request (vom Mock-Server protokolliert)
+- Peak-RSS des Prozesses (getrusage via os.wait4)
+
+Ergebnisse landen als JSON in benchmarks/, mit --compare werden zwei Runs
+verglichen.
+
+Usage:
+    python tts_benchmark.py --sizes 10 100 1000 --modes api cli --engine async --workers 8
+    python tts_benchmark.py --latency 0.3 --jitter 0.5 --distribution lognormal --error-rate 0.05
+    python tts_benchmark.py --compare benchmarks/tts_A.json benchmarks/tts_B.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, List
+
+from mock_fish_server import MockFishServer, LATENCY_DISTRIBUTIONS, _MP3_BITRATE_INDEX
+from tts_trace import percentile
+
+
+DEFAULT_RESULTS_DIR = Path(__file__).parent / "benchmarks"
+
+_WORDS = ("Equity Drawdown Killswitch Position Lotgröße Balance Dashboard Trade Magic Nummer "
+          "Input Parameter Funktion Variable Broker Symbol Spread Stop Loss Take Profit "
+          "berechnet prüft speichert öffnet schließt zeigt aktualisiert").split()
+
+
+def synthetic_narration(sections: int, seed: int = 1) -> str:
+    """
+    Erzeugt eine Narration-Datei im [section_id]-Format.
+
+    Abschnittslängen sind log-gleichverteilt zwischen ~80 und ~1500 Zeichen,
+    mit (break)-Tags zwischen einigen Sätzen.
+    """
+    rng = random.Random(seed)
+    parts = []
+    for index in range(1, sections + 1):
+        target = int(80 * (1500 / 80) ** rng.random())
+        sentences = []
+        length = 0
+        while length < target:
+            words = rng.sample(_WORDS, rng.randint(5, 12))
+            sentence = ' '.join(words).capitalize() + '.'
+            if rng.random() < 0.3:
+                sentence += ' (break)'
+            sentences.append(sentence)
+            length += len(sentence) + 1
+        parts.append(f"[bench{index:04d}]\n{' '.join(sentences)}\n")
+    return '\n'.join(parts)
+
+
+def _child_main(argv: List[str]) -> int:
+    """Läuft im Kind-Prozess: ein Run von generate_from_narration_file"""
+    options = json.loads(argv[0])
+    from fish_audio_tts import generate_from_narration_file
+
+    generate_from_narration_file(
+        narration_file=Path(options['narration_file']),
+        output_dir=Path(options['output_dir']),
+        api_key='benchmark',
+        workers=options['workers'],
+        cache=None,
+        engine=options['engine'],
+        base_url=options['base_url'],
+        max_concurrency=options['max_concurrency'],
+        # Mock-Audio hat keine zum Text passende Dauer
+        duration_tolerance=None,
+        **options['tts_params']
+    )
+    return 0
+
+
+def run_process(command: List[str], log_file: Path) -> Dict[str, Any]:
+    """Startet einen Prozess und liefert Exit-Code, Wall-Time und Peak-RSS"""
+    started = time.perf_counter()
+    with open(log_file, 'w', encoding='utf-8') as log:
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - started
+    # ru_maxrss: KB unter Linux, Bytes unter macOS
+    peak_rss = usage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    return {'exit_code': process.returncode, 'wall_seconds': wall, 'peak_rss_mb': peak_rss / 1024 / 1024}
+
+
+def run_case(server: MockFishServer, mode: str, engine: str, sections: int, workers: int,
+             max_concurrency: int, work_dir: Path, tts_params: Dict[str, Any]) -> Dict[str, Any]:
+    """Ein Benchmark-Run (frische Narration-Datei und leeres Output-Verzeichnis)"""
+    case_dir = work_dir / f"{mode}_{engine}_{sections}"
+    shutil.rmtree(case_dir, ignore_errors=True)
+    case_dir.mkdir(parents=True)
+    narration_file = case_dir / "narrations.txt"
+    narration_file.write_text(synthetic_narration(sections), encoding='utf-8')
+    output_dir = case_dir / "audio"
+
+    if mode == 'api':
+        options = {
+            'narration_file': str(narration_file),
+            'output_dir': str(output_dir),
+            'workers': workers,
+            'engine': engine,
+            'base_url': server.base_url,
+            'max_concurrency': max_concurrency,
+            'tts_params': tts_params,
+        }
+        command = [sys.executable, str(Path(__file__).resolve()), '--child', json.dumps(options)]
+    else:
+        command = [
+            sys.executable, str(Path(__file__).parent / 'fish_audio_tts.py'),
+            '--narration-file', str(narration_file),
+            '--output-dir', str(output_dir),
+            '--workers', str(workers),
+            '--engine', engine,
+            '--max-concurrency', str(max_concurrency),
+            '--base-url', server.base_url,
+            '--api-key', 'benchmark',
+            '--no-cache',
+            # Wie im Kind-Prozess: Mock-Audio hat keine zum Text passende Dauer
+            '--no-duration-check',
+        ]
+
+    server.reset_stats()
+    process = run_process(command, case_dir / "run.log")
+    log = list(server.request_log)
+    latencies = [entry['latency_seconds'] for entry in log if entry['status'] == 200]
+    ttfbs = [entry['ttfb_seconds'] for entry in log if entry['status'] == 200]
+    generated = len(list(output_dir.glob('*.mp3'))) if output_dir.exists() else 0
+
+    result = {
+        'mode': mode,
+        'engine': engine,
+        'sections': sections,
+        'workers': workers,
+        'exit_code': process['exit_code'],
+        'generated': generated,
+        'wall_seconds': round(process['wall_seconds'], 3),
+        'sections_per_second': round(generated / process['wall_seconds'], 3) if process['wall_seconds'] else None,
+        'peak_rss_mb': round(process['peak_rss_mb'], 1),
+        'requests': len(log),
+        'errors': sum(1 for entry in log if entry['status'] != 200),
+        'bytes_received': sum(entry['bytes'] for entry in log),
+        'latency_seconds': {f'p{q}': round(percentile(latencies, q), 4) if latencies else None for q in (50, 95, 99)},
+        'ttfb_seconds': {f'p{q}': round(percentile(ttfbs, q), 4) if ttfbs else None for q in (50, 95, 99)},
+        'log_file': str(case_dir / "run.log"),
+    }
+    return result
+
+
+def print_results(results: List[Dict[str, Any]]):
+    print(f"\n{'Mode':<5} {'Engine':<6} {'Sect.':>6} {'Wall':>9} {'Sect/s':>8} {'p50':>7} {'p95':>7} {'p99':>7} "
+          f"{'RSS MB':>7} {'Req.':>6} {'Err.':>5}")
+    print('-' * 86)
+    for r in results:
+        lat = r['latency_seconds']
+        fmt = lambda value: f"{value:.3f}" if value is not None else '-'
+        status = '' if r['exit_code'] == 0 else f"  (exit {r['exit_code']}, siehe {r['log_file']})"
+        print(f"{r['mode']:<5} {r['engine']:<6} {r['sections']:>6} {r['wall_seconds']:>8.2f}s "
+              f"{r['sections_per_second'] or 0:>8.2f} {fmt(lat['p50']):>7} {fmt(lat['p95']):>7} {fmt(lat['p99']):>7} "
+              f"{r['peak_rss_mb']:>7.1f} {r['requests']:>6} {r['errors']:>5}{status}")
+
+
+def compare(old_file: Path, new_file: Path) -> int:
+    """Vergleicht zwei gespeicherte Runs (gleiche Fälle: mode, engine, sections, workers)"""
+    with open(old_file, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_file, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    def key(r):
+        return (r['mode'], r['engine'], r['sections'], r['workers'])
+
+    old_results = {key(r): r for r in old['results']}
+    print(f"{'Fall':<28} {'Wall alt':>9} {'Wall neu':>9} {'Δ':>8} {'p95 alt':>8} {'p95 neu':>8} {'RSS Δ MB':>9}")
+    print('-' * 86)
+    for r in new['results']:
+        before = old_results.get(key(r))
+        if not before:
+            continue
+        delta = (r['wall_seconds'] - before['wall_seconds']) / before['wall_seconds'] * 100 if before['wall_seconds'] else 0
+        p95_old = before['latency_seconds']['p95'] or 0
+        p95_new = r['latency_seconds']['p95'] or 0
+        name = f"{r['mode']}/{r['engine']}/{r['sections']}/w{r['workers']}"
+        print(f"{name:<28} {before['wall_seconds']:>8.2f}s {r['wall_seconds']:>8.2f}s {delta:>+7.1f}% "
+              f"{p95_old:>8.3f} {p95_new:>8.3f} {r['peak_rss_mb'] - before['peak_rss_mb']:>+9.1f}")
+    return 0
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        return _child_main(sys.argv[2:])
+
+    parser = argparse.ArgumentParser(description='Benchmark für fish_audio_tts.py gegen den lokalen Mock-Server')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='Abschnittsanzahlen (default: 10 100 1000)')
+    parser.add_argument('--modes', nargs='+', choices=['api', 'cli'], default=['api', 'cli'], help='api und/oder cli (default: beide)')
+    parser.add_argument('--engine', nargs='+', choices=['sdk', 'async'], default=['async'], help='Engine(s) (default: async)')
+    parser.add_argument('--workers', type=int, default=8, help='Worker bzw. Start-Concurrency (default: 8)')
+    parser.add_argument('--max-concurrency', type=int, default=16, help='Obergrenze für --engine async (default: 16)')
+    parser.add_argument('--latency', type=float, default=0.2, help='Basis-Latenz des Mock-Servers in Sekunden (default: 0.2)')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Jitter bzw. Sigma (lognormal) (default: 0.1)')
+    parser.add_argument('--distribution', choices=LATENCY_DISTRIBUTIONS, default='uniform', help='Latenz-Verteilung (default: uniform)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Anteil 429/503-Antworten (default: 0)')
+    parser.add_argument('--bitrate', type=int, default=128, choices=sorted(_MP3_BITRATE_INDEX), help='MP3 Bitrate (default: 128)')
+    parser.add_argument('--seconds-per-byte', type=float, default=0.01,
+                        help='Audio-Dauer pro Byte Request-Body, klein halten für 1000 Abschnitte (default: 0.01)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed für Mock-Server und Narrationen (default: 1)')
+    parser.add_argument('--results-dir', type=Path, default=DEFAULT_RESULTS_DIR, help='Ablage der JSON-Ergebnisse (default: benchmarks/)')
+    parser.add_argument('--keep', action='store_true', help='Temporäre Audio-Files nach dem Run behalten')
+    parser.add_argument('--compare', nargs=2, type=Path, metavar=('ALT', 'NEU'), help='Zwei Ergebnis-Dateien vergleichen')
+    args = parser.parse_args()
+
+    if args.compare:
+        return compare(*args.compare)
+
+    server = MockFishServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        bitrate_kbps=args.bitrate,
+        seconds_per_byte=args.seconds_per_byte,
+        seed=args.seed,
+        distribution=args.distribution
+    )
+    server.start_in_thread()
+    print(f"Mock Fish Audio Server: {server.base_url} "
+          f"(Latenz {args.latency}s, Jitter {args.jitter}, {args.distribution}, Fehlerrate {args.error_rate})")
+
+    tts_params = {'format': 'mp3', 'normalize': False}
+    work_dir = Path(tempfile.mkdtemp(prefix='tts_benchmark_'))
+    results = []
+    started = time.time()
+    try:
+        for sections in args.sizes:
+            for mode in args.modes:
+                for engine in args.engine:
+                    print(f"Run: {mode}/{engine}, {sections} Abschnitte ...", flush=True)
+                    results.append(run_case(server, mode, engine, sections, args.workers,
+                                            args.max_concurrency, work_dir, tts_params))
+    finally:
+        server.stop_thread()
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_results(results)
+
+    args.results_dir.mkdir(parents=True, exist_ok=True)
+    result_file = args.results_dir / f"tts_{time.strftime('%Y%m%d-%H%M%S', time.localtime(started))}.json"
+    with open(result_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started)),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'server': {
+                'latency': args.latency,
+                'jitter': args.jitter,
+                'distribution': args.distribution,
+                'error_rate': args.error_rate,
+                'bitrate_kbps': args.bitrate,
+                'seconds_per_byte': args.seconds_per_byte,
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f"\nErgebnisse gespeichert: {result_file}")
+    return 0 if all(r['exit_code'] == 0 for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Audio Cache für Fish Audio TTS
+==============================
+
+Content-adressierter Cache für generierte Audio-Files. Der Schlüssel ist ein
+SHA-256 über den normalisierten Text und alle Synthese-Parameter, d.h. ein
+unveränderter Abschnitt wird nie zweimal bei der API angefragt.
+
+Layout des Cache-Verzeichnisses:
+    <cache_dir>/index.json          LRU-Index {key: {size, last_access, ext}}
+    <cache_dir>/ab/abcdef....mp3    Audio-Daten (erste 2 Hex-Zeichen als Unterordner)
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+
+# Alle Parameter, die das Ergebnis der Synthese beeinflussen
+KEY_PARAMS = (
+    'model',
+    'reference_id',
+    'speed',
+    'volume',
+    'temperature',
+    'top_p',
+    'repetition_penalty',
+    'format',
+    'normalize',
+)
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".tts_cache"
+DEFAULT_MAX_SIZE_MB = 2048
+
+
+def normalize_text(text: str) -> str:
+    """Normalisiert Whitespace, damit Zeilenumbrüche den Schlüssel nicht ändern"""
+    return ' '.join(text.split())
+
+
+def make_cache_key(text: str, params: Dict[str, Any]) -> str:
+    """
+    Berechnet den Cache-Schlüssel für einen Abschnitt.
+
+    Args:
+        text: Narration-Text
+        params: Synthese-Parameter (wie an generate_audio() übergeben)
+
+    Returns:
+        SHA-256 Hex-Digest
+    """
+    payload = {'text': normalize_text(text)}
+    for name in KEY_PARAMS:
+        payload[name] = params.get(name)
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """
+    Persistenter Audio-Cache mit größenbegrenzter LRU-Eviction.
+
+    Thread-sicher, damit er mit --workers genutzt werden kann.
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, max_size_mb: float = DEFAULT_MAX_SIZE_MB):
+        """
+        Args:
+            cache_dir: Verzeichnis für Cache-Daten
+            max_size_mb: Maximale Gesamtgröße in MB (älteste Einträge werden entfernt)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.index_file = self.cache_dir / "index.json"
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        if not self.index_file.exists():
+            return {}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print(f"WARNUNG: Cache-Index beschädigt, starte mit leerem Cache: {self.index_file}")
+            return {}
+
+    def _save_index(self):
+        tmp_file = self.index_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_file, self.index_file)
+
+    def _entry_path(self, key: str, ext: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.{ext}"
+
+    @staticmethod
+    def _materialize(src: Path, dest: Path):
+        """Legt dest als Hardlink auf src an (Fallback: Kopie)"""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists() or dest.is_symlink():
+            dest.unlink()
+        try:
+            os.link(src, dest)
+        except OSError:
+            shutil.copy2(src, dest)
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        """
+        Stellt einen Cache-Eintrag unter dest bereit.
+
+        Returns:
+            True bei Cache-Hit, sonst False
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                self.misses += 1
+                return False
+
+            src = self._entry_path(key, entry['ext'])
+            if not src.exists():
+                # Eintrag ohne Daten (z.B. manuell gelöscht)
+                del self._index[key]
+                self._save_index()
+                self.misses += 1
+                return False
+
+            self._materialize(src, Path(dest))
+            entry['last_access'] = time.time()
+            self._save_index()
+            self.hits += 1
+            return True
+
+    def store(self, key: str, src: Path):
+        """Übernimmt ein generiertes Audio-File in den Cache"""
+        src = Path(src)
+        ext = src.suffix.lstrip('.') or 'bin'
+        entry_path = self._entry_path(key, ext)
+
+        with self._lock:
+            self._materialize(src, entry_path)
+            self._index[key] = {
+                'size': entry_path.stat().st_size,
+                'last_access': time.time(),
+                'ext': ext,
+            }
+            self._evict(keep=key)
+            self._save_index()
+
+    def _evict(self, keep: Optional[str] = None):
+        """Entfernt die am längsten nicht genutzten Einträge bis max_bytes eingehalten wird"""
+        total = sum(entry['size'] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self._entry_path(key, entry['ext']).unlink(missing_ok=True)
+            del self._index[key]
+            total -= entry['size']
+
+    def stats(self) -> Dict[str, Any]:
+        """Liefert Hit/Miss-Zähler und aktuelle Cache-Größe"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._index),
+                'size_bytes': sum(entry['size'] for entry in self._index.values()),
+            }
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Completion Journal für Fish Audio TTS Batch-Runs
+================================================
+
+Append-only JSONL-Datei im Output-Verzeichnis. Jeder fertig generierte
+Abschnitt wird sofort mit Datei-Hash, Dauer und Input-Hash (Text +
+Parameter) protokolliert. Nach einem Abbruch kann ein Run mit --resume
+alle unveränderten Abschnitte überspringen und timing.json aus dem
+Journal wiederherstellen.
+
+Format (eine Zeile pro Abschnitt, spätere Einträge überschreiben frühere):
+    {"section_id": "block03", "file": "audio/block03.mp3", "sha256": "...",
+     "duration_seconds": 42.3, "input_hash": "...", "params": {...},
+     "text": "...", "completed_at": 1734567890.1}
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+
+JOURNAL_FILENAME = "journal.jsonl"
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 eines Files (blockweise gelesen)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CompletionJournal:
+    """
+    Thread-sicheres Append-only Journal der fertigen Abschnitte.
+    """
+
+    def __init__(self, output_dir: Path):
+        self.path = Path(output_dir) / JOURNAL_FILENAME
+        self._lock = threading.Lock()
+        self.entries = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        entries = {}
+        if not self.path.exists():
+            return entries
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Letzte Zeile kann bei einem Absturz unvollständig sein
+                    print(f"WARNUNG: Ungültige Journal-Zeile {line_number} ignoriert: {self.path}")
+                    continue
+                entries[entry['section_id']] = entry
+        return entries
+
+    def record(self, section_id: str, file: Path, duration_seconds: float,
+               input_hash: str, text: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Protokolliert einen fertigen Abschnitt (fsync, damit er einen Absturz übersteht)"""
+        entry = {
+            'section_id': section_id,
+            'file': str(file),
+            'sha256': file_sha256(Path(file)),
+            'duration_seconds': duration_seconds,
+            'input_hash': input_hash,
+            'params': params or {},
+            'text': text,
+            'completed_at': time.time(),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries[section_id] = entry
+        return entry
+
+    def completed(self, section_id: str, input_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Liefert den Journal-Eintrag, falls der Abschnitt mit identischem Input
+        fertig ist und das Audio-File unverändert auf Disk liegt.
+        """
+        entry = self.entries.get(section_id)
+        if not entry or entry.get('input_hash') != input_hash:
+            return None
+        # Alte Einträge ohne lesbare Dauer (0) würden die Timeline verschieben
+        if not entry.get('duration_seconds'):
+            return None
+
+        audio_file = Path(entry['file'])
+        if not audio_file.exists() or file_sha256(audio_file) != entry.get('sha256'):
+            return None
+        return entry
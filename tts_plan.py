@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Dry-Run Planer für Fish Audio TTS
+=================================
+
+Schätzt vor einem Run (ohne API-Requests) pro Abschnitt:
+- Zeichen (Abrechnungsbasis) und Control-Tag-Anzahl
+- Audio-Dauer (DurationModel, kalibriert aus journal.jsonl früherer Runs)
+- API-Zeit (ThroughputModel, kalibriert aus trace.jsonl früherer Runs)
+- Makespan für N Worker bei Longest-First (LPT) Dispatch
+
+Das DurationModel dient nach einem Run auch als Dauer-Check: Abschnitte,
+deren Dauer außerhalb der Toleranz liegt (meist angehängte Wörter, siehe
+ANTI_HALLUCINATION_FIX.md), generiert generate_from_narration_file neu.
+
+Ohne Historie werden Default-Koeffizienten genutzt (siehe TTS_BEST_PRACTICES.md:
+(break) ~0.5s, lange Pause ~1.5s, ~150 Wörter pro Minute).
+
+Usage:
+    python fish_audio_tts.py --narration-file narration.md --output-dir ./audio/ --plan --workers 4
+"""
+
+import re
+import heapq
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+from tts_journal import CompletionJournal
+from tts_trace import TRACE_FILENAME, load_trace
+
+
+TAG_PATTERN = re.compile(r'\(([a-z][a-z-]*)\)')
+
+# Mindestanzahl Samples, ab der ein Modell gefittet wird
+MIN_SAMPLES = 3
+
+# Dauer-Check: erlaubte relative Abweichung und absolute Untergrenze
+# (kurze Abschnitte schwanken relativ stärker)
+DEFAULT_TOLERANCE = 0.25
+MIN_DEVIATION_SECONDS = 1.5
+
+
+def text_features(text: str) -> Dict[str, int]:
+    """
+    Zählt Zeichen, gesprochene Wörter und Control Tags eines Abschnitts.
+
+    Returns:
+        Dict mit chars, bytes, words, breaks, long_breaks, other_tags
+    """
+    tags = TAG_PATTERN.findall(text)
+    spoken = TAG_PATTERN.sub(' ', text)
+    return {
+        'chars': len(text),
+        'bytes': len(text.encode('utf-8')),
+        'words': len(spoken.split()),
+        'breaks': tags.count('break'),
+        'long_breaks': tags.count('long-break'),
+        'other_tags': sum(1 for tag in tags if tag not in ('break', 'long-break')),
+    }
+
+
+def _solve(rows: List[List[float]], targets: List[float]) -> Optional[List[float]]:
+    """Kleinste Quadrate über die Normalgleichungen (Gauß-Elimination), None wenn singulär"""
+    size = len(rows[0])
+    matrix = [[sum(row[i] * row[j] for row in rows) for j in range(size)] +
+              [sum(row[i] * target for row, target in zip(rows, targets))] for i in range(size)]
+
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda r: abs(matrix[r][column]))
+        if abs(matrix[pivot][column]) < 1e-9:
+            return None
+        matrix[column], matrix[pivot] = matrix[pivot], matrix[column]
+        for r in range(size):
+            if r != column:
+                factor = matrix[r][column] / matrix[column][column]
+                matrix[r] = [a - factor * b for a, b in zip(matrix[r], matrix[column])]
+    return [matrix[i][size] / matrix[i][i] for i in range(size)]
+
+
+class DurationModel:
+    """
+    Audio-Dauer ≈ (Wörter * s/Wort + (break) * s + (long-break) * s) / speed
+    """
+
+    def __init__(self, seconds_per_word: float = 0.4, break_seconds: float = 0.5,
+                 long_break_seconds: float = 1.5, samples: int = 0):
+        self.seconds_per_word = seconds_per_word
+        self.break_seconds = break_seconds
+        self.long_break_seconds = long_break_seconds
+        self.samples = samples
+
+    def predict(self, features: Dict[str, int], speed: float = 1.0) -> float:
+        return (features['words'] * self.seconds_per_word +
+                features['breaks'] * self.break_seconds +
+                features['long_breaks'] * self.long_break_seconds) / (speed or 1.0)
+
+    @staticmethod
+    def is_outlier(predicted: float, measured: float, tolerance: float = DEFAULT_TOLERANCE) -> bool:
+        return abs(measured - predicted) > max(tolerance * predicted, MIN_DEVIATION_SECONDS)
+
+    @classmethod
+    def fit(cls, samples: List[Tuple[Dict[str, int], float, float]],
+            tolerance: Optional[float] = None) -> 'DurationModel':
+        """
+        Args:
+            samples: Liste von (features, speed, gemessene Dauer)
+            tolerance: Wenn gesetzt, wird nach dem ersten Fit ohne die Ausreißer
+                       neu gefittet (halluzinierte Abschnitte verzerren sonst das Modell)
+        """
+        model = cls._fit(samples)
+        if tolerance is None or not model.samples:
+            return model
+
+        inliers = [(features, speed, duration) for features, speed, duration in samples
+                   if duration > 0 and not model.is_outlier(model.predict(features, speed), duration, tolerance)]
+        if MIN_SAMPLES <= len(inliers) < model.samples:
+            return cls._fit(inliers)
+        return model
+
+    @classmethod
+    def _fit(cls, samples: List[Tuple[Dict[str, int], float, float]]) -> 'DurationModel':
+        model = cls()
+        samples = [(features, speed, duration) for features, speed, duration in samples if duration > 0]
+        if len(samples) < MIN_SAMPLES:
+            return model
+
+        rows = [[features['words'], features['breaks'], features['long_breaks']] for features, _, _ in samples]
+        targets = [duration * (speed or 1.0) for _, speed, duration in samples]
+        coefficients = _solve(rows, targets)
+        if coefficients and all(value >= 0 for value in coefficients):
+            model.seconds_per_word, model.break_seconds, model.long_break_seconds = coefficients
+        else:
+            # Zu wenig Variation in den Tags: nur s/Wort fitten, Pausen bleiben Default
+            pauses = [row[1] * model.break_seconds + row[2] * model.long_break_seconds for row in rows]
+            words = sum(row[0] * row[0] for row in rows)
+            if words:
+                model.seconds_per_word = max(0.0, sum(row[0] * (target - pause) for row, target, pause
+                                                      in zip(rows, targets, pauses)) / words)
+        model.samples = len(samples)
+        return model
+
+
+class ThroughputModel:
+    """
+    API-Zeit ≈ overhead + factor * Audio-Dauer (Request bis letztes Byte)
+    """
+
+    def __init__(self, overhead_seconds: float = 1.0, seconds_per_audio_second: float = 0.25,
+                 samples: int = 0):
+        self.overhead_seconds = overhead_seconds
+        self.seconds_per_audio_second = seconds_per_audio_second
+        self.samples = samples
+
+    def predict(self, audio_seconds: float) -> float:
+        return self.overhead_seconds + self.seconds_per_audio_second * audio_seconds
+
+    @classmethod
+    def fit(cls, samples: List[Tuple[float, float]]) -> 'ThroughputModel':
+        """
+        Args:
+            samples: Liste von (Audio-Dauer, API-Zeit)
+        """
+        model = cls()
+        if len(samples) < MIN_SAMPLES:
+            return model
+        coefficients = _solve([[1.0, audio] for audio, _ in samples], [api for _, api in samples])
+        if coefficients and coefficients[1] > 0:
+            model.overhead_seconds = max(0.0, coefficients[0])
+            model.seconds_per_audio_second = coefficients[1]
+        else:
+            model.seconds_per_audio_second = sum(api for _, api in samples) / max(sum(a for a, _ in samples), 1e-9)
+            model.overhead_seconds = 0.0
+        model.samples = len(samples)
+        return model
+
+
+def load_models(history_dirs: Iterable[Path],
+                tolerance: Optional[float] = None) -> Tuple[DurationModel, ThroughputModel]:
+    """
+    Fittet beide Modelle aus den Output-Verzeichnissen früherer Runs
+    (journal.jsonl für Dauern, trace.jsonl für API-Zeiten).
+
+    Args:
+        history_dirs: Output-Verzeichnisse
+        tolerance: Ausreißer beim Dauer-Fit verwerfen (siehe DurationModel.fit)
+    """
+    duration_samples = []
+    throughput_samples = []
+
+    for directory in history_dirs:
+        directory = Path(directory)
+        if not directory.is_dir():
+            continue
+
+        for entry in CompletionJournal(directory).entries.values():
+            duration_samples.append((text_features(entry.get('text', '')),
+                                     entry.get('params', {}).get('speed', 1.0),
+                                     entry.get('duration_seconds') or 0))
+
+        trace_file = directory / TRACE_FILENAME
+        if trace_file.exists():
+            spans = load_trace(trace_file)
+            audio = {span['section_id']: span.get('duration_seconds') or 0
+                     for span in spans if span['span'] == 'section' and not span.get('cached')}
+            for span in spans:
+                if span['span'] == 'api_request' and audio.get(span['section_id']):
+                    # Nur der erfolgreiche Versuch zählt, Retries verfälschen sonst den Durchsatz
+                    if span.get('retries'):
+                        continue
+                    throughput_samples.append((audio[span['section_id']], span['duration']))
+
+    return DurationModel.fit(duration_samples, tolerance), ThroughputModel.fit(throughput_samples)
+
+
+def find_outliers(results: List[Dict[str, Any]], model: DurationModel, speed: float = 1.0,
+                  tolerance: float = DEFAULT_TOLERANCE) -> Dict[str, Dict[str, float]]:
+    """
+    Abschnitte, deren gemessene Dauer außerhalb der Toleranz liegt.
+
+    Args:
+        results: Dicts mit section_id, text, duration_seconds (wie in generate_from_narration_file)
+
+    Returns:
+        {section_id: {'measured', 'predicted', 'deviation'}} (deviation relativ, + = zu lang)
+    """
+    outliers = {}
+    for result in results:
+        predicted = model.predict(text_features(result['text']), speed)
+        measured = result['duration_seconds']
+        if predicted > 0 and measured and model.is_outlier(predicted, measured, tolerance):
+            outliers[result['section_id']] = {
+                'measured': round(measured, 3),
+                'predicted': round(predicted, 3),
+                'deviation': round((measured - predicted) / predicted, 3),
+            }
+    return outliers
+
+
+def lpt_order(estimates: Dict[str, float]) -> List[str]:
+    """Section-IDs nach geschätzter API-Zeit absteigend (Longest Processing Time first)"""
+    return sorted(estimates, key=lambda section_id: estimates[section_id], reverse=True)
+
+
+def makespan(durations: List[float], workers: int) -> float:
+    """Gesamtdauer, wenn die Jobs in dieser Reihenfolge an den jeweils freien Worker gehen"""
+    loads = [0.0] * max(1, workers)
+    for duration in durations:
+        heapq.heapreplace(loads, loads[0] + duration)
+    return max(loads)
+
+
+def plan_sections(sections: Dict[str, str], history_dirs: Iterable[Path], workers: int = 1,
+                  speed: float = 1.0) -> Dict[str, Any]:
+    """
+    Erstellt den Plan für einen Run.
+
+    Args:
+        sections: {section_id: text} wie von parse_narration_file()
+        history_dirs: Output-Verzeichnisse früherer Runs zur Kalibrierung
+        workers: Anzahl paralleler Requests
+        speed: Sprechgeschwindigkeit
+
+    Returns:
+        Dict mit sections (Liste), Summen, Makespans und den Modellen
+    """
+    duration_model, throughput_model = load_models(history_dirs)
+
+    rows = []
+    for section_id, text in sections.items():
+        features = text_features(text)
+        audio_seconds = duration_model.predict(features, speed)
+        rows.append(dict(features, section_id=section_id, audio_seconds=audio_seconds,
+                         api_seconds=throughput_model.predict(audio_seconds)))
+
+    api_times = {row['section_id']: row['api_seconds'] for row in rows}
+    return {
+        'sections': rows,
+        'workers': workers,
+        'chars': sum(row['chars'] for row in rows),
+        'bytes': sum(row['bytes'] for row in rows),
+        'audio_seconds': sum(row['audio_seconds'] for row in rows),
+        'api_seconds': sum(api_times.values()),
+        'makespan_file_order': makespan(list(api_times.values()), workers),
+        'makespan_lpt': makespan([api_times[section_id] for section_id in lpt_order(api_times)], workers),
+        'duration_model': duration_model,
+        'throughput_model': throughput_model,
+    }
+
+
+def print_plan(plan: Dict[str, Any]):
+    """Tabelle pro Abschnitt plus Summen und Makespan"""
+    print(f"\n{'Abschnitt':<22} {'Zeichen':>8} {'Wörter':>7} {'break':>6} {'long':>5} {'Tags':>5} "
+          f"{'Dauer':>8} {'API':>8}")
+    print('-' * 76)
+    for row in plan['sections']:
+        print(f"{row['section_id']:<22} {row['chars']:>8} {row['words']:>7} {row['breaks']:>6} "
+              f"{row['long_breaks']:>5} {row['other_tags']:>5} {row['audio_seconds']:>7.1f}s "
+              f"{row['api_seconds']:>7.1f}s")
+    print('-' * 76)
+
+    duration_model = plan['duration_model']
+    throughput_model = plan['throughput_model']
+    print(f"Summe: {plan['chars']} Zeichen ({plan['bytes']} Bytes UTF-8), "
+          f"Audio ~{plan['audio_seconds'] / 60:.1f} min, API ~{plan['api_seconds'] / 60:.1f} min sequentiell")
+    print(f"Makespan bei {plan['workers']} Worker: ~{plan['makespan_lpt']:.0f}s longest-first "
+          f"(Datei-Reihenfolge: ~{plan['makespan_file_order']:.0f}s)")
+    print(f"\nDauer-Modell: {duration_model.seconds_per_word:.3f} s/Wort, (break) {duration_model.break_seconds:.2f}s, "
+          f"(long-break) {duration_model.long_break_seconds:.2f}s "
+          f"({duration_model.samples or 'keine'} Samples{'' if duration_model.samples else ', Defaults'})")
+    print(f"Durchsatz-Modell: {throughput_model.overhead_seconds:.2f}s + "
+          f"{throughput_model.seconds_per_audio_second:.3f} s pro Audio-Sekunde "
+          f"({throughput_model.samples or 'keine'} Samples{'' if throughput_model.samples else ', Defaults'})")
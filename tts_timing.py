@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Narration-Files und Timeline (timing.json)
+==========================================
+
+Lesen der [section_id]-Narrations-Files und Schreiben bzw. Aktualisieren von
+timing.json. Ohne Abhängigkeit vom Fish Audio SDK, damit lokale Werkzeuge
+(audio_trim.py, subtitles.py) auch ohne API-Zugang laufen.
+"""
+
+import json
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+
+def parse_narration_file(narration_file: Path) -> Dict[str, str]:
+    """
+    Liest eine Narration-Datei im [section_id]-Format.
+
+    Args:
+        narration_file: Pfad zur Narration-Datei
+
+    Returns:
+        Dict {section_id: text} in Datei-Reihenfolge
+    """
+    with open(narration_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    sections = {}
+    current_section = None
+
+    for line in content.split('\n'):
+        line = line.strip()
+        if line.startswith('[') and line.endswith(']'):
+            current_section = line[1:-1]
+            sections[current_section] = []
+        elif current_section and line:
+            sections[current_section].append(line)
+
+    return {section_id: ' '.join(lines) for section_id, lines in sections.items()}
+
+
+def format_timestamp(seconds: float) -> str:
+    """Formatiert Sekunden als M:SS"""
+    return f"{int(seconds//60)}:{int(seconds%60):02d}"
+
+
+def build_timing_info(results: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Berechnet die kumulative Timeline aus den Ergebnissen aller Abschnitte.
+
+    Args:
+        results: Liste von Dicts mit section_id, file, duration_seconds, text
+                 (in der gewünschten Reihenfolge)
+
+    Returns:
+        (timing_info, total_duration)
+    """
+    timing_info = []
+    cumulative_time = 0
+
+    for result in results:
+        start_time = cumulative_time
+        end_time = start_time + result['duration_seconds']
+        cumulative_time = end_time
+
+        timing_info.append({
+            'section_id': result['section_id'],
+            'file': result['file'],
+            'duration_seconds': result['duration_seconds'],
+            'start': format_timestamp(start_time),
+            'end': format_timestamp(end_time),
+            'text_preview': result['text'][:100]
+        })
+
+    return timing_info, cumulative_time
+
+
+def write_timing_file(output_dir: Path, timing_info: List[Dict[str, Any]], total_duration: float) -> Path:
+    """Speichert die Timeline als timing.json im Output-Verzeichnis"""
+    timing_file = output_dir / "timing.json"
+    with open(timing_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'sections': timing_info,
+            'total_duration_seconds': total_duration,
+            'total_duration_formatted': format_timestamp(total_duration)
+        }, f, indent=2, ensure_ascii=False)
+    return timing_file
+
+
+def update_timing_file(
+    output_dir: Path,
+    updates: Dict[str, Dict[str, Any]],
+    section_order: Optional[List[str]] = None,
+    removed: Optional[List[str]] = None
+) -> Tuple[Path, int]:
+    """
+    Ersetzt einzelne Abschnitte in einer bestehenden timing.json.
+
+    Start/Ende werden erst ab dem ersten geänderten Abschnitt neu berechnet,
+    alle Abschnitte davor bleiben unverändert.
+
+    Args:
+        output_dir: Output-Verzeichnis mit timing.json
+        updates: {section_id: Ergebnis-Dict mit file, duration_seconds, text}
+        section_order: Reihenfolge aller Abschnitte (für Abschnitte, die noch
+                       nicht in timing.json stehen)
+        removed: Section-IDs, die aus der Timeline entfernt werden
+
+    Returns:
+        (timing_file, Index des ersten geänderten Abschnitts)
+    """
+    timing_file = output_dir / "timing.json"
+    timing = {'sections': []}
+    if timing_file.exists():
+        with open(timing_file, 'r', encoding='utf-8') as f:
+            timing = json.load(f)
+
+    entries = timing['sections']
+    first_changed = len(entries)
+
+    removed = set(removed or [])
+    for index, entry in enumerate(entries):
+        if entry['section_id'] in removed:
+            first_changed = min(first_changed, index)
+    entries = [entry for entry in entries if entry['section_id'] not in removed]
+
+    positions = {entry['section_id']: index for index, entry in enumerate(entries)}
+    order = {section_id: index for index, section_id in enumerate(section_order or [])}
+
+    for section_id, result in updates.items():
+        entry = {
+            'section_id': section_id,
+            'file': result['file'],
+            'duration_seconds': result['duration_seconds'],
+            'start': '',
+            'end': '',
+            'text_preview': result['text'][:100]
+        }
+        if section_id in positions:
+            index = positions[section_id]
+            entries[index].update({key: entry[key] for key in ('file', 'duration_seconds', 'text_preview')})
+        else:
+            # Neuer Abschnitt: hinter dem letzten Vorgänger laut section_order einfügen
+            rank = order.get(section_id, len(order))
+            index = len(entries)
+            for candidate, existing in enumerate(entries):
+                if order.get(existing['section_id'], -1) > rank:
+                    index = candidate
+                    break
+            entries.insert(index, entry)
+            positions = {existing['section_id']: i for i, existing in enumerate(entries)}
+        first_changed = min(first_changed, index)
+
+    # Kumulative Offsets nur ab dem ersten geänderten Abschnitt neu berechnen
+    cumulative_time = sum(entry['duration_seconds'] for entry in entries[:first_changed])
+    for entry in entries[first_changed:]:
+        entry['start'] = format_timestamp(cumulative_time)
+        cumulative_time += entry['duration_seconds']
+        entry['end'] = format_timestamp(cumulative_time)
+
+    total_duration = sum(entry['duration_seconds'] for entry in entries)
+    write_timing_file(output_dir, entries, total_duration)
+    return timing_file, first_changed
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Run-Tracing für Fish Audio TTS
+==============================
+
+Strukturierte Spans pro Abschnitt statt print-Statements. Jeder Span hat
+einen Namen, Start (Sekunden seit Run-Beginn), Dauer und beliebige
+Attribute.
+
+Span-Namen:
+    queue_wait     Wartezeit bis ein Worker/Slot frei ist
+    text_prep      Cache-Key (Text + Parameter hashen)
+    cache_lookup   Cache-Abfrage (hit: bool)
+    cache_store    Neues Audio in den Cache übernehmen
+    api_request    Request bis letztes Byte (ttfb_seconds, bytes, attempts, retries)
+    save           Schreiben auf Disk (nur ohne Streaming)
+    duration_probe Dauer ermitteln (source: header/ffprobe)
+    encode         Lokales Encoding aus PCM in alle Liefer-Formate (statt duration_probe)
+    journal        Journal-Eintrag inkl. fsync
+    section        Gesamter Abschnitt (chars, duration_seconds, cached)
+
+Ausgabe im Output-Verzeichnis neben timing.json:
+    trace.jsonl    Ein Span pro Zeile
+    metrics.json   Zusammenfassung (p50/p95 pro Span, Bytes/s, Retries, Cache-Hit-Rate)
+
+Usage:
+    python tts_trace.py audio/trace.jsonl
+"""
+
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+
+TRACE_FILENAME = "trace.jsonl"
+METRICS_FILENAME = "metrics.json"
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Perzentil mit linearer Interpolation (q in 0..100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class RunTracer:
+    """
+    Thread-sicherer Sammler für Spans eines Runs.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        """Sekunden seit Run-Beginn"""
+        return time.perf_counter() - self.started
+
+    def record(self, section_id: str, name: str, start: float, duration: float, **attrs) -> Dict[str, Any]:
+        """Fügt einen extern gemessenen Span hinzu (start relativ zum Run-Beginn)"""
+        span = {'section_id': section_id, 'span': name, 'start': round(start, 6),
+                'duration': round(max(duration, 0.0), 6)}
+        span.update(attrs)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, section_id: str, name: str, **attrs):
+        """
+        Misst einen Block. Attribute können im Block ergänzt werden:
+
+            with tracer.span('block03', 'cache_lookup') as attrs:
+                attrs['hit'] = cache.fetch(...)
+        """
+        start = self.now()
+        try:
+            yield attrs
+        finally:
+            self.record(section_id, name, start, self.now() - start, **attrs)
+
+    def by_name(self, name: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [span for span in self.spans if span['span'] == name]
+
+    def summary(self) -> Dict[str, Any]:
+        """Kennzahlen des Runs für metrics.json"""
+        with self._lock:
+            spans = list(self.spans)
+
+        names = sorted({span['span'] for span in spans})
+        latencies = {}
+        for name in names:
+            durations = [span['duration'] for span in spans if span['span'] == name]
+            latencies[name] = {
+                'count': len(durations),
+                'total': round(sum(durations), 4),
+                'p50': round(percentile(durations, 50), 4),
+                'p95': round(percentile(durations, 95), 4),
+                'max': round(max(durations), 4),
+            }
+
+        requests = [span for span in spans if span['span'] == 'api_request']
+        ttfbs = [span['ttfb_seconds'] for span in requests if span.get('ttfb_seconds') is not None]
+        request_bytes = sum(span.get('bytes', 0) for span in requests)
+        request_time = sum(span['duration'] for span in requests)
+        lookups = [span for span in spans if span['span'] == 'cache_lookup']
+        hits = sum(1 for span in lookups if span.get('hit'))
+
+        return {
+            'started_at': self.started_at,
+            'wall_seconds': round(self.now(), 4),
+            'sections': len([span for span in spans if span['span'] == 'section']),
+            'requests': len(requests),
+            'retries': sum(span.get('retries', 0) for span in requests),
+            'bytes_received': request_bytes,
+            'bytes_per_second': round(request_bytes / request_time, 1) if request_time > 0 else None,
+            'ttfb_seconds': {
+                'p50': round(percentile(ttfbs, 50), 4) if ttfbs else None,
+                'p95': round(percentile(ttfbs, 95), 4) if ttfbs else None,
+            },
+            'cache_lookups': len(lookups),
+            'cache_hits': hits,
+            'cache_hit_rate': round(hits / len(lookups), 4) if lookups else None,
+            'spans': latencies,
+        }
+
+    def write(self, output_dir: Path, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Schreibt trace.jsonl und metrics.json ins Output-Verzeichnis.
+
+        Args:
+            output_dir: Verzeichnis mit timing.json
+            extra: Zusätzliche Felder für metrics.json (z.B. Engine, Worker, Parameter)
+
+        Returns:
+            Die geschriebene Zusammenfassung
+        """
+        output_dir = Path(output_dir)
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span['start'])
+
+        with open(output_dir / TRACE_FILENAME, 'w', encoding='utf-8') as f:
+            for span in spans:
+                f.write(json.dumps(span, ensure_ascii=False) + '\n')
+
+        summary = self.summary()
+        if extra:
+            summary.update(extra)
+        with open(output_dir / METRICS_FILENAME, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+def load_trace(trace_file: Path) -> List[Dict[str, Any]]:
+    spans = []
+    with open(trace_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                spans.append(json.loads(line))
+    return spans
+
+
+def print_summary(summary: Dict[str, Any]):
+    """Kompakte Tabelle: Zeitanteile pro Span (Netzwerk vs. Probe vs. Disk)"""
+    print(f"\n{'Span':<16} {'Anzahl':>7} {'Summe':>9} {'p50':>8} {'p95':>8} {'Max':>8}")
+    print('-' * 60)
+    for name, stats in summary['spans'].items():
+        print(f"{name:<16} {stats['count']:>7} {stats['total']:>8.2f}s {stats['p50']:>8.3f} "
+              f"{stats['p95']:>8.3f} {stats['max']:>8.3f}")
+
+    hit_rate = summary['cache_hit_rate']
+    line = f"\nRequests: {summary['requests']}, Retries: {summary['retries']}"
+    if summary['ttfb_seconds']['p50'] is not None:
+        line += f", TTFB p50/p95: {summary['ttfb_seconds']['p50']:.2f}/{summary['ttfb_seconds']['p95']:.2f}s"
+    if summary['bytes_per_second']:
+        line += f", {summary['bytes_per_second'] / 1024:.0f} KB/s"
+    print(line)
+    if hit_rate is not None:
+        print(f"Cache-Hit-Rate: {hit_rate * 100:.0f}% ({summary['cache_hits']}/{summary['cache_lookups']})")
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python tts_trace.py <trace.jsonl>")
+        return 1
+
+    tracer = RunTracer()
+    tracer.spans = load_trace(Path(sys.argv[1]))
+    summary = tracer.summary()
+    summary['wall_seconds'] = max((span['start'] + span['duration'] for span in tracer.spans), default=0)
+    print_summary(summary)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
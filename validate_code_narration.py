@@ -9,16 +9,35 @@ the result will compile without errors.
 
 Usage:
     python validate_code_narration.py <narration_file> <source_file>
+    python validate_code_narration.py --batch <manifest.json | glob> [--jobs N]
+        [--report report.json] [--junit report.xml] [--source-pattern {stem}.mq5]
 
 Example:
     python validate_code_narration.py codeyoutube.md EquityMonitor-V107.mq5
+    python validate_code_narration.py --batch tutorials.json --report validation.json
+
+Batch manifest (paths relative to the manifest):
+    [{"narration": "codeyoutube.md", "source": "EquityMonitor-V107.mq5"}, ...]
 """
 
-import sys
+import io
+import os
 import re
-import difflib
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+import contextlib
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+import mql5_lexer
+from line_diff import unified_diff
+from narration_parser import parse_file, parse_text, file_sha256, CACHE_DIRNAME
+
 
 class Colors:
     """ANSI color codes for terminal output"""
@@ -41,9 +60,8 @@ def extract_code_blocks(narration_content, language='mql5'):
     Returns:
         List of code block contents
     """
-    pattern = f'```{language}\n(.*?)\n```'
-    blocks = re.findall(pattern, narration_content, re.DOTALL)
-    return blocks
+    code_blocks = parse_text(narration_content)['code_blocks']
+    return [block['code'] for block in code_blocks if block['language'] == language]
 
 
 def normalize_whitespace(text):
@@ -58,16 +76,223 @@ def remove_blank_lines(text):
 
 
 def count_syntax_elements(code):
-    """Count key syntax elements for validation"""
-    return {
-        'open_braces': code.count('{'),
-        'close_braces': code.count('}'),
-        'semicolons': code.count(';'),
-        'open_parens': code.count('('),
-        'close_parens': code.count(')'),
-        'open_brackets': code.count('['),
-        'close_brackets': code.count(']'),
-    }
+    """Count key syntax elements for validation (strings and comments excluded)"""
+    return mql5_lexer.scan(code)['counts']
+
+
+# Rabin-Karp parameters for the rolling hash over line hashes
+_HASH_BASE = 1_000_003
+_HASH_MOD = (1 << 61) - 1
+VALIDATION_CACHE_VERSION = 1
+
+
+def line_hash(line):
+    """Stable 64-bit hash of a line (trailing whitespace ignored)"""
+    return int.from_bytes(hashlib.blake2b(line.rstrip().encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def nonblank_lines(text):
+    """List of (1-based line number, line hash) for all non-blank lines"""
+    return [(number, line_hash(line)) for number, line in enumerate(text.split('\n'), 1) if line.strip()]
+
+
+def find_sequence(haystack, needle, start=0):
+    """
+    Find needle (list of ints) in haystack (list of ints) at or after start.
+
+    Rabin-Karp rolling hash, candidates are verified element by element.
+
+    Returns:
+        Index of the first match or -1
+    """
+    m = len(needle)
+    n = len(haystack)
+    if m == 0 or n - start < m:
+        return -1
+
+    target = 0
+    window = 0
+    for i in range(m):
+        target = (target * _HASH_BASE + needle[i]) % _HASH_MOD
+        window = (window * _HASH_BASE + haystack[start + i]) % _HASH_MOD
+    high = pow(_HASH_BASE, m - 1, _HASH_MOD)
+
+    for i in range(start, n - m + 1):
+        if window == target and haystack[i:i + m] == needle:
+            return i
+        if i + m < n:
+            window = ((window - haystack[i] * high) * _HASH_BASE + haystack[i + m]) % _HASH_MOD
+
+    return -1
+
+
+def block_labels(parsed, language='mql5'):
+    """Labels like 'Block 3: Input Parameters' for all code blocks, in file order"""
+    labels = {}
+    for section in parsed['sections']:
+        for block in section['code_blocks']:
+            if section['kind'] == 'block':
+                labels[block['line_start']] = f"Block {section['number']}: {section['title']}"
+            else:
+                labels[block['line_start']] = section['title']
+
+    blocks = [block for block in parsed['code_blocks'] if block['language'] == language]
+    return [labels.get(block['line_start'], f"Code block {index} (line {block['line_start']})")
+            for index, block in enumerate(blocks, 1)]
+
+
+def _span_hash(source_lines, start, end):
+    digest = hashlib.sha256()
+    for line in source_lines[start - 1:end]:
+        digest.update(line.rstrip().encode('utf-8') + b'\n')
+    return digest.hexdigest()
+
+
+def map_blocks_to_source(code_blocks, labels, source_content, cached_blocks=None):
+    """
+    Map every code block to its line span in the source.
+
+    Blocks whose hash and source span are unchanged since the cached run are
+    not searched again.
+
+    Returns:
+        List of dicts {label, block_hash, status ('match'|'mismatch'|'empty'),
+        source_start, source_end, span_hash, revalidated}
+    """
+    source_lines = source_content.split('\n')
+    source_nonblank = nonblank_lines(source_content)
+    source_numbers = [number for number, _ in source_nonblank]
+    source_hashes = [value for _, value in source_nonblank]
+    index_of_line = {number: index for index, number in enumerate(source_numbers)}
+    cached_by_hash = {}
+    for entry in cached_blocks or []:
+        cached_by_hash.setdefault(entry['block_hash'], []).append(entry)
+
+    results = []
+    cursor = 0
+
+    for code, label in zip(code_blocks, labels):
+        hashes = [value for _, value in nonblank_lines(code)]
+        block_hash = hashlib.sha256('\n'.join(map(str, hashes)).encode()).hexdigest()
+        result = {'label': label, 'block_hash': block_hash, 'status': 'mismatch',
+                  'source_start': None, 'source_end': None, 'span_hash': None, 'revalidated': True}
+
+        if not hashes:
+            result['status'] = 'empty'
+            results.append(result)
+            continue
+
+        # Unchanged block at an unchanged source span: reuse the cached mapping
+        reused = False
+        for entry in cached_by_hash.get(block_hash, []):
+            start, end = entry.get('source_start'), entry.get('source_end')
+            if (entry['status'] == 'match' and start in index_of_line
+                    and index_of_line[start] >= cursor
+                    and entry['span_hash'] == _span_hash(source_lines, start, end)):
+                result.update(status='match', source_start=start, source_end=end,
+                              span_hash=entry['span_hash'], revalidated=False)
+                cursor = index_of_line[start] + len(hashes)
+                reused = True
+                break
+
+        if not reused:
+            position = find_sequence(source_hashes, hashes, cursor)
+            if position >= 0:
+                start = source_numbers[position]
+                end = source_numbers[position + len(hashes) - 1]
+                result.update(status='match', source_start=start, source_end=end,
+                              span_hash=_span_hash(source_lines, start, end))
+                cursor = position + len(hashes)
+
+        results.append(result)
+
+    # Mismatched blocks cover the gap between their matched neighbours
+    for index, result in enumerate(results):
+        if result['status'] != 'mismatch':
+            continue
+        previous_end = max([r['source_end'] for r in results[:index] if r['source_end']] or [0])
+        following = [r['source_start'] for r in results[index + 1:] if r['status'] == 'match']
+        result['source_start'] = previous_end + 1
+        result['source_end'] = (following[0] - 1) if following else len(source_lines)
+
+    return results
+
+
+def _validation_cache_file(narration_file):
+    narration_file = Path(narration_file)
+    return narration_file.parent / CACHE_DIRNAME / f'{narration_file.name}.validation.json'
+
+
+def load_validation_cache(narration_file):
+    cache_file = _validation_cache_file(narration_file)
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        return cached if cached.get('version') == VALIDATION_CACHE_VERSION else None
+    except (OSError, ValueError):
+        return None
+
+
+def save_validation_cache(narration_file, data):
+    cache_file = _validation_cache_file(narration_file)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(dict(data, version=VALIDATION_CACHE_VERSION), f, indent=1)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"{Colors.YELLOW}WARNING: Could not write validation cache: {e}{Colors.END}")
+
+
+def show_block_differences(block_results, code_blocks, source_content, context_lines=3):
+    """
+    Show a unified diff per mismatching block, labelled 'Block N: Title'.
+
+    Returns:
+        Number of mismatching blocks
+    """
+    source_lines = source_content.split('\n')
+    mismatches = 0
+
+    print(f"\n{Colors.BLUE}Block Mapping:{Colors.END}")
+    for result in block_results:
+        span = f"lines {result['source_start']}-{result['source_end']}"
+        cached = '' if result['revalidated'] else ' (cached)'
+        if result['status'] == 'match':
+            print(f"  {Colors.GREEN}✓{Colors.END} {result['label']} -> {span}{cached}")
+        elif result['status'] == 'empty':
+            print(f"  {Colors.YELLOW}⚠{Colors.END} {result['label']}: empty code block")
+        else:
+            print(f"  {Colors.RED}✗{Colors.END} {result['label']} -> expected around {span}")
+
+    for result, code in zip(block_results, code_blocks):
+        if result['status'] != 'mismatch':
+            continue
+        mismatches += 1
+        start, end = result['source_start'], result['source_end']
+        source_span = [line.rstrip() for line in source_lines[start - 1:end]]
+        block_lines = [line.rstrip() for line in code.split('\n')]
+
+        diff = unified_diff(
+            source_span,
+            block_lines,
+            fromfile=f"Original Source (lines {start}-{end})",
+            tofile=result['label'],
+            lineterm='',
+            n=context_lines
+        )
+
+        print(f"\n{Colors.BOLD}{result['label']}{Colors.END}")
+        print("-" * 80)
+        diff_lines = list(diff)
+        for line in diff_lines[:100]:
+            print_diff_line(line)
+        if len(diff_lines) > 100:
+            print(f"\n{Colors.YELLOW}... ({len(diff_lines) - 100} more lines omitted) ...{Colors.END}")
+        print("-" * 80)
+
+    return mismatches
 
 
 def validate_narration(narration_file, source_file):
@@ -81,10 +306,9 @@ def validate_narration(narration_file, source_file):
     Returns:
         True if validation passes, False otherwise
     """
-    # Read files
+    # Read files (narration is parsed once and cached, see narration_parser.py)
     try:
-        with open(narration_file, 'r', encoding='utf-8') as f:
-            narration_content = f.read()
+        parsed = parse_file(narration_file)
     except Exception as e:
         print(f"{Colors.RED}ERROR: Could not read narration file: {e}{Colors.END}")
         return False
@@ -96,8 +320,20 @@ def validate_narration(narration_file, source_file):
         print(f"{Colors.RED}ERROR: Could not read source file: {e}{Colors.END}")
         return False
 
+    # Unchanged narration and source since the last passing run: nothing to do
+    source_sha256 = file_sha256(source_file)
+    cached = load_validation_cache(narration_file)
+    if (cached and cached.get('passed') and cached.get('narration_sha256') == parsed['sha256']
+            and cached.get('source_sha256') == source_sha256 and cached.get('source_file') == str(source_file)):
+        print(f"\n{Colors.BOLD}VALIDATION REPORT{Colors.END}")
+        print("=" * 80)
+        print(f"\n{Colors.GREEN}✓ UNCHANGED SINCE LAST VALIDATION{Colors.END}")
+        print(f"  {len(cached['blocks'])} code blocks, narration and source hashes match the cached result")
+        return True
+
     # Extract code blocks
-    code_blocks = extract_code_blocks(narration_content)
+    code_blocks = [block['code'] for block in parsed['code_blocks'] if block['language'] == 'mql5']
+    labels = block_labels(parsed)
 
     if not code_blocks:
         print(f"{Colors.RED}ERROR: No code blocks found in narration file{Colors.END}")
@@ -122,11 +358,27 @@ def validate_narration(narration_file, source_file):
     print(f"  Original source: {len(source_normalized):,} chars, {len(source_normalized.split(chr(10))):,} lines")
     print(f"  Reconstructed:   {len(reconstructed_normalized):,} chars, {len(reconstructed_normalized.split(chr(10))):,} lines")
 
+    # Map blocks to source spans (only changed blocks are searched again)
+    block_results = map_blocks_to_source(code_blocks, labels, source_content,
+                                         cached.get('blocks') if cached else None)
+    revalidated = sum(1 for result in block_results if result['revalidated'])
+    print(f"  Blocks revalidated: {revalidated} of {len(block_results)}")
+
+    def finish(passed):
+        save_validation_cache(narration_file, {
+            'narration_sha256': parsed['sha256'],
+            'source_file': str(source_file),
+            'source_sha256': source_sha256,
+            'passed': passed,
+            'blocks': block_results,
+        })
+        return passed
+
     # Check exact match first
     if source_normalized == reconstructed_normalized:
         print(f"\n{Colors.GREEN}✓ PERFECT MATCH{Colors.END}")
         print(f"  Code blocks are 100% identical to source (byte-for-byte)")
-        return validate_syntax(source_content, reconstructed_code)
+        return finish(validate_syntax(source_content, reconstructed_code, code_blocks, labels))
 
     # Not exact match - check if only whitespace differs
     source_no_blanks = remove_blank_lines(source_content)
@@ -136,37 +388,49 @@ def validate_narration(narration_file, source_file):
         print(f"\n{Colors.GREEN}✓ SEMANTIC MATCH{Colors.END}")
         print(f"  Code is identical except for blank lines (will compile correctly)")
         print(f"\n{Colors.YELLOW}Note:{Colors.END} Only cosmetic whitespace differences detected")
-        return validate_syntax(source_content, reconstructed_code)
+        return finish(validate_syntax(source_content, reconstructed_code, code_blocks, labels))
 
     # Real differences exist
     print(f"\n{Colors.RED}✗ MISMATCH DETECTED{Colors.END}")
     print(f"  Code blocks differ from source in meaningful ways\n")
 
-    # Find and display differences
-    show_differences(source_normalized, reconstructed_normalized)
+    # Find and display differences per block; fall back to a whole-file
+    # diff if every block matches but the source has extra/missing code
+    if not show_block_differences(block_results, code_blocks, source_content):
+        show_differences(source_normalized, reconstructed_normalized)
 
     # Still validate syntax to see if it might compile
     print(f"\n{Colors.YELLOW}Checking syntax anyway...{Colors.END}")
-    validate_syntax(source_content, reconstructed_code)
+    validate_syntax(source_content, reconstructed_code, code_blocks, labels)
 
-    return False
+    return finish(False)
 
 
-def validate_syntax(source_code, reconstructed_code):
+def validate_syntax(source_code, reconstructed_code, code_blocks=None, labels=None):
     """
     Validate that syntax elements are balanced.
 
+    Both files are scanned once by the MQL5 lexer (strings, chars and
+    comments are skipped).
+
     Args:
         source_code: Original source code
         reconstructed_code: Reconstructed code from narration
+        code_blocks: Code blocks reconstructed_code was joined from (enables per-block report)
+        labels: Block labels ('Block N: Title'), same order as code_blocks
 
     Returns:
         True if syntax is valid, False otherwise
     """
     print(f"\n{Colors.BLUE}Syntax Validation:{Colors.END}")
 
-    source_counts = count_syntax_elements(source_code)
-    reconstructed_counts = count_syntax_elements(reconstructed_code)
+    source_scan = mql5_lexer.scan(source_code)
+    if code_blocks:
+        reconstructed_scan = mql5_lexer.scan_blocks(code_blocks)
+    else:
+        reconstructed_scan = mql5_lexer.scan(reconstructed_code)
+    source_counts = source_scan['counts']
+    reconstructed_counts = reconstructed_scan['counts']
 
     all_valid = True
 
@@ -199,6 +463,37 @@ def validate_syntax(source_code, reconstructed_code):
         print(f"  {Colors.YELLOW}⚠{Colors.END} Semicolons differ: {source_counts['semicolons']} (source) vs {reconstructed_counts['semicolons']} (narration)")
         # This might be OK depending on context
 
+    # Exact location of the first imbalance
+    imbalance = reconstructed_scan['first_imbalance']
+    if imbalance:
+        if 'block' in imbalance:
+            label = labels[imbalance['block']] if labels else f"Code block {imbalance['block'] + 1}"
+            where = f"{label}, line {imbalance['block_line']}, column {imbalance['column']}"
+        else:
+            where = f"line {imbalance['line']}, column {imbalance['column']}"
+        if source_scan['first_imbalance'] is None:
+            print(f"  {Colors.RED}✗{Colors.END} First imbalance at {where}: {imbalance['message']}")
+            all_valid = False
+        else:
+            # Source itself is unbalanced (e.g. partial file): informational only
+            print(f"  {Colors.YELLOW}⚠{Colors.END} First imbalance at {where}: {imbalance['message']}")
+
+    # Balance per code block (blocks may legitimately span a function)
+    if code_blocks:
+        unbalanced = []
+        for index, counts in enumerate(reconstructed_scan['blocks']):
+            net = {kind: value for kind, value in mql5_lexer.balance(counts).items() if value}
+            if net:
+                label = labels[index] if labels else f"Code block {index + 1}"
+                unbalanced.append((label, net))
+        if unbalanced:
+            print(f"  {Colors.YELLOW}⚠{Colors.END} Blocks with open/close difference:")
+            for label, net in unbalanced:
+                details = ', '.join(f"{kind} {value:+d}" for kind, value in net.items())
+                print(f"      {label}: {details}")
+        else:
+            print(f"  {Colors.GREEN}✓{Colors.END} All {len(code_blocks)} code blocks balanced on their own")
+
     return all_valid
 
 
@@ -214,8 +509,8 @@ def show_differences(source, reconstructed, context_lines=3):
     source_lines = source.split('\n')
     reconstructed_lines = reconstructed.split('\n')
 
-    # Generate unified diff
-    diff = difflib.unified_diff(
+    # Generate unified diff (patience/Myers, see line_diff.py)
+    diff = unified_diff(
         source_lines,
         reconstructed_lines,
         fromfile='Original Source',
@@ -252,11 +547,211 @@ def print_diff_line(line):
         print(line)
 
 
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+BATCH_CACHE_FILE = 'batch_validation.json'
+_ANSI_ESCAPE = re.compile(r'\033\[[0-9;]*m')
+
+
+def load_batch_pairs(spec, source_pattern='{stem}.mq5'):
+    """
+    Resolve a batch specification to (narration, source) pairs.
+
+    Args:
+        spec: JSON manifest [{"narration": ..., "source": ...}] or a glob of narration files
+        source_pattern: Source file for glob entries, relative to the narration file
+
+    Returns:
+        List of (narration_path, source_path) tuples
+    """
+    spec_path = Path(spec)
+    if spec_path.suffix == '.json' and spec_path.is_file():
+        with open(spec_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        base = spec_path.parent
+        return [(base / entry['narration'], base / entry['source']) for entry in entries]
+
+    pairs = []
+    for name in sorted(glob.glob(spec, recursive=True)):
+        narration = Path(name)
+        pairs.append((narration, narration.parent / source_pattern.format(stem=narration.stem)))
+    return pairs
+
+
+def _plain_output():
+    """Process pool initializer: no ANSI codes in captured worker output"""
+    for name in ('GREEN', 'RED', 'YELLOW', 'BLUE', 'BOLD', 'END'):
+        setattr(Colors, name, '')
+
+
+def _validate_pair(narration_file, source_file):
+    """Run validate_narration in a worker with captured output"""
+    output = io.StringIO()
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            passed = validate_narration(narration_file, source_file)
+        status = 'passed' if passed else 'failed'
+    except Exception as e:
+        status = 'error'
+        output.write(f"ERROR: {e}\n")
+    return {
+        'status': status,
+        'seconds': round(time.perf_counter() - started, 4),
+        'output': _ANSI_ESCAPE.sub('', output.getvalue()),
+    }
+
+
+def _load_batch_cache(cache_file):
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        return cached['results'] if cached.get('version') == VALIDATION_CACHE_VERSION else {}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def _save_batch_cache(cache_file, results):
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': VALIDATION_CACHE_VERSION, 'results': results}, f, indent=1)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"{Colors.YELLOW}WARNING: Could not write batch cache: {e}{Colors.END}")
+
+
+def validate_batch(pairs, jobs=None, use_cache=True, cache_dir=None):
+    """
+    Validate many narration/source pairs in parallel.
+
+    Pairs whose (narration hash, source hash) was validated before are
+    taken from the cache without starting a worker.
+
+    Returns:
+        Report dict {'summary', 'seconds', 'results': [...]}, results in input order
+    """
+    started = time.perf_counter()
+    cache_file = Path(cache_dir or Path.cwd() / CACHE_DIRNAME) / BATCH_CACHE_FILE
+    cache = _load_batch_cache(cache_file) if use_cache else {}
+
+    results = []
+    pending = []
+    for narration_file, source_file in pairs:
+        result = {'narration': str(narration_file), 'source': str(source_file), 'cached': False}
+        try:
+            result['narration_sha256'] = file_sha256(narration_file)
+            result['source_sha256'] = file_sha256(source_file)
+        except OSError as e:
+            result.update(status='error', seconds=0.0, output=f"ERROR: {e}\n")
+            results.append(result)
+            continue
+
+        key = f"{result['narration_sha256']}:{result['source_sha256']}"
+        if key in cache:
+            result.update(cache[key], cached=True, seconds=0.0)
+        else:
+            pending.append((result, key))
+        results.append(result)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_plain_output) as pool:
+            futures = {pool.submit(_validate_pair, result['narration'], result['source']): (result, key)
+                       for result, key in pending}
+            for future in as_completed(futures):
+                result, key = futures[future]
+                result.update(future.result())
+                if result['status'] != 'error':
+                    cache[key] = {'status': result['status'], 'output': result['output']}
+                mark = {'passed': f"{Colors.GREEN}✓", 'failed': f"{Colors.RED}✗"}.get(
+                    result['status'], f"{Colors.YELLOW}⚠")
+                print(f"  {mark}{Colors.END} {result['narration']} -> {result['source']} ({result['seconds']:.2f}s)")
+
+    if use_cache and pending:
+        _save_batch_cache(cache_file, cache)
+
+    summary = {status: sum(1 for r in results if r['status'] == status) for status in ('passed', 'failed', 'error')}
+    summary['total'] = len(results)
+    summary['cached'] = sum(1 for r in results if r['cached'])
+    return {'summary': summary, 'seconds': round(time.perf_counter() - started, 4), 'results': results}
+
+
+def write_junit_report(report, junit_file):
+    """JUnit XML with one testcase per narration/source pair"""
+    summary = report['summary']
+    suite = ET.Element('testsuite', {
+        'name': 'validate_code_narration',
+        'tests': str(summary['total']),
+        'failures': str(summary['failed']),
+        'errors': str(summary['error']),
+        'time': f"{report['seconds']:.4f}",
+    })
+    for result in report['results']:
+        case = ET.SubElement(suite, 'testcase', {
+            'classname': result['source'],
+            'name': result['narration'],
+            'time': f"{result['seconds']:.4f}",
+        })
+        if result['status'] == 'failed':
+            ET.SubElement(case, 'failure', {'message': 'Code blocks do not match source'}).text = result['output']
+        elif result['status'] == 'error':
+            ET.SubElement(case, 'error', {'message': 'Validation error'}).text = result['output']
+        elif result['cached']:
+            ET.SubElement(case, 'system-out').text = 'Unchanged since last validation (cached)'
+    ET.ElementTree(suite).write(junit_file, encoding='utf-8', xml_declaration=True)
+
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(description='Validate many narration/source pairs in parallel')
+    parser.add_argument('--batch', required=True, metavar='SPEC',
+                        help='JSON manifest of {"narration", "source"} pairs or a glob of narration files')
+    parser.add_argument('--source-pattern', default='{stem}.mq5',
+                        help='Source file for glob entries, relative to the narration (default: {stem}.mq5)')
+    parser.add_argument('--jobs', '-j', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--report', help='Write JSON report to this file')
+    parser.add_argument('--junit', help='Write JUnit XML report to this file')
+    parser.add_argument('--no-cache', action='store_true', help='Revalidate every pair')
+    args = parser.parse_args(argv)
+
+    pairs = load_batch_pairs(args.batch, args.source_pattern)
+    if not pairs:
+        print(f"{Colors.RED}ERROR: No narration files found for: {args.batch}{Colors.END}")
+        return 1
+
+    print(f"{Colors.BOLD}Batch validation:{Colors.END} {len(pairs)} pairs")
+    report = validate_batch(pairs, jobs=args.jobs, use_cache=not args.no_cache)
+    summary = report['summary']
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.junit:
+        write_junit_report(report, args.junit)
+
+    for result in report['results']:
+        if result['status'] != 'passed':
+            print(f"\n{Colors.BOLD}{result['narration']} -> {result['source']}{Colors.END}")
+            print(result['output'].rstrip())
+
+    color = Colors.GREEN if summary['passed'] == summary['total'] else Colors.RED
+    print(f"\n{color}{summary['passed']}/{summary['total']} passed{Colors.END}, "
+          f"{summary['failed']} failed, {summary['error']} errors, "
+          f"{summary['cached']} from cache ({report['seconds']:.2f}s)")
+    return 0 if summary['passed'] == summary['total'] else 1
+
+
 def main():
     """Main entry point"""
+    if '--batch' in sys.argv[1:]:
+        sys.exit(batch_main(sys.argv[1:]))
+
     if len(sys.argv) != 3:
         print(f"{Colors.BOLD}Code Narration Validator{Colors.END}")
         print(f"\nUsage: {sys.argv[0]} <narration_file> <source_file>")
+        print(f"       {sys.argv[0]} --batch <manifest.json | glob> [--jobs N] [--report FILE] [--junit FILE]")
         print(f"\nExample:")
         print(f"  {sys.argv[0]} codeyoutube.md EquityMonitor-V107.mq5")
         sys.exit(1)